@@ -0,0 +1,253 @@
+# backend/aggregation.py
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SUPPORTED_AGGREGATIONS = ('sum', 'mean', 'count', 'min', 'max')
+MAX_SERIES = 10
+
+
+class AggregationError(ValueError):
+    """Raised when an aggregation request references unknown columns or options"""
+
+
+def build_filter_mask(
+    df: pd.DataFrame,
+    numeric_ranges: Optional[Dict[str, Dict[str, Optional[float]]]] = None,
+    category_filters: Optional[Dict[str, List[Any]]] = None,
+    date_ranges: Optional[Dict[str, Dict[str, Optional[str]]]] = None
+) -> np.ndarray:
+    """Combine all filter predicates into one boolean row mask"""
+    mask = np.ones(len(df), dtype=bool)
+
+    for col, bounds in (numeric_ranges or {}).items():
+        values = pd.to_numeric(_column(df, col), errors='coerce')
+        if bounds.get('min') is not None:
+            mask &= (values >= bounds['min']).to_numpy()
+        if bounds.get('max') is not None:
+            mask &= (values <= bounds['max']).to_numpy()
+
+    for col, allowed in (category_filters or {}).items():
+        if allowed:
+            values = _column(df, col).astype(str)
+            mask &= values.isin([str(v) for v in allowed]).to_numpy()
+
+    for col, bounds in (date_ranges or {}).items():
+        values = _to_datetime(_column(df, col))
+        if bounds.get('start'):
+            mask &= _compare_dates(values, col, bounds['start'], '>=')
+        if bounds.get('end'):
+            mask &= _compare_dates(values, col, bounds['end'], '<=')
+
+    return mask
+
+
+def aggregate(
+    df: pd.DataFrame,
+    x_column: str,
+    y_column: Optional[str] = None,
+    agg: str = 'sum',
+    chart_type: str = 'bar',
+    group_by: Optional[str] = None,
+    bins: Optional[int] = None,
+    max_points: int = 500,
+    mask: Optional[np.ndarray] = None
+) -> Dict[str, Any]:
+    """Aggregate the full table into chart-ready series capped at `max_points` points in total"""
+    if agg not in SUPPORTED_AGGREGATIONS:
+        raise AggregationError(f"Unsupported aggregation: {agg}")
+    if bins is not None and bins < 1:
+        raise AggregationError(f"Invalid number of bins: {bins}")
+    for col in (x_column, y_column, group_by):
+        if col is not None:
+            _column(df, col)
+
+    total_rows = len(df)
+    if mask is not None:
+        df = df[mask]
+
+    if chart_type == 'histogram':
+        series = [_histogram(df[x_column], bins or 20, min(max_points, 200))]
+        return _result(series, total_rows, len(df), chart_type, downsampled=False)
+
+    if group_by is not None:
+        group_sizes = df[group_by].value_counts()
+        group_sizes = group_sizes[group_sizes > 0]  # categorical columns count unused categories too
+        top_groups = group_sizes.head(MAX_SERIES).index
+        groups = [(str(name), df[df[group_by] == name]) for name in top_groups]
+    else:
+        groups = [(y_column or 'count', df)]
+
+    budget = max(2, max_points // max(len(groups), 1))
+    series = []
+    downsampled = False
+    for name, frame in groups:
+        if chart_type == 'scatter':
+            points, was_downsampled = _scatter(frame, x_column, y_column, budget)
+        else:
+            points, was_downsampled = _grouped(frame, x_column, y_column, agg, chart_type, budget)
+        downsampled = downsampled or was_downsampled
+        series.append({"name": name, "points": points})
+
+    return _result(series, total_rows, len(df), chart_type, downsampled)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets downsampling; returns the indices to keep"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype='int64')
+    selected[0] = 0
+    a = 0
+    for i in range(threshold - 2):
+        start = int(np.floor(i * every)) + 1
+        end = int(np.floor((i + 1) * every)) + 1
+        next_start = end
+        next_end = min(int(np.floor((i + 2) * every)) + 1, n)
+
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return selected
+
+
+def _grouped(frame: pd.DataFrame, x_column: str, y_column: Optional[str], agg: str,
+             chart_type: str, budget: int) -> Tuple[List[Dict[str, Any]], bool]:
+    x = frame[x_column]
+    if chart_type == 'line':
+        x = _parse_dates_if_possible(x)
+    if agg == 'count' or y_column is None:
+        values = x.groupby(x, sort=False, observed=True).size()
+    else:
+        y = pd.to_numeric(frame[y_column], errors='coerce')
+        values = y.groupby(x, sort=False, observed=True).agg(agg)
+    values = values.dropna()
+
+    if chart_type == 'line':
+        values = values.sort_index()
+        if len(values) <= budget:
+            return _points(values.index, values.to_numpy()), False
+        x_numeric = _as_numeric_axis(values.index)
+        if x_numeric is None:
+            keep = np.linspace(0, len(values) - 1, budget).astype('int64')
+        else:
+            keep = lttb(x_numeric, values.to_numpy(dtype='float64'), budget)
+        values = values.iloc[keep]
+        return _points(values.index, values.to_numpy()), True
+
+    # Categorical charts keep the largest categories and fold the rest into "Other"
+    values = values.sort_values(ascending=False)
+    if len(values) <= budget:
+        return _points(values.index, values.to_numpy()), False
+    head = values.iloc[:budget - 1]
+    rest = values.iloc[budget - 1:]
+    if agg in ('sum', 'count') or y_column is None:
+        other = rest.sum()
+    else:
+        # Means (and extremes) of the folded categories come from their rows, not from the per-category results
+        other = y[x.isin(rest.index)].agg(agg)
+    points = _points(head.index, head.to_numpy())
+    points.append({"x": "Other", "y": _scalar(other)})
+    return points, True
+
+
+def _scatter(frame: pd.DataFrame, x_column: str, y_column: Optional[str], budget: int) -> Tuple[List[Dict[str, Any]], bool]:
+    if y_column is None:
+        raise AggregationError("Scatter charts require a y column")
+    pair = pd.DataFrame({
+        "x": pd.to_numeric(frame[x_column], errors='coerce'),
+        "y": pd.to_numeric(frame[y_column], errors='coerce'),
+    }).dropna()
+    downsampled = len(pair) > budget
+    if downsampled:
+        pair = pair.sample(n=budget, random_state=0)
+    return _points(pair["x"], pair["y"].to_numpy()), downsampled
+
+
+def _histogram(values: pd.Series, bins: int, max_bins: int) -> Dict[str, Any]:
+    numeric = pd.to_numeric(values, errors='coerce').dropna().to_numpy(dtype='float64')
+    if numeric.size == 0:
+        return {"name": values.name, "points": []}
+    counts, edges = np.histogram(numeric, bins=min(bins, max_bins))
+    points = [
+        {"x": f"{edges[i]:.4g} - {edges[i + 1]:.4g}", "y": int(counts[i]), "bin_start": float(edges[i]), "bin_end": float(edges[i + 1])}
+        for i in range(len(counts))
+    ]
+    return {"name": values.name, "points": points}
+
+
+def _column(df: pd.DataFrame, col: str) -> pd.Series:
+    if col not in df.columns:
+        raise AggregationError(f"Column not found: {col}")
+    return df[col]
+
+
+def _compare_dates(values: pd.Series, col: str, bound: str, op: str) -> np.ndarray:
+    try:
+        timestamp = pd.Timestamp(bound)
+        result = values >= timestamp if op == '>=' else values <= timestamp
+    except (ValueError, TypeError) as e:
+        raise AggregationError(f"Invalid date for {col}: {bound} ({str(e)})")
+    return result.to_numpy()
+
+
+def _to_datetime(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, errors='coerce')
+
+
+def _parse_dates_if_possible(values: pd.Series) -> pd.Series:
+    """Treat text columns that are mostly parseable dates as datetimes so line charts sort chronologically"""
+    if not (pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)):
+        return values
+    parsed = pd.to_datetime(values, errors='coerce')
+    if parsed.notna().sum() >= 0.9 * values.notna().sum():
+        return parsed
+    return values
+
+
+def _as_numeric_axis(index: pd.Index) -> Optional[np.ndarray]:
+    if pd.api.types.is_datetime64_any_dtype(index):
+        return index.asi8.astype('float64')
+    if pd.api.types.is_numeric_dtype(index):
+        return index.to_numpy(dtype='float64')
+    return None
+
+
+def _points(xs, ys: np.ndarray) -> List[Dict[str, Any]]:
+    return [{"x": _scalar(x), "y": _scalar(y)} for x, y in zip(xs, ys)]
+
+
+def _scalar(value):
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def _result(series: List[Dict[str, Any]], total_rows: int, filtered_rows: int, chart_type: str, downsampled: bool) -> Dict[str, Any]:
+    return {
+        "chart_type": chart_type,
+        "series": series,
+        "total_rows": total_rows,
+        "filtered_rows": filtered_rows,
+        "downsampled": downsampled,
+    }
@@ -0,0 +1,388 @@
+# backend/benchmarks/bench_pipeline.py
+"""
+Wall time and peak memory of every FileProcessor stage and of the
+/process-file endpoint, over synthetic datasets (tall, wide,
+high-cardinality, messy-null and date-heavy tables as CSV, XLSX and XLS).
+OpenAI and Supabase are replaced by local stand-ins.
+
+Results are compared with the stored baseline and the run exits with
+status 1 when a measurement regresses beyond the tolerance.
+
+Usage:
+    python benchmarks/bench_pipeline.py                    # compare with benchmarks/baseline.json
+    python benchmarks/bench_pipeline.py --update-baseline  # record a new baseline
+    python benchmarks/bench_pipeline.py --shapes tall --formats csv --rows 200000 --no-baseline
+"""
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import asyncio
+import logging
+import argparse
+import tempfile
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+WORK_DIR = os.environ.get('BENCH_WORK_DIR', os.path.join(tempfile.gettempdir(), 'instagraph-bench'))
+CACHE_DIR = os.path.join(WORK_DIR, 'cache')
+
+# The service reads its configuration at import time: keep every cache, queue
+# and temp file of the benchmark away from a real deployment's
+os.environ.update({
+    'OPENAI_API_KEY': 'local-stand-in',
+    'SUPABASE_URL': 'http://localhost',
+    'SUPABASE_SERVICE_KEY': 'local.stand-in.key',
+    'RESULT_CACHE_DIR': os.path.join(CACHE_DIR, 'results'),
+    'COLUMNAR_CACHE_DIR': os.path.join(CACHE_DIR, 'columnar'),
+    'JOB_DB_PATH': os.path.join(CACHE_DIR, 'jobs.sqlite3'),
+    'TEMP_DIR': os.path.join(CACHE_DIR, 'tmp'),
+    'PROCESS_POOL_WORKERS': '1',
+    # Every run pays for the (stand-in) LLM call instead of hitting the response cache
+    'LLM_CACHE_ENTRIES': '0',
+})
+
+import datasets  # noqa: E402
+import processing_pool  # noqa: E402
+from stand_ins import LocalAsyncOpenAI, LocalSupabase, LocalStorage  # noqa: E402
+from file_processor import FileProcessor  # noqa: E402
+from table_profile import build_table_profile  # noqa: E402
+from local_insights import generate_local_insights  # noqa: E402
+from serialization import dumps  # noqa: E402
+from config import UNIQUE_VALUES_THRESHOLD, TOP_VALUES_K, LOCAL_INSIGHTS_MAX_ROWS  # noqa: E402
+
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+MB = 1024 * 1024
+
+# Differences below these floors are noise, whatever the relative change
+MIN_SECONDS_DELTA = 0.01
+MIN_MB_DELTA = 1.0
+
+
+class StageRecorder:
+    """Times stages, or records the peak memory each one allocates above what it started with"""
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.measurements: Dict[str, float] = {}
+
+    def measure(self, stage: str, fn: Callable, *args, **kwargs) -> Any:
+        if self.trace_memory:
+            start, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            result = fn(*args, **kwargs)
+            self.measurements[stage] = (tracemalloc.get_traced_memory()[1] - start) / MB
+        else:
+            started = time.perf_counter()
+            result = fn(*args, **kwargs)
+            self.measurements[stage] = time.perf_counter() - started
+        return result
+
+
+def calibrate(repeats: int = 5) -> float:
+    """
+    Best-of time of a fixed parse-and-group workload. When this runs slower
+    than it did while the baseline was recorded, baseline timings are scaled
+    up by the same factor, so shared or throttled machines do not read as
+    regressions.
+    """
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({'key': rng.integers(0, 1000, 50000), 'value': rng.random(50000)})
+    content = frame.to_csv(index=False)
+
+    def workload():
+        df = pd.read_csv(io.StringIO(content))
+        df.groupby('key')['value'].agg(['sum', 'mean']).sort_values('sum')
+        '|'.join(f'{value:.3f}' for value in df['value'].tolist()[:20000])
+
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        workload()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def clear_caches():
+    """Empty the parse and result caches so every run starts cold"""
+    for name in ('results', 'columnar', 'tmp'):
+        path = os.path.join(CACHE_DIR, name)
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def run_stages(processor: FileProcessor, path: str, file_type: str, recorder: StageRecorder):
+    """The in-memory path of FileProcessor.process_file, one stage at a time"""
+    df = recorder.measure('read', processor._read_file, path, file_type)
+    profile = recorder.measure('profile', build_table_profile, df,
+                               max_exact=UNIQUE_VALUES_THRESHOLD, top_k=TOP_VALUES_K)
+    stats = recorder.measure('stats', processor._extract_basic_stats, profile)
+    preview = recorder.measure('preview', processor._generate_data_preview, profile)
+    summary = recorder.measure('ai_summary', processor._prepare_data_summary_for_ai, stats, preview)
+    score = recorder.measure('quality_score', processor._calculate_data_quality_score, stats)
+    local = recorder.measure('local_insights', generate_local_insights, stats, preview, score, df,
+                             LOCAL_INSIGHTS_MAX_ROWS)
+    charts = recorder.measure('charts', processor._materialize_charts, df, stats, preview, local)
+    insights = recorder.measure('ai_insights', processor._generate_ai_insights, summary, file_type, local)
+    recorder.measure('serialize', dumps, {**stats, 'data_preview': preview, 'ai_insights': insights, 'charts': charts})
+    clear_caches()
+    recorder.measure('process_file', processor.process_file, path, file_type)
+
+
+def bench_stages(processor: FileProcessor, path: str, file_type: str, repeats: int) -> Dict[str, Dict[str, float]]:
+    """Best-of-`repeats` seconds per stage; memory from one extra traced run"""
+    timings: Dict[str, List[float]] = {}
+    for _ in range(repeats):
+        recorder = StageRecorder()
+        run_stages(processor, path, file_type, recorder)
+        for stage, seconds in recorder.measurements.items():
+            timings.setdefault(stage, []).append(seconds)
+
+    recorder = StageRecorder(trace_memory=True)
+    tracemalloc.start()
+    try:
+        run_stages(processor, path, file_type, recorder)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        stage: {'seconds': round(min(values), 6), 'peak_mb': round(recorder.measurements[stage], 3)}
+        for stage, values in timings.items()
+    }
+
+
+def _profile_with_peak(*args) -> tuple:
+    """Worker-side profile_file that also reports the worker's traced peak"""
+    tracemalloc.start()
+    try:
+        result = processing_pool._profile_file(*args)
+        return result, tracemalloc.get_traced_memory()[1] / MB
+    finally:
+        tracemalloc.stop()
+
+
+class MeasuredPool(processing_pool.ProcessingPool):
+    """Processing pool that can trace memory inside the worker (stage events are not forwarded while tracing)"""
+
+    trace_memory = False
+    worker_peak_mb = 0.0
+
+    async def profile_file(self, file_path, file_type, content_hash=None, content=None, sheet_name=None,
+                           mode='auto', on_stage=None) -> Dict[str, Any]:
+        args = (file_path, file_type, content_hash, content, sheet_name, mode)
+        if not self.trace_memory:
+            return await super().profile_file(*args, on_stage)
+        self.start()
+        loop = asyncio.get_running_loop()
+        result, self.worker_peak_mb = await loop.run_in_executor(self._executor, _profile_with_peak, *args)
+        return result
+
+
+class EndpointBench:
+    """POST /process-file against the real app, with storage, database and OpenAI stood in"""
+
+    def __init__(self, ai_latency: float):
+        import main
+        from fastapi.testclient import TestClient
+
+        self.main = main
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.storage = LocalStorage()
+        main.supabase = LocalSupabase(self.rows)
+        main.storage_client = self.storage
+        main.processing_pool = MeasuredPool(main.processing_pool.max_workers)
+        main.file_processor.llm.async_client = LocalAsyncOpenAI(ai_latency)
+        self.client = TestClient(main.app)
+
+    def __enter__(self) -> 'EndpointBench':
+        self.client.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.client.__exit__(*exc_info)
+
+    def request(self, path: str, file_type: str) -> float:
+        """One cold run: no cached result or parse, like a first upload"""
+        clear_caches()
+        self.main.result_cache.invalidate(None)
+        storage_path = f'bench/{os.path.basename(path)}'
+        self.storage.objects[storage_path] = path
+        self.rows['bench'] = {'id': 'bench', 'storage_path': storage_path, 'file_type': file_type, 'metadata': {}}
+
+        started = time.perf_counter()
+        response = self.client.post('/process-file', json={
+            'file_id': 'bench', 'user_id': 'bench', 'file_path': storage_path, 'file_type': file_type, 'mode': 'exact'
+        })
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f"/process-file returned {response.status_code}: {response.text[:200]}")
+        self._wait_for_enrichment()
+        return elapsed
+
+    def _wait_for_enrichment(self, timeout: float = 60.0):
+        """The LLM step finishes after the response and caches its result; let it land before the next cold run"""
+        deadline = time.monotonic() + timeout
+        while self.main.enrichment_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def bench(self, path: str, file_type: str, repeats: int) -> Dict[str, float]:
+        """Best-of-`repeats` seconds; memory is the API process peak plus the worker peak of a traced run"""
+        self.request(path, file_type)  # warms up the worker process
+        seconds = min(self.request(path, file_type) for _ in range(repeats))
+
+        pool = self.main.processing_pool
+        pool.trace_memory = True
+        tracemalloc.start()
+        try:
+            self.request(path, file_type)
+            api_peak_mb = tracemalloc.get_traced_memory()[1] / MB
+        finally:
+            tracemalloc.stop()
+            pool.trace_memory = False
+        return {'seconds': round(seconds, 6), 'peak_mb': round(api_peak_mb + pool.worker_peak_mb, 3)}
+
+
+def compare(results: Dict[str, Dict[str, Dict[str, float]]], calibration: Dict[str, float],
+            baseline: Dict[str, Any], time_tolerance: float, memory_tolerance: float) -> List[str]:
+    """
+    Print every measurement next to its baseline (timings scaled to this
+    machine's current speed); returns the regressions
+    """
+    regressions = []
+    stored = baseline.get('results', {})
+    for case, stages in results.items():
+        base_calibration = baseline.get('calibration', {}).get(case)
+        # Only ever relax: a faster calibration run is too often noise to tighten the baseline on
+        speed = max(1.0, calibration[case] / base_calibration) if base_calibration else 1.0
+        print(f"\n{case}" + (f"   (baseline timings scaled by {speed:.2f}x)" if speed != 1.0 else ""))
+        for stage, current in stages.items():
+            base = stored.get(case, {}).get(stage)
+            if base is not None:
+                base = {**base, 'seconds': base['seconds'] * speed}
+            line = f"  {stage:<14} {current['seconds'] * 1000:9.1f} ms {current['peak_mb']:8.1f} MB"
+            if base is None:
+                print(line + "   (no baseline)")
+                continue
+            flags = []
+            if (current['seconds'] > base['seconds'] * (1 + time_tolerance)
+                    and current['seconds'] - base['seconds'] > MIN_SECONDS_DELTA):
+                flags.append('time')
+            if (current['peak_mb'] > base['peak_mb'] * (1 + memory_tolerance)
+                    and current['peak_mb'] - base['peak_mb'] > MIN_MB_DELTA):
+                flags.append('memory')
+            line += (f"   baseline {base['seconds'] * 1000:9.1f} ms {base['peak_mb']:8.1f} MB"
+                     f"   {_change(current['seconds'], base['seconds']):>7} {_change(current['peak_mb'], base['peak_mb']):>7}")
+            if flags:
+                line += "   REGRESSION (" + ", ".join(flags) + ")"
+                regressions.append(f"{case} {stage}: {', '.join(flags)}")
+            print(line)
+    return regressions
+
+
+def _change(current: float, base: float) -> str:
+    if base <= 0:
+        return "n/a"
+    return f"{(current / base - 1) * 100:+.0f}%"
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--shapes', nargs='+', choices=sorted(datasets.SHAPES), default=list(datasets.SHAPES))
+    parser.add_argument('--formats', nargs='+', choices=datasets.FORMATS, default=list(datasets.FORMATS))
+    parser.add_argument('--rows', type=int, default=20000, help="rows of CSV datasets")
+    parser.add_argument('--excel-rows', type=int, default=5000, help="rows of XLSX and XLS datasets")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--ai-latency', type=float, default=0.0, help="seconds the OpenAI stand-in takes to answer")
+    parser.add_argument('--no-endpoint', action='store_true', help="only benchmark the FileProcessor stages")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--no-baseline', action='store_true', help="report only, do not compare")
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--time-tolerance', type=float, default=0.3, help="allowed relative slowdown")
+    parser.add_argument('--memory-tolerance', type=float, default=0.2, help="allowed relative memory growth")
+    parser.add_argument('--output', help="also write the results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    # Per-file INFO logs would drown the report
+    logging.disable(logging.INFO)
+    clear_caches()
+    data_dir = os.path.join(WORK_DIR, 'data')
+    processor = FileProcessor()
+    processor.llm.async_client = LocalAsyncOpenAI(args.ai_latency)
+
+    endpoint = None
+    if not args.no_endpoint:
+        try:
+            endpoint = EndpointBench(args.ai_latency).__enter__()
+        except ImportError as e:
+            print(f"Skipping the /process-file benchmark: {e}")
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    calibration: Dict[str, float] = {}
+    try:
+        for shape in args.shapes:
+            for file_format in args.formats:
+                rows = args.rows if file_format == 'csv' else args.excel_rows
+                case = f"{shape}/{file_format}/{rows}"
+                reason = datasets.supports(shape, file_format, rows)
+                if reason:
+                    print(f"Skipping {case}: {reason}")
+                    continue
+                path = datasets.dataset_path(data_dir, shape, rows, file_format)
+                calibration[case] = round(calibrate(), 6)
+                results[case] = bench_stages(processor, path, file_format, args.repeats)
+                if endpoint is not None:
+                    results[case]['endpoint'] = endpoint.bench(path, file_format, args.repeats)
+    finally:
+        if endpoint is not None:
+            endpoint.__exit__(None, None, None)
+
+    settings = {key: getattr(args, key) for key in ('rows', 'excel_rows', 'repeats', 'ai_latency')}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'settings': settings, 'calibration': calibration, 'results': results}, f, indent=2)
+
+    baseline = {} if args.no_baseline else load_baseline(args.baseline)
+    if baseline and baseline.get('settings') != settings:
+        print(f"Note: baseline was recorded with {baseline.get('settings')}, this run used {settings}")
+    regressions = compare(results, calibration, baseline, args.time_tolerance, args.memory_tolerance)
+
+    if args.update_baseline:
+        stored = load_baseline(args.baseline)
+        if stored.get('settings') != settings:
+            stored = {}
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'settings': settings,
+                'calibration': {**stored.get('calibration', {}), **calibration},
+                'results': {**stored.get('results', {}), **results}
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
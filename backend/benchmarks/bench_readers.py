@@ -0,0 +1,69 @@
+# backend/benchmarks/bench_readers.py
+"""
+Compare parser backends on synthetic CSV and XLSX files.
+
+Usage: python benchmarks/bench_readers.py [rows ...]
+"""
+import os
+import io
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import readers  # noqa: E402
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "id": np.arange(rows),
+        "amount": rng.random(rows) * 1000,
+        "quantity": rng.integers(0, 500, rows),
+        "region": rng.choice(["north", "south", "east", "west"], rows),
+        "customer": [f"customer-{i % 5000}" for i in range(rows)],
+        "ordered_at": pd.date_range("2024-01-01", periods=rows, freq="min"),
+    })
+
+
+def best_of(fn, repeats: int = 3) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def report(label: str, baseline: float, fast: float):
+    print(f"{label:<28} default {baseline * 1000:9.1f} ms   fast {fast * 1000:9.1f} ms   {baseline / fast:5.2f}x")
+
+
+def bench_csv(rows: int):
+    content = make_frame(rows).to_csv(index=False).encode()
+    baseline = best_of(lambda: readers.read_csv(io.BytesIO(content), engine='c'))
+    fast = best_of(lambda: readers.read_csv(io.BytesIO(content), engine='pyarrow'))
+    report(f"csv {rows:>9,} rows {len(content) / 1e6:6.1f}MB", baseline, fast)
+
+
+def bench_xlsx(rows: int):
+    buffer = io.BytesIO()
+    make_frame(rows).to_excel(buffer, index=False)
+    content = buffer.getvalue()
+    baseline = best_of(lambda: readers.read_excel(io.BytesIO(content), 'xlsx', engine='default'), repeats=1)
+    fast = best_of(lambda: readers.read_excel(io.BytesIO(content), 'xlsx', engine='calamine'), repeats=1)
+    report(f"xlsx {rows:>8,} rows {len(content) / 1e6:6.1f}MB", baseline, fast)
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 500_000]
+    for rows in sizes:
+        bench_csv(rows)
+    if readers.CalamineWorkbook is None:
+        print("python-calamine is not installed; skipping XLSX comparison")
+    else:
+        # openpyxl is slow enough that larger workbooks only lengthen the run
+        for rows in sorted({min(rows, 100_000) for rows in sizes}):
+            bench_xlsx(rows)
@@ -0,0 +1,78 @@
+# backend/benchmarks/bench_serialization.py
+"""
+Compare the orjson serialization path with the recursive clean_for_json it replaced.
+
+Usage: python benchmarks/bench_serialization.py [columns]
+"""
+import os
+import sys
+import json
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from file_processor import FileProcessor  # noqa: E402
+from serialization import dumps, to_jsonable  # noqa: E402
+
+
+def clean_for_json(obj):
+    """The previous implementation from main.py"""
+    if isinstance(obj, dict):
+        return {key: clean_for_json(value) for key, value in obj.items()}
+    elif isinstance(obj, list):
+        return [clean_for_json(item) for item in obj]
+    elif hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    elif hasattr(obj, 'item'):
+        return obj.item()
+    elif hasattr(obj, 'tolist'):
+        return obj.tolist()
+    elif hasattr(obj, '__dict__'):
+        return str(obj)
+    else:
+        return obj
+
+
+def make_result(columns: int, rows: int = 5000) -> dict:
+    rng = np.random.default_rng(0)
+    data = {}
+    for i in range(columns):
+        if i % 3 == 0:
+            data[f"num_{i}"] = rng.random(rows)
+        elif i % 3 == 1:
+            data[f"cat_{i}"] = rng.choice([f"value-{j}" for j in range(80)], rows)
+        else:
+            data[f"when_{i}"] = pd.date_range("2024-01-01", periods=rows, freq="h")
+    df = pd.DataFrame(data)
+    path = "/tmp/bench_serialization.csv"
+    df.to_csv(path, index=False)
+    result = FileProcessor().profile_file(path, "csv")
+    result.pop("ai_context", None)
+    os.unlink(path)
+    return result
+
+
+def best_of(fn, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    columns = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    result = make_result(columns)
+    size = len(dumps(result))
+
+    legacy_response = best_of(lambda: json.dumps(clean_for_json(result), default=str).encode())
+    fast_response = best_of(lambda: dumps(result))
+    legacy_payload = best_of(lambda: clean_for_json(result))
+    fast_payload = best_of(lambda: to_jsonable(result))
+
+    print(f"{columns} columns, {size / 1024:.0f} KB of JSON")
+    print(f"response bytes   clean_for_json+json {legacy_response * 1000:8.2f} ms   orjson {fast_response * 1000:8.2f} ms   {legacy_response / fast_response:5.1f}x")
+    print(f"supabase payload clean_for_json      {legacy_payload * 1000:8.2f} ms   orjson {fast_payload * 1000:8.2f} ms   {legacy_payload / fast_payload:5.1f}x")
@@ -0,0 +1,161 @@
+# backend/benchmarks/datasets.py
+"""
+Deterministic synthetic datasets for the pipeline benchmarks.
+
+Every shape is generated from a fixed seed, so a given (shape, rows) pair
+always produces the same file. XLS output needs the optional `xlwt` package.
+"""
+import os
+import datetime
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Optional
+
+try:
+    import xlwt
+except ImportError:  # XLS datasets are skipped without it
+    xlwt = None
+
+FORMATS = ('csv', 'xlsx', 'xls')
+
+# Format limits of the legacy XLS writer
+XLS_MAX_ROWS = 65535
+XLS_MAX_COLUMNS = 256
+
+REGIONS = np.array(['north', 'south', 'east', 'west', 'central'])
+STATUSES = np.array(['new', 'paid', 'shipped', 'returned'])
+
+
+def tall(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Many rows of a typical transactions table"""
+    return pd.DataFrame({
+        'order_id': np.arange(rows),
+        'amount': np.round(rng.random(rows) * 1000, 2),
+        'quantity': rng.integers(1, 50, rows),
+        'discount': rng.integers(0, 4, rows) * 0.05,
+        'region': rng.choice(REGIONS, rows),
+        'status': rng.choice(STATUSES, rows),
+        'customer': np.char.add('customer-', (np.arange(rows) % 5000).astype(str)),
+        'ordered_at': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365 * 24 * 60, rows), unit='min'),
+    })
+
+
+def wide(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """A tenth of the rows, 200 columns: mostly measurements plus some labels"""
+    rows = max(rows // 10, 1)
+    data = {f'metric_{i:03d}': np.round(rng.normal(100, 15, rows), 3) for i in range(160)}
+    data.update({f'count_{i:02d}': rng.integers(0, 1000, rows) for i in range(20)})
+    data.update({f'label_{i:02d}': rng.choice(REGIONS, rows) for i in range(20)})
+    return pd.DataFrame(data)
+
+
+def high_cardinality(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Text columns that are (nearly) all distinct"""
+    ids = rng.integers(0, 2 ** 62, rows)
+    return pd.DataFrame({
+        'session_id': [f'{value:016x}' for value in ids],
+        'email': np.char.add(np.char.add('user', np.arange(rows).astype(str)), '@example.com'),
+        'url': [f'https://example.com/p/{value % 1000003}' for value in ids],
+        'comment': [f'comment {value % 999983} about item {value % 7919}' for value in ids],
+        'value': rng.random(rows),
+    })
+
+
+def messy_nulls(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Sparse columns, placeholder strings and numbers mixed with text"""
+    def holes(values, share):
+        values = pd.Series(values, dtype=object)
+        values[rng.random(rows) < share] = None
+        return values
+
+    mixed = rng.integers(0, 1000, rows).astype(object)
+    mixed[rng.random(rows) < 0.1] = 'n/a'
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'score': holes(np.round(rng.random(rows) * 100, 1), 0.4),
+        'category': holes(rng.choice(STATUSES, rows), 0.3),
+        'mixed': holes(mixed, 0.2),
+        'notes': holes(rng.choice(['', ' ', 'ok', 'check later', 'N/A'], rows), 0.6),
+        'mostly_empty': holes(rng.random(rows), 0.95),
+    })
+
+
+def date_heavy(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Dates and timestamps in the formats users upload"""
+    base = pd.Timestamp('2020-01-01')
+    offsets = [pd.to_timedelta(rng.integers(0, 4 * 365 * 24 * 3600, rows), unit='s') for _ in range(4)]
+    return pd.DataFrame({
+        'created_at': (base + offsets[0]).strftime('%Y-%m-%d %H:%M:%S'),
+        'order_date': (base + offsets[1]).strftime('%Y-%m-%d'),
+        'ship_date': (base + offsets[2]).strftime('%m/%d/%Y'),
+        'due': (base + offsets[3]).strftime('%b %d %Y'),
+        'updated_at': base + offsets[0] + pd.to_timedelta(rng.integers(0, 3600, rows), unit='s'),
+        'amount': np.round(rng.random(rows) * 500, 2),
+    })
+
+
+SHAPES: Dict[str, Callable[[int, np.random.Generator], pd.DataFrame]] = {
+    'tall': tall,
+    'wide': wide,
+    'high_cardinality': high_cardinality,
+    'messy_nulls': messy_nulls,
+    'date_heavy': date_heavy,
+}
+
+
+def make_frame(shape: str, rows: int, seed: int = 0) -> pd.DataFrame:
+    return SHAPES[shape](rows, np.random.default_rng(seed))
+
+
+def supports(shape: str, file_format: str, rows: int) -> Optional[str]:
+    """Reason a shape cannot be written in a format, or None if it can"""
+    if file_format != 'xls':
+        return None
+    if xlwt is None:
+        return "xlwt is not installed"
+    frame = make_frame(shape, 1)
+    if rows > XLS_MAX_ROWS or len(frame.columns) > XLS_MAX_COLUMNS:
+        return f"exceeds the XLS limit of {XLS_MAX_ROWS} rows and {XLS_MAX_COLUMNS} columns"
+    return None
+
+
+def dataset_path(data_dir: str, shape: str, rows: int, file_format: str, seed: int = 0) -> str:
+    """Generate the dataset file once and reuse it on later runs"""
+    path = os.path.join(data_dir, f'{shape}-{rows}-s{seed}.{file_format}')
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        tmp_path = os.path.join(data_dir, f'.{os.getpid()}-{os.path.basename(path)}')
+        write_frame(make_frame(shape, rows, seed), tmp_path, file_format)
+        os.replace(tmp_path, path)
+    return path
+
+
+def write_frame(df: pd.DataFrame, path: str, file_format: str):
+    if file_format == 'csv':
+        df.to_csv(path, index=False)
+    elif file_format == 'xlsx':
+        df.to_excel(path, index=False, engine='openpyxl')
+    elif file_format == 'xls':
+        _write_xls(df, path)
+    else:
+        raise ValueError(f"Unknown format: {file_format}")
+
+
+def _write_xls(df: pd.DataFrame, path: str):
+    """pandas dropped its XLS writer, so cells are written with xlwt directly"""
+    workbook = xlwt.Workbook()
+    sheet = workbook.add_sheet('Sheet1')
+    date_style = xlwt.easyxf(num_format_str='yyyy-mm-dd hh:mm:ss')
+    for col, name in enumerate(df.columns):
+        sheet.write(0, col, str(name))
+    for col, name in enumerate(df.columns):
+        for row, value in enumerate(df[name].tolist(), start=1):
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                continue
+            if isinstance(value, datetime.datetime):
+                sheet.write(row, col, value.to_pydatetime() if isinstance(value, pd.Timestamp) else value, date_style)
+            elif isinstance(value, (np.integer, np.floating)):
+                sheet.write(row, col, value.item())
+            else:
+                sheet.write(row, col, value)
+    workbook.save(path)
@@ -0,0 +1,133 @@
+# backend/benchmarks/stand_ins.py
+"""
+In-process replacements for the OpenAI and Supabase clients, so the
+benchmarks measure this service and not the network. They implement only
+the calls the backend makes.
+"""
+import os
+import time
+import asyncio
+import hashlib
+import tempfile
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from storage import DownloadedFile, FileTooLargeError
+
+CANNED_INSIGHTS = """Key insights:
+- Sales are concentrated in a few regions.
+- Order values are right-skewed with a long tail.
+
+Recommended charts:
+- A bar chart of total amount by region.
+- A line chart of orders over time.
+- A histogram of order amounts.
+"""
+
+
+def _completion(content: str) -> SimpleNamespace:
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class LocalOpenAI:
+    """Answers chat completions with a fixed response after `latency` seconds"""
+
+    def __init__(self, latency: float = 0.0, content: str = CANNED_INSIGHTS):
+        self.latency = latency
+        self.requests: List[Dict[str, Any]] = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self._content = content
+
+    def _create(self, **kwargs) -> SimpleNamespace:
+        self.requests.append(kwargs)
+        if self.latency:
+            time.sleep(self.latency)
+        return _completion(self._content)
+
+
+class LocalAsyncOpenAI(LocalOpenAI):
+    async def _create(self, **kwargs) -> SimpleNamespace:
+        self.requests.append(kwargs)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return _completion(self._content)
+
+
+class _Response:
+    def __init__(self, data: List[Dict[str, Any]]):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, rows: Dict[str, Dict[str, Any]]):
+        self._rows = rows
+        self._update: Optional[Dict[str, Any]] = None
+        self._filters: List[tuple] = []
+
+    def select(self, columns: str = '*') -> '_Query':
+        return self
+
+    def update(self, data: Dict[str, Any]) -> '_Query':
+        self._update = data
+        return self
+
+    def eq(self, column: str, value: Any) -> '_Query':
+        self._filters.append((column, value))
+        return self
+
+    async def execute(self) -> _Response:
+        matched = [row for row in self._rows.values()
+                   if all(row.get(column) == value for column, value in self._filters)]
+        if self._update is not None:
+            for row in matched:
+                row.update(self._update)
+        return _Response([dict(row) for row in matched])
+
+
+class LocalSupabase:
+    """Table API over a dict of rows keyed by id (the same rows for every table)"""
+
+    def __init__(self, rows: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.rows = rows if rows is not None else {}
+
+    def table(self, name: str) -> _Query:
+        return _Query(self.rows)
+
+
+class LocalStorage:
+    """
+    Drop-in for StorageClient serving objects from local files, with the
+    same in-memory / temp-file split as real downloads
+    """
+
+    def __init__(self, objects: Optional[Dict[str, str]] = None):
+        self.objects = objects if objects is not None else {}
+
+    async def object_version(self, storage_path: str) -> Optional[str]:
+        source = self.objects.get(storage_path)
+        if source is None or not os.path.exists(source):
+            return None
+        stat = os.stat(source)
+        return f"{stat.st_size}@{stat.st_mtime_ns}"
+
+    async def download_to(self, storage_path: str, temp_dir: str, suffix: str = '',
+                          max_bytes: Optional[int] = None,
+                          memory_threshold: int = 0) -> Optional[DownloadedFile]:
+        source = self.objects.get(storage_path)
+        if source is None:
+            return None
+        with open(source, 'rb') as f:
+            content = f.read()
+        if max_bytes is not None and len(content) > max_bytes:
+            raise FileTooLargeError(f"{storage_path} is larger than {max_bytes} bytes")
+        content_hash = hashlib.sha256(content).hexdigest()
+        version = await self.object_version(storage_path)
+        if len(content) <= memory_threshold:
+            return DownloadedFile(content_hash, len(content), content=content, version=version)
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=temp_dir)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        return DownloadedFile(content_hash, len(content), path=path, version=version)
+
+    async def close(self):
+        pass
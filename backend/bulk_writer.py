@@ -0,0 +1,76 @@
+# backend/bulk_writer.py
+import asyncio
+import logging
+from typing import Dict, Any, List, Set, Tuple, Callable, Awaitable, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class BulkWriter:
+    """
+    Coalesces row updates that arrive close together into one flush.
+
+    Callers await `write`, which resolves once the flush containing their
+    update has completed. A flush happens when `max_batch` updates are
+    pending or `max_delay` seconds after the first pending update.
+    """
+
+    def __init__(
+        self,
+        write_many: Callable[[List[Tuple[str, Dict[str, Any]]]], Awaitable[None]],
+        max_batch: int = 25,
+        max_delay: float = 0.25
+    ):
+        self.write_many = write_many
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks, so running flushes are held here
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def write(self, row_id: str, update_data: Dict[str, Any]):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((row_id, update_data, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush_soon(0)
+        elif self._timer is None:
+            self._flush_soon(self.max_delay)
+        await future
+
+    def _flush_soon(self, delay: float):
+        if self._timer is not None:
+            self._timer.cancel()
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(delay, self._start_flush)
+
+    def _start_flush(self):
+        task = asyncio.ensure_future(self.flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def close(self):
+        """Flush what is pending and wait for flushes already running"""
+        if self._timer is not None:
+            self._timer.cancel()
+        await self.flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def flush(self):
+        self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            await self.write_many([(row_id, data) for row_id, data, _ in pending])
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_result(None)
+        except Exception as e:
+            logger.error(f"Error flushing {len(pending)} updates: {str(e)}")
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
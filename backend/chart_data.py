@@ -0,0 +1,250 @@
+# backend/chart_data.py
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional
+from aggregation import aggregate, AggregationError
+from sampling import sample_frame
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HISTOGRAM_BINS = 20
+MAX_HISTOGRAM_COLUMNS = 20
+TOP_CATEGORIES = 10
+MAX_TIME_SERIES_COLUMNS = 2
+MAX_TIME_SERIES_MEASURES = 3
+MAX_CORRELATION_COLUMNS = 20
+CORRELATION_BLOCK_ROWS = 65536
+SCATTER_SAMPLE_ROWS = 500
+SCATTER_SAMPLE_COLUMNS = 6
+# Time series resampling frequencies, finest first, with their length in days
+TIME_SERIES_FREQUENCIES = (('D', 'day', 1), ('W', 'week', 7), ('M', 'month', 30.4), ('Q', 'quarter', 91.3),
+                           ('Y', 'year', 365.25))
+
+
+def materialize_charts(df: Optional[pd.DataFrame], stats: Dict[str, Any], data_preview: Dict[str, Any],
+                       roles: Dict[str, str], chart_specs: List[Dict[str, Any]],
+                       max_rows: int = 1000000, max_points: int = 500,
+                       co_moments: Optional["CoMoments"] = None,
+                       scatter_rows: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+    """
+    Chart-ready data computed while the table is in memory, so suggested
+    charts render without another pass over the data: histograms of numeric
+    columns, top category counts, time series over date columns, the
+    correlation matrix of the measures, a scatter sample, and the series of
+    every chart spec in the shape the aggregate endpoint returns.
+
+    `df` may be a uniform sample, and is sampled down to `max_rows`; counts
+    and sums are then scaled to stats["row_count"]. Without a table only the
+    category counts from the profile are available, plus the correlation and
+    scatter charts when a streaming pass collected `co_moments` and a
+    `scatter_rows` sample of the numeric columns.
+    """
+    row_count = stats.get("row_count", 0)
+    charts: Dict[str, Any] = {
+        # The profile's counts cover the table passed in, which may itself be a sample
+        "top_categories": _top_categories(data_preview, roles, row_count / len(df) if df is not None and len(df) else 1.0),
+        "histograms": {},
+        "time_series": {},
+        "correlation": None,
+        "scatter_sample": None,
+        # Specs without data are left to the aggregate endpoint
+        "specs": [{**spec, "data": None} for spec in chart_specs],
+        "sampled": False,
+    }
+    if df is None or len(df) == 0:
+        return _streamed_charts(charts, roles, co_moments, scatter_rows, max_points)
+
+    if len(df) > max_rows:
+        df = sample_frame(df, max_rows, seed=0)
+    scale = row_count / len(df) if row_count else 1.0
+    measures = [name for name, role in roles.items() if role == 'measure' and name in df.columns]
+    numeric = [name for name in stats.get("numeric_columns", []) if name in df.columns]
+
+    charts["histograms"] = {
+        name: _histogram(df[name], scale) for name in numeric[:MAX_HISTOGRAM_COLUMNS]
+    }
+    dates = [name for name, role in roles.items() if role == 'date' and name in df.columns]
+    charts["time_series"] = {
+        name: _time_series(df, name, measures[:MAX_TIME_SERIES_MEASURES], scale, max_points)
+        for name in dates[:MAX_TIME_SERIES_COLUMNS]
+    }
+    if len(measures) >= 2:
+        columns = measures[:MAX_CORRELATION_COLUMNS]
+        charts["correlation"] = {"columns": columns, "matrix": _rounded(correlation_matrix(df, columns))}
+        charts["scatter_sample"] = _scatter_sample(df, measures[:SCATTER_SAMPLE_COLUMNS])
+    charts["specs"] = [_spec_series(df, spec, charts, scale, max_points) for spec in chart_specs]
+    charts["sampled"] = scale != 1.0
+    return charts
+
+
+class CoMoments:
+    """
+    Mergeable pairwise-complete co-moments of numeric columns: for every
+    pair, the rows where both are present, their sums, sums of squares and
+    sum of products. Pearson correlations follow exactly as DataFrame.corr()
+    computes them, from any number of row blocks.
+    """
+
+    def __init__(self, columns: List[str]):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.counts = np.zeros((k, k))
+        self.sums = np.zeros((k, k))     # sums[i, j]: sum of column i over rows where j is present
+        self.squares = np.zeros((k, k))
+        self.products = np.zeros((k, k))
+
+    def update(self, frame: pd.DataFrame):
+        """Add a block of rows; values that are not numbers, and columns the block lacks, count as missing"""
+        block = np.column_stack([
+            pd.to_numeric(frame[name], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+            if name in frame.columns else np.full(len(frame), np.nan)
+            for name in self.columns
+        ])
+        present = ~np.isnan(block)
+        values = np.where(present, block, 0.0)
+        weights = present.astype('float64')
+        self.counts += weights.T @ weights
+        self.sums += values.T @ weights
+        self.squares += (values ** 2).T @ weights
+        self.products += values.T @ values
+
+    def merge(self, other: "CoMoments"):
+        self.counts += other.counts
+        self.sums += other.sums
+        self.squares += other.squares
+        self.products += other.products
+
+    def correlation(self, columns: Optional[List[str]] = None) -> np.ndarray:
+        """Correlation matrix of `columns` (all tracked columns by default)"""
+        idx = np.array([self.columns.index(name) for name in columns], dtype=int) if columns is not None \
+            else np.arange(len(self.columns))
+        counts, sums = self.counts[np.ix_(idx, idx)], self.sums[np.ix_(idx, idx)]
+        squares, products = self.squares[np.ix_(idx, idx)], self.products[np.ix_(idx, idx)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = counts * products - sums * sums.T
+            variance = counts * squares - sums ** 2
+            matrix = covariance / np.sqrt(variance * variance.T)
+        matrix[counts < 2] = np.nan
+        np.fill_diagonal(matrix, np.where(np.diag(variance) > 0, 1.0, np.nan))
+        return np.clip(matrix, -1.0, 1.0)
+
+
+def correlation_matrix(df: pd.DataFrame, columns: List[str], block_rows: int = CORRELATION_BLOCK_ROWS) -> np.ndarray:
+    """
+    Pearson correlations over pairwise-complete rows, like DataFrame.corr(),
+    accumulated from blocks of rows so memory stays bounded by the block size
+    """
+    co_moments = CoMoments(columns)
+    for start in range(0, len(df), block_rows):
+        co_moments.update(df.iloc[start:start + block_rows])
+    return co_moments.correlation()
+
+
+def _streamed_charts(charts: Dict[str, Any], roles: Dict[str, str], co_moments: Optional[CoMoments],
+                     scatter_rows: Optional[pd.DataFrame], max_points: int) -> Dict[str, Any]:
+    """Correlation, scatter sample and the scatter and heatmap specs, from a streaming pass without the table"""
+    if co_moments is None or scatter_rows is None:
+        return charts
+    measures = [name for name, role in roles.items() if role == 'measure' and name in co_moments.columns]
+    if len(measures) >= 2:
+        columns = measures[:MAX_CORRELATION_COLUMNS]
+        charts["correlation"] = {"columns": columns, "matrix": _rounded(co_moments.correlation(columns))}
+        charts["scatter_sample"] = _scatter_sample(scatter_rows, measures[:SCATTER_SAMPLE_COLUMNS])
+    charts["specs"] = [
+        _spec_series(scatter_rows, spec, charts, 1.0, max_points) if spec["chart_type"] in ('scatter', 'heatmap') else spec
+        for spec in charts["specs"]
+    ]
+    return charts
+
+
+def _top_categories(data_preview: Dict[str, Any], roles: Dict[str, str], scale: float) -> Dict[str, List[Dict[str, Any]]]:
+    """Most frequent values of the dimension columns, straight from the profile"""
+    return {
+        info["name"]: [{"value": entry["value"], "count": int(round(entry["count"] * scale))}
+                       for entry in info["top_values"][:TOP_CATEGORIES]]
+        for info in data_preview.get("columns_info", [])
+        if roles.get(info["name"]) == 'dimension' and info.get("top_values")
+    }
+
+
+def _histogram(series: pd.Series, scale: float) -> List[Dict[str, Any]]:
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return []
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+    return [
+        {"bin_start": float(edges[i]), "bin_end": float(edges[i + 1]), "count": int(round(counts[i] * scale))}
+        for i in range(len(counts))
+    ]
+
+
+def _time_series(df: pd.DataFrame, date_column: str, measures: List[str],
+                 scale: float, max_points: int) -> Dict[str, Any]:
+    """Row counts and measure totals per period, at the finest frequency with at most `max_points` periods"""
+    dates = df[date_column]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, errors='coerce')
+    valid = dates.notna().to_numpy()
+    if not valid.any():
+        return {"frequency": None, "points": []}
+    span_days = (dates.max() - dates.min()).days
+    freq, period_name, _ = next(
+        (entry for entry in TIME_SERIES_FREQUENCIES if span_days / entry[2] < max_points), TIME_SERIES_FREQUENCIES[-1]
+    )
+    periods = dates[valid].dt.to_period(freq)
+    frame = pd.DataFrame({"rows": np.ones(int(valid.sum()))}, index=periods.index)
+    for name in measures:
+        frame[name] = pd.to_numeric(df[name], errors='coerce')[valid]
+    totals = frame.groupby(periods).sum(min_count=1).sort_index() * scale
+    totals["rows"] = totals["rows"].round()
+    points = [
+        {"x": period.start_time.isoformat(), **{name: _number(value) for name, value in row.items()}}
+        for period, row in zip(totals.index, totals.to_dict('records'))
+    ]
+    return {"frequency": period_name, "points": points}
+
+
+def _scatter_sample(df: pd.DataFrame, columns: List[str]) -> Dict[str, Any]:
+    sample = sample_frame(df[columns], SCATTER_SAMPLE_ROWS, seed=0) if len(df) > SCATTER_SAMPLE_ROWS else df[columns]
+    rows = [[_number(value) for value in row]
+            for row in sample.apply(pd.to_numeric, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)]
+    return {"columns": columns, "rows": rows}
+
+
+def _spec_series(df: pd.DataFrame, spec: Dict[str, Any], charts: Dict[str, Any],
+                 scale: float, max_points: int) -> Dict[str, Any]:
+    """A chart spec with its data: aggregate-endpoint series, or the correlation matrix for heatmaps"""
+    if spec["chart_type"] == 'heatmap':
+        return {**spec, "data": charts["correlation"]}
+    agg = spec["agg"] if spec["agg"] != 'none' else 'sum'
+    try:
+        data = aggregate(
+            df, x_column=spec["x_column"], y_column=spec["y_column"], agg=agg,
+            chart_type=spec["chart_type"], max_points=max_points
+        )
+    except (AggregationError, KeyError, TypeError, ValueError) as e:
+        logger.error(f"Error materializing chart {spec['title']}: {str(e)}")
+        return {**spec, "data": None}
+
+    # Counts and totals of a sample stand for the whole table
+    if scale != 1.0 and (spec["chart_type"] == 'histogram' or agg in ('sum', 'count')) and spec["chart_type"] != 'scatter':
+        for series in data["series"]:
+            for point in series["points"]:
+                if point["y"] is not None:
+                    point["y"] = point["y"] * scale if isinstance(point["y"], float) else int(round(point["y"] * scale))
+        data["total_rows"] = data["filtered_rows"] = int(round(data["total_rows"] * scale))
+    return {**spec, "data": data}
+
+
+def _rounded(matrix: np.ndarray) -> List[List[Optional[float]]]:
+    return [[_number(value, 4) for value in row] for row in matrix]
+
+
+def _number(value: Any, digits: int = 6) -> Optional[float]:
+    if value is None or (isinstance(value, float) and not np.isfinite(value)):
+        return None
+    return round(float(value), digits)
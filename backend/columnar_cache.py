@@ -0,0 +1,311 @@
+# backend/columnar_cache.py
+import os
+import json
+import hashlib
+import logging
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Iterator, List, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bump when parsing changes in a way that makes previously cached tables stale
+PARSER_VERSION = "3"
+
+# Schema metadata key holding the DataFrame's attrs (e.g. the typed-loading memory report)
+ATTRS_KEY = b"instagraph.attrs"
+
+# Schema metadata key marking tables written chunk by chunk during a streaming profile
+STREAMED_KEY = b"instagraph.streamed"
+
+
+def hash_file(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file on disk, read in blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_bytes(content: bytes) -> str:
+    """SHA-256 of in-memory file content"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def sheet_suffix(sheet_name: Optional[str]) -> str:
+    """Cache key part for a non-default workbook sheet; names are hashed to stay filename-safe"""
+    if sheet_name is None:
+        return ""
+    return "-sheet" + hashlib.sha256(sheet_name.encode('utf-8')).hexdigest()[:12]
+
+
+class ColumnarCache:
+    """
+    Content-addressed Parquet cache of parsed tables.
+
+    Entries are keyed by the SHA-256 of the source bytes, the file type,
+    PARSER_VERSION and whether tables are loaded with compact dtypes. Reads
+    are memory-mapped and can be limited to a subset of columns. The
+    directory is kept under `max_size_mb` by evicting the least recently used
+    entries.
+    """
+
+    def __init__(self, cache_dir: str, max_size_mb: float, typed_loading: bool = True):
+        self.cache_dir = cache_dir
+        self.typed_loading = typed_loading
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key_for(self, content_hash: str, file_type: str, sheet_name: Optional[str] = None) -> str:
+        loading = "typed" if self.typed_loading else "plain"
+        return f"{content_hash}-{file_type}{sheet_suffix(sheet_name)}-{loading}-v{PARSER_VERSION}"
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def has(self, key: str) -> bool:
+        return os.path.exists(self.path_for(key))
+
+    def columns(self, key: str) -> Optional[List[str]]:
+        """Column names of a cached table, read from the Parquet footer only"""
+        try:
+            return pq.read_schema(self.path_for(key), memory_map=True).names
+        except (FileNotFoundError, OSError):
+            return None
+
+    def load(self, key: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Load a cached table, reading only the requested columns"""
+        path = self.path_for(key)
+        try:
+            table = pq.read_table(path, columns=columns, memory_map=True)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error reading cached table {key}: {str(e)}")
+            return None
+
+        self._touch(path)
+        return self._to_pandas(table)
+
+    def store(self, key: str, df: pd.DataFrame) -> bool:
+        """Persist a parsed table; returns False if it could not be converted to Arrow"""
+        path = self.path_for(key)
+        try:
+            table = self._to_arrow(df)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error caching table {key}: {str(e)}")
+            return False
+
+        self._evict()
+        return True
+
+    def writer(self, key: str) -> "TableWriter":
+        """Writer that stores a table under `key` one chunk at a time"""
+        return TableWriter(self, key)
+
+    def is_streamed(self, key: str) -> bool:
+        """Whether a cached table was written chunk by chunk by a streaming profile"""
+        try:
+            return STREAMED_KEY in (pq.read_schema(self.path_for(key), memory_map=True).metadata or {})
+        except (FileNotFoundError, OSError):
+            return False
+
+    def iter_frames(self, key: str, rows: int) -> Iterator[pd.DataFrame]:
+        """Read a cached table in frames of up to `rows` rows"""
+        path = self.path_for(key)
+        self._touch(path)
+        for batch in pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=rows):
+            yield batch.to_pandas()
+
+    def invalidate(self, key: str):
+        try:
+            os.unlink(self.path_for(key))
+        except FileNotFoundError:
+            pass
+
+    def _to_arrow(self, df: pd.DataFrame) -> pa.Table:
+        attrs = df.attrs
+        df = df.rename(columns=str)
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed-type object columns (e.g. numbers and text) are stored as text
+            df = df.copy()
+            for col in df.select_dtypes(include=['object']).columns:
+                df[col] = df[col].map(lambda v: v if v is None or isinstance(v, str) or pd.isna(v) else str(v))
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        if attrs:
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), ATTRS_KEY: json.dumps(attrs, default=str)})
+        return table
+
+    def _to_pandas(self, table: pa.Table) -> pd.DataFrame:
+        """
+        Convert a cached table back to the frame that was stored. Arrow-backed
+        string columns are wrapped without copying instead of coming back as
+        Python strings.
+        """
+        pandas_columns = (table.schema.pandas_metadata or {}).get('columns', [])
+        if pandas_columns:
+            strings = [col['field_name'] for col in pandas_columns
+                       if col.get('numpy_type') == 'string' and col['field_name'] in table.column_names]
+        else:
+            # Streamed tables carry no pandas metadata; all their text is Arrow strings
+            strings = [field.name for field in table.schema if pa.types.is_string(field.type)]
+        df = table.drop(strings).to_pandas() if strings else table.to_pandas()
+        for name in strings:
+            df[name] = pd.arrays.ArrowStringArray(table.column(name))
+        if strings:
+            df = df[table.column_names]
+        metadata = table.schema.metadata or {}
+        if ATTRS_KEY in metadata:
+            df.attrs = json.loads(metadata[ATTRS_KEY])
+        return df
+
+    def _touch(self, path: str):
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits its size cap"""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.parquet'):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_size_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                    total -= size
+                    logger.info(f"Evicted cached table {os.path.basename(path)}")
+                except FileNotFoundError:
+                    pass
+
+
+class TableWriter:
+    """
+    Stores a table in the columnar cache chunk by chunk, one row group per
+    chunk, so a file profiled in a streaming pass is cached without ever
+    being held in memory.
+
+    Chunks are cast to the schema of the first one. A chunk whose columns
+    were parsed as a wider type (floats after integers, text after numbers)
+    starts a new part file; `close()` then rewrites the parts under one
+    schema, numbers as float64 and mixed columns as text. Nothing is visible
+    in the cache until `close()` succeeds.
+    """
+
+    def __init__(self, cache: ColumnarCache, key: str):
+        self.cache = cache
+        self.key = key
+        self.rows = 0
+        self._parts: List[str] = []
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._schema: Optional[pa.Schema] = None
+
+    def write(self, chunk: pd.DataFrame):
+        table = pa.Table.from_pandas(chunk.rename(columns=str), preserve_index=False)
+        table = table.replace_schema_metadata({STREAMED_KEY: b"1"})
+        if self._writer is not None:
+            try:
+                table = table.cast(self._schema)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                self._writer.close()
+                self._writer = None
+        if self._writer is None:
+            self._schema = table.schema
+            self._parts.append(f"{self.cache.path_for(self.key)}.{os.getpid()}.part{len(self._parts)}")
+            self._writer = pq.ParquetWriter(self._parts[-1], self._schema)
+        self._writer.write_table(table)
+        self.rows += len(chunk)
+
+    def copy_from(self, key: str, rows: int) -> bool:
+        """Start the table with a cached table's rows (e.g. the file this one appends to)"""
+        if not self.cache.has(key):
+            return False
+        for frame in self.cache.iter_frames(key, rows):
+            self.write(frame)
+        return True
+
+    def close(self) -> bool:
+        """Move the written table into the cache; returns False if nothing could be stored"""
+        if self._writer is None:
+            return False
+        self._writer.close()
+        self._writer = None
+        path = self.cache.path_for(self.key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            self._merge_parts(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error caching streamed table {self.key}: {str(e)}")
+            self._remove(tmp_path)
+            return False
+        finally:
+            for part in self._parts:
+                self._remove(part)
+            self._parts = []
+        self.cache._evict()
+        return True
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for part in self._parts:
+            self._remove(part)
+        self._parts = []
+
+    def _merge_parts(self, tmp_path: str):
+        if len(self._parts) == 1:
+            # One schema throughout: the part is the table
+            os.replace(self._parts[0], tmp_path)
+            return
+        files = [pq.ParquetFile(part) for part in self._parts]
+        schema = _widest_schema([f.schema_arrow for f in files]).with_metadata({STREAMED_KEY: b"1"})
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            for f in files:
+                for i in range(f.num_row_groups):
+                    writer.write_table(f.read_row_group(i).cast(schema))
+
+    def _remove(self, path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def _widest_schema(schemas: List[pa.Schema]) -> pa.Schema:
+    """One schema all parts cast to: a shared type, float64 for mixed numbers, otherwise text"""
+    fields = []
+    for name in schemas[0].names:
+        types = {schema.field(name).type for schema in schemas}
+        types.discard(pa.null())
+        if len(types) == 1:
+            fields.append(pa.field(name, types.pop()))
+        elif types and all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in types):
+            fields.append(pa.field(name, pa.float64()))
+        else:
+            fields.append(pa.field(name, pa.string()))
+    return pa.schema(fields)
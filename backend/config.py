@@ -17,5 +17,98 @@ API_HOST = os.getenv("API_HOST", "0.0.0.0")
 API_PORT = int(os.getenv("API_PORT", "8000"))
 
 # File Processing Configuration
-MAX_FILE_SIZE_MB = 10
+# Downloads above this size are rejected; keep it above the streaming and sampling thresholds
+MAX_FILE_SIZE_MB = float(os.getenv("MAX_FILE_SIZE_MB", "1024"))
+# Downloads up to this size are parsed from memory without a temp file
+IN_MEMORY_MAX_MB = float(os.getenv("IN_MEMORY_MAX_MB", "4"))
 TEMP_DIR = os.getenv("TEMP_DIR", "/tmp")
+
+# Streaming profiler: CSVs above this size are profiled in chunks
+STREAMING_THRESHOLD_MB = float(os.getenv("STREAMING_THRESHOLD_MB", "50"))
+STREAMING_CHUNK_ROWS = int(os.getenv("STREAMING_CHUNK_ROWS", "50000"))
+
+# Column summaries: full distinct-value lists are only stored below this cardinality
+UNIQUE_VALUES_THRESHOLD = int(os.getenv("UNIQUE_VALUES_THRESHOLD", "100"))
+TOP_VALUES_K = int(os.getenv("TOP_VALUES_K", "20"))
+
+# Columnar cache of parsed tables (Parquet), evicted LRU above the size cap
+COLUMNAR_CACHE_DIR = os.getenv("COLUMNAR_CACHE_DIR", os.path.join(TEMP_DIR, "instagraph-columnar-cache"))
+COLUMNAR_CACHE_MAX_MB = float(os.getenv("COLUMNAR_CACHE_MAX_MB", "2048"))
+# Tables laid out for paged row access, with their persisted sort orders
+ROW_STORE_DIR = os.getenv("ROW_STORE_DIR", os.path.join(TEMP_DIR, "instagraph-row-store"))
+ROW_STORE_MAX_MB = float(os.getenv("ROW_STORE_MAX_MB", "4096"))
+# Sorted/filtered row views kept in memory for paging
+ROW_VIEW_CACHE_ENTRIES = int(os.getenv("ROW_VIEW_CACHE_ENTRIES", "32"))
+# Columns whose sorted distinct values are kept in memory for paging
+DISTINCT_VALUES_CACHE_ENTRIES = int(os.getenv("DISTINCT_VALUES_CACHE_ENTRIES", "32"))
+# Streaming profiler state of large CSVs, so appended versions are profiled from it
+PROFILE_CHECKPOINT_DIR = os.getenv("PROFILE_CHECKPOINT_DIR", os.path.join(TEMP_DIR, "instagraph-profile-checkpoints"))
+PROFILE_CHECKPOINT_MAX_MB = float(os.getenv("PROFILE_CHECKPOINT_MAX_MB", "2048"))
+
+# Processing result cache: in-process LRU plus on-disk tier
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", os.path.join(TEMP_DIR, "instagraph-result-cache"))
+RESULT_CACHE_MEMORY_ENTRIES = int(os.getenv("RESULT_CACHE_MEMORY_ENTRIES", "128"))
+RESULT_CACHE_MAX_MB = float(os.getenv("RESULT_CACHE_MAX_MB", "512"))
+
+# Worker processes for CPU-bound parsing and profiling
+PROCESS_POOL_WORKERS = int(os.getenv("PROCESS_POOL_WORKERS", str(os.cpu_count() or 2)))
+
+# Durable processing queue
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join(TEMP_DIR, "instagraph-jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "100"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF_SECONDS = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "2"))
+# Finished jobs are deleted this long after their last update; 0 keeps them
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+
+# Batch processing: pooled storage downloads and grouped result writes
+STORAGE_DOWNLOAD_CONCURRENCY = int(os.getenv("STORAGE_DOWNLOAD_CONCURRENCY", "8"))
+DB_WRITE_CONCURRENCY = int(os.getenv("DB_WRITE_CONCURRENCY", "8"))
+BATCH_WRITE_SIZE = int(os.getenv("BATCH_WRITE_SIZE", "25"))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "100"))
+
+# Processing progress pushed to Server-Sent Events subscribers
+PROGRESS_HISTORY_EVENTS = int(os.getenv("PROGRESS_HISTORY_EVENTS", "50"))
+PROGRESS_SUBSCRIBER_QUEUE = int(os.getenv("PROGRESS_SUBSCRIBER_QUEUE", "100"))
+PROGRESS_RETENTION_SECONDS = float(os.getenv("PROGRESS_RETENTION_SECONDS", "600"))
+PROGRESS_KEEPALIVE_SECONDS = float(os.getenv("PROGRESS_KEEPALIVE_SECONDS", "15"))
+
+# Parser backends: "auto" picks the fastest available engine for each file
+CSV_ENGINE = os.getenv("CSV_ENGINE", "auto")  # auto | pyarrow | c
+EXCEL_ENGINE = os.getenv("EXCEL_ENGINE", "auto")  # auto | calamine | default
+# Below this size the C parser beats pyarrow's thread-pool startup cost
+CSV_ARROW_MIN_KB = float(os.getenv("CSV_ARROW_MIN_KB", "256"))
+
+# Duplicate detection: exact up to this many distinct rows, then a Bloom filter of DUPLICATES_BLOOM_MB
+DUPLICATES_EXACT_MAX_ROWS = int(os.getenv("DUPLICATES_EXACT_MAX_ROWS", "5000000"))
+DUPLICATES_BLOOM_MB = float(os.getenv("DUPLICATES_BLOOM_MB", "32"))
+
+# Sampled processing: above these sizes results are estimated from a uniform row sample
+# (an exact recompute is queued afterwards); requests can also ask for "exact" or "sampled"
+SAMPLING_THRESHOLD_MB = float(os.getenv("SAMPLING_THRESHOLD_MB", "200"))
+SAMPLING_THRESHOLD_ROWS = int(os.getenv("SAMPLING_THRESHOLD_ROWS", "2000000"))
+SAMPLE_ROWS = int(os.getenv("SAMPLE_ROWS", "100000"))
+SAMPLE_CONFIDENCE = float(os.getenv("SAMPLE_CONFIDENCE", "0.95"))
+
+# Typed loading: text columns become categories or Arrow strings, numbers are downcast
+# and date columns parsed; dtypes are chosen from the first TYPE_INFERENCE_SAMPLE_ROWS rows
+TYPED_LOADING = os.getenv("TYPED_LOADING", "true").lower() in ("1", "true", "yes")
+TYPE_INFERENCE_SAMPLE_ROWS = int(os.getenv("TYPE_INFERENCE_SAMPLE_ROWS", "10000"))
+# Text columns with at most this share of distinct values are stored as categories
+CATEGORY_MAX_RATIO = float(os.getenv("CATEGORY_MAX_RATIO", "0.5"))
+
+# Local insights are computed from at most this many (sampled) rows
+LOCAL_INSIGHTS_MAX_ROWS = int(os.getenv("LOCAL_INSIGHTS_MAX_ROWS", "50000"))
+# Precomputed chart data is computed from at most this many (sampled) rows
+CHART_MAX_ROWS = int(os.getenv("CHART_MAX_ROWS", "1000000"))
+
+# LLM calls: responses cached by normalized prompt fingerprint, concurrency and
+# estimated tokens per minute bounded below the account's rate limits
+LLM_CACHE_ENTRIES = int(os.getenv("LLM_CACHE_ENTRIES", "512"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "40000"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+# Estimated tokens of dataset description sent to the LLM, however wide the table
+AI_PROMPT_TOKEN_BUDGET = int(os.getenv("AI_PROMPT_TOKEN_BUDGET", "1500"))
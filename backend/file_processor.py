@@ -1,71 +1,530 @@
 # backend/file_processor.py
 import pandas as pd
-import openpyxl
-import xlrd
-import json
 import os
-from typing import Dict, Any, Optional, Tuple
-from openai import OpenAI
+import io
+import dataclasses
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Union, BinaryIO, Callable
+from openai import AsyncOpenAI
 import logging
 from datetime import datetime
+import streaming_profiler
+import sketches
+import readers
+import table_profile
+import sampling
+import type_inference
+import local_insights
+import prompt_summary
+import aggregation
+import chart_data
+from streaming_profiler import StreamingProfiler, ProfileState
+from sketches import DuplicateCounter, SortedValues
+from table_profile import TableProfile, build_table_profile
+from sampling import sample_csv, sample_frame, scale_count, count_interval, confidence_intervals
+from columnar_cache import ColumnarCache, hash_file, hash_bytes
+from profile_checkpoints import ProfileCheckpoints
+from stage_timings import StageTimings
+from local_insights import generate_local_insights
+from llm_client import LLMGateway, LLMResponseCache, prompt_fingerprint
+from prompt_summary import summarize_for_prompt
+from chart_data import materialize_charts
+from result_cache import source_fingerprint
+from config import (
+    STREAMING_THRESHOLD_MB, STREAMING_CHUNK_ROWS, UNIQUE_VALUES_THRESHOLD, TOP_VALUES_K,
+    COLUMNAR_CACHE_DIR, COLUMNAR_CACHE_MAX_MB, CSV_ENGINE, EXCEL_ENGINE, CSV_ARROW_MIN_KB,
+    DUPLICATES_EXACT_MAX_ROWS, DUPLICATES_BLOOM_MB, SAMPLING_THRESHOLD_MB, SAMPLING_THRESHOLD_ROWS,
+    SAMPLE_ROWS, SAMPLE_CONFIDENCE, TYPED_LOADING, TYPE_INFERENCE_SAMPLE_ROWS, CATEGORY_MAX_RATIO,
+    LOCAL_INSIGHTS_MAX_ROWS, LLM_CACHE_ENTRIES, LLM_CACHE_TTL_SECONDS, LLM_MAX_CONCURRENCY,
+    LLM_TOKENS_PER_MINUTE, LLM_MAX_RETRIES, AI_PROMPT_TOKEN_BUDGET, CHART_MAX_ROWS,
+    PROFILE_CHECKPOINT_DIR, PROFILE_CHECKPOINT_MAX_MB, DISTINCT_VALUES_CACHE_ENTRIES
+)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Changes automatically whenever the code that computes results changes,
+# which invalidates cached processing results
+PROCESSOR_VERSION = source_fingerprint(__file__, streaming_profiler.__file__, sketches.__file__, readers.__file__,
+                                       table_profile.__file__, sampling.__file__, type_inference.__file__,
+                                       local_insights.__file__, prompt_summary.__file__, aggregation.__file__,
+                                       chart_data.__file__)
+# Profile checkpoints hold pickled profiler state, so they depend on the classes that make it up
+CHECKPOINT_VERSION = source_fingerprint(streaming_profiler.__file__, sketches.__file__, chart_data.__file__, sampling.__file__)
+
+# "auto" samples files above the sampling thresholds and profiles everything else exactly
+PROCESSING_MODES = ('auto', 'exact', 'sampled')
+
+def _ignore_stage(stage: str, data: Dict[str, Any]):
+    pass
+
 class FileProcessor:
-    def __init__(self, openai_api_key: str):
-        self.openai_client = OpenAI(api_key=openai_api_key)
+    def __init__(self, openai_api_key: Optional[str] = None):
+        # Worker processes only profile files and are created without OpenAI clients
+        self.async_openai_client = AsyncOpenAI(api_key=openai_api_key, max_retries=LLM_MAX_RETRIES) if openai_api_key else None
+        self.llm = LLMGateway(
+            self.async_openai_client,
+            LLMResponseCache(LLM_CACHE_ENTRIES, LLM_CACHE_TTL_SECONDS), LLM_MAX_CONCURRENCY, LLM_TOKENS_PER_MINUTE
+        )
+        self.streaming_profiler = StreamingProfiler(
+            chunk_rows=STREAMING_CHUNK_ROWS,
+            max_tracked_unique=UNIQUE_VALUES_THRESHOLD,
+            top_k=TOP_VALUES_K,
+            duplicates_exact_limit=DUPLICATES_EXACT_MAX_ROWS,
+            duplicates_bloom_bits=int(DUPLICATES_BLOOM_MB * 8 * 1024 * 1024)
+        )
+        self.columnar_cache = ColumnarCache(COLUMNAR_CACHE_DIR, COLUMNAR_CACHE_MAX_MB, TYPED_LOADING)
+        self.profile_checkpoints = ProfileCheckpoints(PROFILE_CHECKPOINT_DIR, PROFILE_CHECKPOINT_MAX_MB, CHECKPOINT_VERSION)
+        # Sorted distinct values by (columnar cache key, column), most recently used last
+        self._distinct_values: "OrderedDict[Tuple[str, str], SortedValues]" = OrderedDict()
+        self._distinct_lock = threading.Lock()
         
-    def process_file(self, file_path: str, file_type: str) -> Dict[str, Any]:
+    def process_file(self, file_path: Optional[str], file_type: str, content_hash: Optional[str] = None,
+                     mode: str = 'auto') -> Dict[str, Any]:
         """
-        Process uploaded file and extract data insights
+        Process uploaded file and extract data insights.
+        
+        When the content hash of a previously parsed file is given, the table is
+        loaded from the columnar cache and file_path may be None. `mode` is one of
+        PROCESSING_MODES; sampled results carry "sampled": True.
         """
+        result = self.profile_file(file_path, file_type, content_hash, mode=mode)
+        if result["processing_status"] != "completed":
+            return result
+        
+        ai_context = result.pop("ai_context")
+        result["ai_insights"] = self._generate_ai_insights(ai_context["data_summary"], file_type, result["ai_insights"])
+        logger.info(f"Successfully processed file: {file_path}")
+        return result
+    
+    async def enrich_ai_insights_async(self, ai_insights: Dict[str, Any], ai_context: Dict[str, Any],
+                                       file_type: str) -> Dict[str, Any]:
+        """Merge LLM analysis into the local insights of a profile_file result, without blocking the event loop"""
+        return await self._generate_ai_insights_async(ai_context["data_summary"], file_type, ai_insights)
+    
+    def profile_file(self, file_path: Optional[str], file_type: str, content_hash: Optional[str] = None,
+                     content: Optional[bytes] = None, sheet_name: Optional[str] = None,
+                     mode: str = 'auto',
+                     on_stage: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        CPU-bound part of processing: parse the file and compute statistics and preview.
+        
+        Small files can be passed in memory as `content` instead of a file_path.
+        For workbooks, `sheet_name` selects a sheet other than the first.
+        "ai_insights" holds the local heuristic insights, marked as pending LLM
+        enrichment; the result also carries an "ai_context" entry with the prompt
+        summary, which is dropped once the enrichment has run. The time
+        and peak memory of each stage are recorded in metadata["timings"].
+        `on_stage` is called with the partial results of the "parsed" (row
+        and column counts, first rows) and "profiled" stages as they finish.
+        """
+        timings = StageTimings(track_memory=True)
+        result = self._profile_file(file_path, file_type, content_hash, content, sheet_name, mode, timings,
+                                    on_stage or _ignore_stage)
+        result.setdefault("metadata", {})["timings"] = timings.as_dict()
+        return result
+    
+    def _profile_file(self, file_path: Optional[str], file_type: str, content_hash: Optional[str],
+                      content: Optional[bytes], sheet_name: Optional[str], mode: str,
+                      timings: StageTimings, on_stage: Callable[[str, Dict[str, Any]], None]) -> Dict[str, Any]:
         try:
-            logger.info(f"Processing file: {file_path} of type: {file_type}")
+            logger.info(f"Processing file: {file_path} of type: {file_type} ({mode})")
+            if mode not in PROCESSING_MODES:
+                return self._create_error_result(f"Unknown processing mode: {mode}")
+            
+            metadata = {"content_hash": content_hash} if content_hash else {}
+            if sheet_name is not None:
+                metadata["sheet_name"] = sheet_name
+            
+            # A large CSV that appends rows to a checkpointed one is profiled from that checkpoint
+            base = None
+            streamable = file_path is not None and mode != 'sampled' and self._should_stream(file_path, file_type)
+            if streamable:
+                with timings.span("checkpoint_lookup"):
+                    base = self.profile_checkpoints.find_base(file_path)
+            
+            # Huge CSVs are sampled in one streaming pass, large ones profiled chunk by chunk
+            if base is None and file_path is not None and self._should_sample_file(file_path, file_type, mode):
+                with timings.span("sample"):
+                    sample, head, total_rows = sample_csv(file_path, SAMPLE_ROWS, STREAMING_CHUNK_ROWS)
+                if total_rows == 0:
+                    return self._create_error_result("File is empty or could not be read")
+                self._report_stage(on_stage, "parsed", self._parsed_summary(head, total_rows))
+                with timings.span("profile_sample"):
+                    result = self._profile_sample(sample, head, total_rows, metadata)
+                return self._report_profiled(on_stage, result)
+            if streamable:
+                # Parsing and profiling are one pass here
+                with timings.span("stream_profile"):
+                    result = self._profile_file_streaming(file_path, metadata, content_hash, base, on_stage)
+                return self._report_profiled(on_stage, result)
+            if file_path is None and content is None and mode != 'sampled' and \
+                    self._has_streamed_table(content_hash, file_type, sheet_name):
+                # A table cached by a streaming pass is profiled the same way, row group by row group
+                with timings.span("stream_profile"):
+                    result = self._profile_streamed_table(content_hash, file_type, metadata, on_stage)
+                return self._report_profiled(on_stage, result)
             
-            # Read the file based on type
-            df = self._read_file(file_path, file_type)
+            # Read the file based on type, reusing the cached parse when available
+            with timings.span("read"):
+                df = self._load_table(file_path, file_type, content_hash, content, sheet_name)
             
             if df is None or df.empty:
                 return self._create_error_result("File is empty or could not be read")
+            if "memory" in df.attrs:
+                metadata["memory"] = df.attrs["memory"]
+            self._report_stage(on_stage, "parsed", self._parsed_summary(df, len(df)))
+            
+            if mode == 'sampled' or (mode == 'auto' and len(df) > SAMPLING_THRESHOLD_ROWS):
+                with timings.span("sample"):
+                    sample = sample_frame(df, SAMPLE_ROWS)
+                with timings.span("profile_sample"):
+                    result = self._profile_sample(sample, df.head(5), len(df), metadata)
+                return self._report_profiled(on_stage, result)
+            
+            # One pass over the frame; every stage below reads from the profile
+            with timings.span("profile"):
+                profile = build_table_profile(
+                    df, max_exact=UNIQUE_VALUES_THRESHOLD, top_k=TOP_VALUES_K,
+                    duplicate_counter=DuplicateCounter(DUPLICATES_EXACT_MAX_ROWS, int(DUPLICATES_BLOOM_MB * 8 * 1024 * 1024))
+                )
             
             # Extract basic statistics
-            stats = self._extract_basic_stats(df)
+            with timings.span("stats"):
+                stats = self._extract_basic_stats(profile)
             
             # Generate data preview
-            data_preview = self._generate_data_preview(df)
+            with timings.span("preview"):
+                data_preview = self._generate_data_preview(profile)
+            self._report_stage(on_stage, "profiled", self._profiled_summary({**stats, "data_preview": data_preview}))
             
-            # Generate AI insights
-            ai_insights = self._generate_ai_insights(df, file_type)
+            with timings.span("ai_summary"):
+                data_summary = self._prepare_data_summary_for_ai(stats, data_preview)
+            with timings.span("quality_score"):
+                data_quality_score = self._calculate_data_quality_score(stats)
+            with timings.span("local_insights"):
+                insights = generate_local_insights(stats, data_preview, data_quality_score, df, LOCAL_INSIGHTS_MAX_ROWS)
+            with timings.span("charts"):
+                charts = self._materialize_charts(df, stats, data_preview, insights)
             
             # Combine all results
-            result = {
-                **stats,
-                "data_preview": data_preview,
-                "ai_insights": ai_insights,
-            "processing_status": "completed",
-            "processed_at": datetime.utcnow().isoformat() + "Z" + "Z"
-            }
-            
-            logger.info(f"Successfully processed file: {file_path}")
-            return result
+            return self._completed_result(stats, data_preview, data_summary, insights, charts, metadata)
             
         except Exception as e:
             logger.error(f"Error processing file {file_path}: {str(e)}")
             return self._create_error_result(f"Processing failed: {str(e)}")
     
-    def _read_file(self, file_path: str, file_type: str) -> Optional[pd.DataFrame]:
-        """Read file based on its type"""
+    def _report_stage(self, on_stage: Callable[[str, Dict[str, Any]], None], stage: str, data: Dict[str, Any]):
+        """Pass a stage's partial result on; progress reporting never fails the processing"""
+        try:
+            on_stage(stage, data)
+        except Exception as e:
+            logger.error(f"Error reporting stage {stage}: {str(e)}")
+    
+    def _report_profiled(self, on_stage: Callable[[str, Dict[str, Any]], None], result: Dict[str, Any]) -> Dict[str, Any]:
+        if result.get("processing_status") == "completed":
+            self._report_stage(on_stage, "profiled", self._profiled_summary(result))
+        return result
+    
+    def _parsed_summary(self, df: pd.DataFrame, row_count: int) -> Dict[str, Any]:
+        """Counts and first rows of a table as soon as it is read"""
+        return {
+            "row_count": row_count,
+            "column_count": len(df.columns),
+            "columns": [str(col) for col in df.columns],
+            "preview_data": df.head(5).to_dict('records'),
+        }
+    
+    def _profiled_summary(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """The statistics of a result (or of stats plus data_preview) that the file list and viewer show first"""
+        return {
+            key: stats[key] for key in ("row_count", "column_count", "data_types", "missing_values",
+                                        "duplicate_rows", "sampled", "data_preview") if key in stats
+        }
+    
+    def _should_stream(self, file_path: str, file_type: str) -> bool:
+        """Decide whether a file is large enough to use the streaming profiler"""
+        if file_type != 'csv':
+            return False
+        return os.path.getsize(file_path) > STREAMING_THRESHOLD_MB * 1024 * 1024
+    
+    def _should_sample_file(self, file_path: str, file_type: str, mode: str) -> bool:
+        """Decide whether a CSV on disk is sampled while streaming instead of profiled exactly"""
+        if file_type != 'csv' or mode == 'exact':
+            return False
+        return mode == 'sampled' or os.path.getsize(file_path) > SAMPLING_THRESHOLD_MB * 1024 * 1024
+    
+    def _profile_file_streaming(self, file_path: str, metadata: Dict[str, Any], content_hash: Optional[str] = None,
+                                base: Optional[Tuple[Dict[str, Any], ProfileState]] = None,
+                                on_stage: Callable[[str, Dict[str, Any]], None] = _ignore_stage) -> Dict[str, Any]:
+        """
+        Profile a large CSV in a single bounded-memory pass. Given the
+        checkpoint of a file this one appends to, only the appended rows are
+        read and merged into its state. The resulting state is checkpointed
+        under `content_hash` for the next version of the file, and the parsed
+        chunks are written to the columnar cache as they are read (after the
+        base file's cached table, when appending). The "parsed" stage is
+        reported once the read completes.
+        """
+        logger.info(f"Using streaming profiler for {file_path}")
+        
+        writer = self.columnar_cache.writer(self.columnar_cache.key_for(content_hash, 'csv')) if content_hash else None
+        try:
+            if base is not None:
+                entry, state = base
+                if writer is not None and not writer.copy_from(self.columnar_cache.key_for(entry["content_hash"], 'csv'),
+                                                               self.streaming_profiler.chunk_rows):
+                    # Without the base file's rows the table would be incomplete
+                    writer = None
+                state = self.streaming_profiler.read_csv(file_path, state, offset=entry["size"],
+                                                         on_chunk=writer.write if writer else None)
+                metadata["incremental"] = {
+                    "base_content_hash": entry["content_hash"],
+                    "base_rows": entry["rows"],
+                    "appended_rows": state.row_count - entry["rows"],
+                    "appended_bytes": os.path.getsize(file_path) - entry["size"],
+                }
+            else:
+                state = self.streaming_profiler.read_csv(file_path, on_chunk=writer.write if writer else None)
+            if writer is not None and state.row_count > 0:
+                writer.close()
+        finally:
+            if writer is not None:
+                writer.abort()
+        if content_hash and state.row_count > 0:
+            self.profile_checkpoints.save(content_hash, file_path, state)
+        return self._streamed_result(state, metadata, on_stage)
+    
+    def _has_streamed_table(self, content_hash: Optional[str], file_type: str, sheet_name: Optional[str] = None) -> bool:
+        return self.has_cached_table(content_hash, file_type, sheet_name) and self.columnar_cache.is_streamed(
+            self.columnar_cache.key_for(content_hash, file_type, sheet_name)
+        )
+    
+    def _profile_streamed_table(self, content_hash: str, file_type: str, metadata: Dict[str, Any],
+                                on_stage: Callable[[str, Dict[str, Any]], None] = _ignore_stage) -> Dict[str, Any]:
+        """Profile a table the streaming profiler cached, without loading it whole"""
+        key = self.columnar_cache.key_for(content_hash, file_type)
+        logger.info(f"Using streaming profiler for cached table {key}")
+        frames = self.columnar_cache.iter_frames(key, self.streaming_profiler.chunk_rows)
+        return self._streamed_result(self.streaming_profiler.read_frames(frames), metadata, on_stage)
+    
+    def _streamed_result(self, state: ProfileState, metadata: Dict[str, Any],
+                         on_stage: Callable[[str, Dict[str, Any]], None]) -> Dict[str, Any]:
+        if state.preview is not None and state.row_count > 0:
+            self._report_stage(on_stage, "parsed", self._parsed_summary(state.preview, state.row_count))
+        
+        stats = self.streaming_profiler.stats(state)
+        if stats is None or stats["row_count"] == 0:
+            return self._create_error_result("File is empty or could not be read")
+        
+        data_preview = stats.pop("data_preview")
+        
+        # AI context and insights come from the profile rather than the full frame
+        insights = generate_local_insights(stats, data_preview, self._calculate_data_quality_score(stats))
+        return self._completed_result(
+            stats, data_preview, self._prepare_data_summary_for_ai(stats, data_preview), insights,
+            self._materialize_charts(None, stats, data_preview, insights, state), metadata
+        )
+    
+    def _profile_sample(self, sample: pd.DataFrame, head: pd.DataFrame, total_rows: int,
+                        metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Profile a uniform row sample and scale its counts up to the whole file.
+        Numeric summaries get confidence intervals under "numeric_confidence"
+        (min and max only as bounds), missing counts under
+        "missing_values_confidence" and each column's "null_count_interval".
+        """
+        sample_rows = len(sample)
+        logger.info(f"Profiling a sample of {sample_rows} of {total_rows} rows")
+        
+        profile = build_table_profile(sample, max_exact=UNIQUE_VALUES_THRESHOLD, top_k=TOP_VALUES_K)
+        # The preview shows the first rows of the file, not of the sample
+        profile = dataclasses.replace(profile, head=head)
+        stats = self._extract_basic_stats(profile)
+        data_preview = self._generate_data_preview(profile)
+        
+        def scale(count: int) -> int:
+            return scale_count(count, sample_rows, total_rows)
+        
+        stats["row_count"] = total_rows
+        stats["missing_values_confidence"] = {
+            col: count_interval(count, sample_rows, total_rows, SAMPLE_CONFIDENCE)
+            for col, count in stats["missing_values"].items()
+        }
+        stats["missing_values"] = {col: scale(count) for col, count in stats["missing_values"].items()}
+        stats["duplicate_rows"] = scale(stats["duplicate_rows"])
+        stats["duplicate_rows_approximate"] = True
+        for entry in stats["key_duplicates"].values():
+            entry["duplicates"] = scale(entry["duplicates"])
+        for summary in stats.get("numeric_summary", {}).values():
+            summary["count"] = float(scale(int(summary["count"])))
+        stats["numeric_confidence"] = confidence_intervals(
+            sample, stats["numeric_columns"], total_rows, SAMPLE_CONFIDENCE
+        )
+        stats["sampled"] = True
+        stats["sample"] = {"rows": sample_rows, "total_rows": total_rows, "confidence": SAMPLE_CONFIDENCE}
+        
+        data_preview["total_rows"] = total_rows
+        for col_info in data_preview["columns_info"]:
+            col_info["null_count_interval"] = stats["missing_values_confidence"].get(col_info["name"])
+            col_info["null_count"] = scale(col_info["null_count"])
+            col_info["unique_count_approximate"] = col_info["unique_count_approximate"] or sample_rows < total_rows
+        
+        insights = generate_local_insights(
+            stats, data_preview, self._calculate_data_quality_score(stats), sample, LOCAL_INSIGHTS_MAX_ROWS
+        )
+        return self._completed_result(
+            stats, data_preview, self._prepare_data_summary_for_ai(stats, data_preview), insights,
+            self._materialize_charts(sample, stats, data_preview, insights), metadata
+        )
+    
+    def _materialize_charts(self, df: Optional[pd.DataFrame], stats: Dict[str, Any], data_preview: Dict[str, Any],
+                            insights: Dict[str, Any], state: Optional[ProfileState] = None) -> Dict[str, Any]:
+        """
+        Chart data behind the suggested charts; a failure leaves the charts to
+        be aggregated on demand. Without a table, a streaming profile `state`
+        still provides the correlation and scatter charts.
+        """
+        try:
+            streamed = {}
+            if df is None and state is not None and state.co_moments is not None:
+                streamed = {"co_moments": state.co_moments, "scatter_rows": state.scatter_rows.sample()}
+            return materialize_charts(df, stats, data_preview, insights["column_roles"], insights["chart_specs"],
+                                      CHART_MAX_ROWS, **streamed)
+        except Exception as e:
+            logger.error(f"Error materializing charts: {str(e)}")
+            return {}
+    
+    def _completed_result(self, stats: Dict[str, Any], data_preview: Dict[str, Any], data_summary: Dict[str, str],
+                          insights: Dict[str, Any], charts: Dict[str, Any], metadata: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "sampled": False,
+            **stats,
+            "data_preview": data_preview,
+            "ai_insights": {**insights, "enrichment": "pending"},
+            "charts": charts,
+            "ai_context": {
+                "data_summary": data_summary
+            },
+            "metadata": metadata,
+            "processing_status": "completed",
+            "processed_at": datetime.utcnow().isoformat() + "Z"
+        }
+    
+    def load_dataframe(self, file_path: Optional[str], file_type: str, content_hash: Optional[str] = None,
+                       columns: Optional[list] = None, content: Optional[bytes] = None,
+                       sheet_name: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """Load the table for on-demand queries, only the requested columns when cached"""
+        if content_hash:
+            key = self.columnar_cache.key_for(content_hash, file_type, sheet_name)
+            df = self.columnar_cache.load(key, columns=self._cached_columns(key, columns))
+            if df is not None:
+                return df
+        if file_path is None and content is None:
+            return None
+        return self._load_table(file_path, file_type, content_hash, content, sheet_name)
+    
+    def has_cached_table(self, content_hash: Optional[str], file_type: str, sheet_name: Optional[str] = None) -> bool:
+        """Whether a parsed table for this content is in the columnar cache"""
+        return bool(content_hash) and self.columnar_cache.has(
+            self.columnar_cache.key_for(content_hash, file_type, sheet_name)
+        )
+    
+    def cached_table_path(self, content_hash: Optional[str], file_type: str, sheet_name: Optional[str] = None) -> Optional[str]:
+        """Parquet file of a table in the columnar cache, if it is cached"""
+        if not self.has_cached_table(content_hash, file_type, sheet_name):
+            return None
+        return self.columnar_cache.path_for(self.columnar_cache.key_for(content_hash, file_type, sheet_name))
+    
+    def list_sheets(self, file_path: Optional[str], file_type: str, content: Optional[bytes] = None) -> list:
+        """Sheet names of a workbook (empty for CSV)"""
+        try:
+            source = io.BytesIO(content) if content is not None else file_path
+            return readers.list_sheets(source, file_type)
+        except Exception as e:
+            logger.error(f"Error listing sheets of {file_path}: {str(e)}")
+            return []
+    
+    def _cached_columns(self, key: str, columns: Optional[list]) -> Optional[list]:
+        """Restrict a column selection to names present in the cached table"""
+        if columns is None:
+            return None
+        available = self.columnar_cache.columns(key) or []
+        selected = [col for col in dict.fromkeys(columns) if col in available]
+        return selected or None
+    
+    def _load_table(self, file_path: Optional[str], file_type: str, content_hash: Optional[str] = None,
+                    content: Optional[bytes] = None, sheet_name: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """Load a parsed table from the columnar cache, parsing and caching it on a miss"""
+        if content_hash is None and content is not None:
+            content_hash = hash_bytes(content)
+        elif content_hash is None and file_path is not None:
+            content_hash = hash_file(file_path)
+        key = self.columnar_cache.key_for(content_hash, file_type, sheet_name) if content_hash else None
+        
+        if key and self.columnar_cache.has(key):
+            df = self.columnar_cache.load(key)
+            if df is not None:
+                logger.info(f"Loaded parsed table from columnar cache: {key}")
+                return df
+        
+        if content is not None:
+            # BytesIO shares the buffer with `content`, so no temp file or extra copy is needed
+            df = self._read_file(io.BytesIO(content), file_type, sheet_name)
+        elif file_path is not None:
+            df = self._read_file(file_path, file_type, sheet_name)
+        else:
+            return None
+        
+        if df is not None and key:
+            self.columnar_cache.store(key, df)
+        return df
+    
+    def get_column_values(self, df: pd.DataFrame, column: str, prefix: Optional[str] = None,
+                          offset: int = 0, limit: int = 100, table_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Page through the distinct values of a column. Given the table's
+        columnar cache key, the sorted values are kept for the next pages
+        (see cached_column_values).
+        """
+        if column not in df.columns:
+            return None
+        values = SortedValues(df[column])
+        if table_key is not None and DISTINCT_VALUES_CACHE_ENTRIES > 0:
+            with self._distinct_lock:
+                self._distinct_values[(table_key, column)] = values
+                while len(self._distinct_values) > DISTINCT_VALUES_CACHE_ENTRIES:
+                    self._distinct_values.popitem(last=False)
+        return {"column": column, **values.page(prefix, offset, limit)}
+    
+    def cached_column_values(self, table_key: Optional[str], column: str, prefix: Optional[str] = None,
+                             offset: int = 0, limit: int = 100) -> Optional[Dict[str, Any]]:
+        """A page of distinct values kept by get_column_values, or None if they are not kept"""
+        with self._distinct_lock:
+            values = self._distinct_values.get((table_key, column))
+            if values is None:
+                return None
+            self._distinct_values.move_to_end((table_key, column))
+        return {"column": column, **values.page(prefix, offset, limit)}
+    
+    def _read_file(self, file_path: Union[str, BinaryIO], file_type: str,
+                   sheet_name: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """
+        Read file (a path or an in-memory buffer) based on its type, into
+        compact dtypes unless TYPED_LOADING is off
+        """
         try:
             if file_type == 'csv':
-                return pd.read_csv(file_path)
-            elif file_type == 'xlsx':
-                return pd.read_excel(file_path, engine='openpyxl')
-            elif file_type == 'xls':
-                return pd.read_excel(file_path, engine='xlrd')
-            elif file_type == 'xlsb':
-                return pd.read_excel(file_path, engine='pyxlsb')
+                arrow_min_bytes = int(CSV_ARROW_MIN_KB * 1024)
+                if TYPED_LOADING:
+                    return type_inference.read_csv_typed(file_path, TYPE_INFERENCE_SAMPLE_ROWS, CATEGORY_MAX_RATIO,
+                                                         engine=CSV_ENGINE, arrow_min_bytes=arrow_min_bytes)
+                return readers.read_csv(file_path, engine=CSV_ENGINE, arrow_min_bytes=arrow_min_bytes)
+            elif file_type in readers.EXCEL_TYPES:
+                df = readers.read_excel(file_path, file_type, sheet_name=sheet_name, engine=EXCEL_ENGINE)
+                return type_inference.optimize_frame(df, CATEGORY_MAX_RATIO) if TYPED_LOADING else df
             else:
                 logger.error(f"Unsupported file type: {file_type}")
                 return None
@@ -73,146 +532,158 @@ class FileProcessor:
             logger.error(f"Error reading file {file_path}: {str(e)}")
             return None
     
-    def _extract_basic_stats(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Extract basic statistics from the dataframe"""
+    def _extract_basic_stats(self, profile: TableProfile) -> Dict[str, Any]:
+        """Extract basic statistics from the table profile"""
         try:
             stats = {
-                "row_count": len(df),
-                "column_count": len(df.columns),
+                "row_count": profile.row_count,
+                "column_count": profile.column_count,
                 "file_size_mb": 0,  # Will be updated by caller
-                "data_types": df.dtypes.astype(str).to_dict(),
-                "missing_values": df.isnull().sum().to_dict(),
-                "numeric_columns": df.select_dtypes(include=['number']).columns.tolist(),
-                "text_columns": df.select_dtypes(include=['object']).columns.tolist(),
-                "date_columns": df.select_dtypes(include=['datetime']).columns.tolist()
+                "data_types": profile.data_types(),
+                "missing_values": profile.missing_values(),
+                "numeric_columns": profile.names('numeric'),
+                "text_columns": profile.names('text'),
+                "date_columns": profile.names('datetime'),
+                "duplicate_rows": profile.duplicate_rows,
+                "duplicate_rows_approximate": profile.duplicate_rows_approximate,
+                "key_duplicates": profile.key_duplicates()
             }
             
             # Add summary statistics for numeric columns
             if stats["numeric_columns"]:
-                stats["numeric_summary"] = df[stats["numeric_columns"]].describe().to_dict()
+                stats["numeric_summary"] = profile.numeric_summary()
             
             return stats
         except Exception as e:
             logger.error(f"Error extracting basic stats: {str(e)}")
             return {"row_count": 0, "column_count": 0}
     
-    def _generate_data_preview(self, df: pd.DataFrame, max_rows: int = 5) -> Dict[str, Any]:
+    def _generate_data_preview(self, profile: TableProfile) -> Dict[str, Any]:
         """Generate a preview of the data"""
         try:
-            # Create a copy of the dataframe for formatting
-            df_formatted = df.copy()
+            # Only the preview rows are copied for formatting
+            head = profile.head.copy()
             
             # Format datetime columns to replace 'T' with '/'
-            for col in df_formatted.columns:
-                if df_formatted[col].dtype.name.startswith('datetime'):
-                    df_formatted[col] = df_formatted[col].dt.strftime('%Y-%m-%d/%H:%M:%S')
+            for col in profile.names('datetime'):
+                head[col] = head[col].dt.strftime('%Y-%m-%d/%H:%M:%S')
             
             # Get first few rows with formatted data
-            preview_data = df_formatted.head(max_rows).to_dict('records')
+            preview_data = head.to_dict('records')
             
             # Get column information
             columns_info = []
-            for col in df.columns:
+            for col in profile.columns:
                 # Format sample values for datetime columns
-                sample_values = df[col].dropna().head(3).tolist()
-                if df[col].dtype.name.startswith('datetime'):
+                sample_values = list(col.sample_values)
+                if col.kind == 'datetime':
                     sample_values = [pd.to_datetime(val).strftime('%Y-%m-%d/%H:%M:%S') for val in sample_values]
                 
+                # Bounded cardinality summary; full value lists are served by the values endpoint
                 col_info = {
-                    "name": col,
-                    "type": str(df[col].dtype),
+                    "name": col.name,
+                    "type": col.dtype,
                     "sample_values": sample_values,
-                    "null_count": df[col].isnull().sum(),
-                    "unique_count": df[col].nunique(),
-                    "unique_values": df[col].dropna().unique().tolist()  # Add all unique values for filtering
+                    "null_count": col.null_count,
+                    **col.cardinality
                 }
                 columns_info.append(col_info)
             
             return {
                 "preview_data": preview_data,
                 "columns_info": columns_info,
-                "total_rows": len(df),
-                "total_columns": len(df.columns)
+                "total_rows": profile.row_count,
+                "total_columns": profile.column_count
             }
         except Exception as e:
             logger.error(f"Error generating data preview: {str(e)}")
             return {"preview_data": [], "columns_info": []}
     
-    def _generate_ai_insights(self, df: pd.DataFrame, file_type: str) -> Dict[str, Any]:
-        """Generate AI-powered insights about the data"""
+    def _generate_ai_insights(self, data_summary: Dict[str, str], file_type: str, local_insights: Dict[str, Any]) -> Dict[str, Any]:
+        """Enrich the local insights with AI analysis of a prepared data summary"""
         try:
-            # Prepare data summary for AI
-            data_summary = self._prepare_data_summary_for_ai(df)
-            
-            # Create AI prompt
-            prompt = self._create_ai_prompt(data_summary, file_type)
+            ai_response = self.llm.complete(self._ai_request(data_summary, file_type), self._ai_cache_key(data_summary, file_type))
+            return self._merge_ai_insights(local_insights, ai_response)
             
-            # Get AI response
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a data analyst expert. Analyze the provided data and give insights about patterns, trends, and recommendations for visualization."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=1000,
-                temperature=0.3
+        except Exception as e:
+            logger.error(f"Error generating AI insights: {str(e)}")
+            return self._merge_ai_insights(local_insights, None)
+    
+    async def _generate_ai_insights_async(self, data_summary: Dict[str, str], file_type: str, local_insights: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of _generate_ai_insights using the async OpenAI client"""
+        try:
+            ai_response = await self.llm.complete_async(
+                self._ai_request(data_summary, file_type), self._ai_cache_key(data_summary, file_type)
             )
-            
-            ai_response = response.choices[0].message.content
-            
-            # Parse AI response and structure it
-            insights = {
-                "summary": ai_response,
-                "suggested_charts": self._extract_chart_suggestions(ai_response),
-                "data_quality_score": self._calculate_data_quality_score(df),
-                "key_insights": self._extract_key_insights(ai_response)
-            }
-            
-            return insights
+            return self._merge_ai_insights(local_insights, ai_response)
             
         except Exception as e:
             logger.error(f"Error generating AI insights: {str(e)}")
-            return {
-                "summary": "AI analysis temporarily unavailable",
-                "suggested_charts": [],
-                "data_quality_score": 0,
-                "key_insights": []
-            }
+            return self._merge_ai_insights(local_insights, None)
     
-    def _prepare_data_summary_for_ai(self, df: pd.DataFrame) -> str:
-        """Prepare a summary of the data for AI analysis"""
-        summary = f"""
-        Dataset Overview:
-        - Rows: {len(df)}
-        - Columns: {len(df.columns)}
-        - Column names: {list(df.columns)}
-        - Data types: {df.dtypes.astype(str).to_dict()}
-        - Missing values: {df.isnull().sum().to_dict()}
+    def _ai_request(self, data_summary: Dict[str, str], file_type: str) -> Dict[str, Any]:
+        """Chat completion arguments for the insights request"""
+        return {
+            "model": "gpt-4",
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are a data analyst expert. Analyze the provided data and give insights about patterns, trends, and recommendations for visualization."
+                },
+                {
+                    "role": "user",
+                    "content": self._create_ai_prompt(data_summary, file_type)
+                }
+            ],
+            "max_tokens": 1000,
+            "temperature": 0.3
+        }
+    
+    def _merge_ai_insights(self, local_insights: Dict[str, Any], ai_response: Optional[str]) -> Dict[str, Any]:
+        """Parse the AI response into the local insights; without one the local insights stand"""
+        if ai_response is None:
+            return {**local_insights, "enrichment": "failed"}
+        return {
+            **local_insights,
+            "summary": ai_response,
+            "local_summary": local_insights["summary"],
+            "suggested_charts": list(dict.fromkeys(
+                local_insights["suggested_charts"] + self._extract_chart_suggestions(ai_response)
+            )),
+            "key_insights": list(dict.fromkeys(
+                self._extract_key_insights(ai_response) + local_insights["key_insights"]
+            )),
+            "source": "local+llm",
+            "enrichment": "completed"
+        }
+    
+    def _ai_cache_key(self, data_summary: Dict[str, str], file_type: str) -> str:
         """
-        
-        # Add sample data
-        if len(df) > 0:
-            summary += f"\nSample data (first 3 rows):\n{df.head(3).to_string()}"
-        
-        # Add numeric column statistics
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        if len(numeric_cols) > 0:
-            summary += f"\nNumeric column statistics:\n{df[numeric_cols].describe().to_string()}"
-        
-        return summary
+        Cache key of the insights request: the fingerprint of the request
+        without the exact part of the summary. One answer therefore serves
+        every file with the same rounded profile. The prompt asks the model
+        to base its analysis and figures on the profile, so the whole answer
+        (summary, patterns, quality notes, chart types, domain and
+        recommendations) holds for each of them; exact counts are shown from
+        the local insights.
+        """
+        return prompt_fingerprint(self._ai_request({**data_summary, "exact": ""}, file_type))
     
-    def _create_ai_prompt(self, data_summary: str, file_type: str) -> str:
+    def _prepare_data_summary_for_ai(self, stats: Dict[str, Any], data_preview: Dict[str, Any]) -> Dict[str, str]:
+        """Prepare a summary of the data for AI analysis, within the prompt token budget"""
+        return summarize_for_prompt(stats, data_preview, AI_PROMPT_TOKEN_BUDGET)
+    
+    def _create_ai_prompt(self, data_summary: Dict[str, str], file_type: str) -> str:
         """Create prompt for AI analysis"""
         return f"""
-        Please analyze this {file_type.upper()} dataset and provide insights:
+        Please analyze this {file_type.upper()} dataset and provide insights.
+        
+        Dataset profile (figures rounded):
+        {data_summary["profile"]}
         
-        {data_summary}
+        This file, for context only. The analysis is shared by files with the same profile,
+        so quote figures from the profile above, not from this part:
+        {data_summary["exact"]}
         
         Please provide:
         1. A brief summary of what this data represents and its business context
@@ -246,20 +717,23 @@ class FileProcessor:
         
         return chart_types if chart_types else ['bar', 'line']
     
-    def _calculate_data_quality_score(self, df: pd.DataFrame) -> float:
-        """Calculate a data quality score (0-100)"""
+    def _calculate_data_quality_score(self, stats: Dict[str, Any]) -> float:
+        """
+        Calculate a data quality score (0-100) from basic stats; exact, sampled
+        and streamed profiles all score through here
+        """
         try:
-            total_cells = len(df) * len(df.columns)
-            null_cells = df.isnull().sum().sum()
+            total_cells = stats["row_count"] * stats["column_count"]
+            null_cells = sum(stats["missing_values"].values())
             
             # Base score
             completeness_score = ((total_cells - null_cells) / total_cells) * 100
             
             # Bonus for having numeric columns
-            numeric_bonus = min(len(df.select_dtypes(include=['number']).columns) * 5, 20)
+            numeric_bonus = min(len(stats["numeric_columns"]) * 5, 20)
             
-            # Penalty for too many duplicates
-            duplicate_penalty = min(len(df[df.duplicated()]) * 2, 20)
+            # Penalty for duplicate rows and repeated identifiers
+            duplicate_penalty = self._duplicate_penalty(stats.get("duplicate_rows", 0), stats.get("key_duplicates", {}))
             
             final_score = max(0, min(100, completeness_score + numeric_bonus - duplicate_penalty))
             return round(final_score, 1)
@@ -268,6 +742,11 @@ class FileProcessor:
             logger.error(f"Error calculating data quality score: {str(e)}")
             return 50.0
     
+    def _duplicate_penalty(self, duplicate_rows: int, key_duplicates: Dict[str, Dict[str, Any]]) -> float:
+        """Quality score penalty for duplicate rows plus up to 10 points for the worst key column"""
+        worst_key_share = max((entry["share"] for entry in key_duplicates.values()), default=0.0)
+        return min(duplicate_rows * 2, 20) + min(worst_key_share * 20, 10)
+    
     def _extract_key_insights(self, ai_response: str) -> list:
         """Extract key insights from AI response"""
         # Simple extraction - look for bullet points or numbered lists
@@ -0,0 +1,309 @@
+# backend/job_queue.py
+import asyncio
+import functools
+import json
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable, Awaitable, List
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('queued', 'running')
+FINAL_STATUSES = ('completed', 'failed', 'cancelled')
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+class PermanentJobError(Exception):
+    """Raised by a job handler for failures that retrying cannot fix"""
+
+
+class JobStore:
+    """Durable job records in a local SQLite database"""
+
+    def __init__(self, db_path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    batch_id TEXT,
+                    file_id TEXT,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    progress REAL NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    error TEXT,
+                    next_attempt_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, next_attempt_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch_id)")
+
+    def create(self, payload: Dict[str, Any], max_attempts: int, batch_id: Optional[str] = None) -> Dict[str, Any]:
+        now = time.time()
+        job_id = str(uuid.uuid4())
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, batch_id, file_id, payload, status, stage, max_attempts, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'queued', 'queued', ?, ?, ?, ?)",
+                (job_id, batch_id, payload.get('file_id'), json.dumps(payload), max_attempts, now, now, now)
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list_batch(self, batch_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM jobs WHERE batch_id = ? ORDER BY created_at", (batch_id,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def count_active(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """Atomically move the oldest due job from queued to running"""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' AND next_attempt_at <= ? ORDER BY next_attempt_at, created_at LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', stage = 'starting', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (now, row['id'])
+            )
+        return self.get(row['id'])
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the next queued job becomes due, or None if nothing is queued"""
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(next_attempt_at) FROM jobs WHERE status = 'queued'").fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def update(self, job_id: str, **fields):
+        if not fields:
+            return
+        fields['updated_at'] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def requeue_interrupted(self) -> int:
+        """Jobs left running by a previous process are queued again on startup"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', stage = 'queued', updated_at = ? WHERE status = 'running'",
+                (time.time(),)
+            )
+        return cursor.rowcount
+
+    def purge_finished(self, before: float) -> int:
+        """Delete completed, failed and cancelled jobs last updated before `before`"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('completed', 'failed', 'cancelled') AND updated_at < ?",
+                (before,)
+            )
+        return cursor.rowcount
+
+    def _to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        return job
+
+
+class JobQueue:
+    """
+    Bounded, durable processing queue.
+
+    Jobs are persisted in a JobStore and executed by a fixed number of asyncio
+    workers. Submissions beyond `max_pending` active jobs are rejected, failed
+    jobs are retried with exponential backoff, and queued or running jobs can
+    be cancelled. Finished jobs are deleted `retention_seconds` after their
+    last update (never if 0).
+
+    All SQLite work runs on one dedicated thread, so the event loop never
+    waits on the database and statements keep the order they were issued in.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        handler: Callable[[Dict[str, Any], Callable[[str, float], None]], Awaitable[None]],
+        workers: int,
+        max_pending: int,
+        max_attempts: int = 3,
+        retry_backoff_seconds: float = 2.0,
+        on_failure: Optional[Callable[[Dict[str, Any], str], Awaitable[None]]] = None,
+        retention_seconds: float = 0
+    ):
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.on_failure = on_failure
+        self.retention_seconds = retention_seconds
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+
+    async def start(self):
+        if self._worker_tasks:
+            return
+        requeued = await self._db(self.store.requeue_interrupted)
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted jobs")
+        self._wakeup = asyncio.Event()
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if self.retention_seconds > 0:
+            self._worker_tasks.append(asyncio.create_task(self._purge_finished()))
+        self._wakeup.set()
+
+    async def stop(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def submit(self, payload: Dict[str, Any], batch_id: Optional[str] = None) -> Dict[str, Any]:
+        return (await self.submit_many([payload], batch_id))[0]
+
+    async def submit_many(self, payloads: List[Dict[str, Any]], batch_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Enqueue several jobs, all or none depending on remaining capacity"""
+        jobs = await self._db(self._create_many, payloads, batch_id)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return jobs
+
+    def _create_many(self, payloads: List[Dict[str, Any]], batch_id: Optional[str]) -> List[Dict[str, Any]]:
+        # Runs on the store thread, so no other submission lands between the check and the inserts
+        if self.store.count_active() + len(payloads) > self.max_pending:
+            raise QueueFullError(f"Processing queue is full ({self.max_pending} pending jobs)")
+        return [self.store.create(payload, self.max_attempts, batch_id) for payload in payloads]
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self._db(self.store.get, job_id)
+
+    async def list_batch(self, batch_id: str) -> List[Dict[str, Any]]:
+        return await self._db(self.store.list_batch, batch_id)
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = await self._db(self.store.get, job_id)
+        if job is None or job['status'] in FINAL_STATUSES:
+            return job
+        await self._db(self.store.update, job_id, status='cancelled', stage='cancelled')
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        return await self._db(self.store.get, job_id)
+
+    def depth(self) -> Dict[str, int]:
+        counts = self.store.count_by_status()
+        return {status: counts.get(status, 0) for status in ACTIVE_STATUSES + FINAL_STATUSES}
+
+    async def _db(self, method: Callable, *args, **kwargs):
+        """Run a JobStore call on the store thread"""
+        return await asyncio.get_running_loop().run_in_executor(self._io, functools.partial(method, *args, **kwargs))
+
+    async def _worker(self):
+        while True:
+            job = await self._db(self.store.claim_next)
+            if job is None:
+                await self._wait_for_work()
+                continue
+            await self._run(job)
+
+    async def _purge_finished(self):
+        while True:
+            try:
+                purged = await self._db(self.store.purge_finished, time.time() - self.retention_seconds)
+                if purged:
+                    logger.info(f"Purged {purged} finished jobs")
+            except Exception as e:
+                logger.error(f"Error purging finished jobs: {str(e)}")
+            await asyncio.sleep(min(self.retention_seconds, 3600))
+
+    async def _wait_for_work(self):
+        self._wakeup.clear()
+        timeout = await self._db(self.store.next_due_in)
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout if timeout is not None else 5.0)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self, job: Dict[str, Any]):
+        job_id = job['id']
+
+        def report(stage: str, progress: float):
+            # Not awaited: the store thread applies progress in order with the job's other updates
+            self._io.submit(self.store.update, job_id, stage=stage, progress=progress)
+
+        task = asyncio.create_task(self.handler(job, report))
+        self._running[job_id] = task
+        try:
+            await task
+            if (await self._db(self.store.get, job_id))['status'] != 'cancelled':
+                await self._db(self.store.update, job_id, status='completed', stage='completed', progress=1.0, error=None)
+        except asyncio.CancelledError:
+            if (await self._db(self.store.get, job_id))['status'] != 'cancelled':
+                # The worker itself is shutting down; leave the job for the next start
+                await self._db(self.store.update, job_id, status='queued', stage='queued')
+                raise
+            logger.info(f"Cancelled job {job_id}")
+        except Exception as e:
+            await self._handle_failure(job, e)
+        finally:
+            self._running.pop(job_id, None)
+
+    async def _handle_failure(self, job: Dict[str, Any], error: Exception):
+        job_id = job['id']
+        attempts = job['attempts']
+        if not isinstance(error, PermanentJobError) and attempts < job['max_attempts']:
+            delay = self.retry_backoff_seconds * (2 ** (attempts - 1))
+            logger.warning(f"Job {job_id} failed (attempt {attempts}), retrying in {delay:.1f}s: {str(error)}")
+            await self._db(self.store.update, job_id, status='queued', stage='retrying', error=str(error),
+                           next_attempt_at=time.time() + delay)
+            self._wakeup.set()
+            return
+
+        logger.error(f"Job {job_id} failed after {attempts} attempts: {str(error)}")
+        await self._db(self.store.update, job_id, status='failed', stage='failed', error=str(error))
+        if self.on_failure is not None:
+            try:
+                await self.on_failure(job, str(error))
+            except Exception as e:
+                logger.error(f"Error in failure callback for job {job_id}: {str(e)}")
@@ -0,0 +1,203 @@
+# backend/llm_client.py
+import re
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+import concurrent.futures
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WHITESPACE = re.compile(r'\s+')
+
+
+def prompt_fingerprint(request: Dict[str, Any]) -> str:
+    """
+    Hash of a chat completion request with runs of whitespace in its prompts
+    collapsed to one space. Numbers are kept exactly; callers that want
+    answers shared across similar prompts fingerprint the shared part of the
+    request only (see FileProcessor._ai_cache_key).
+    """
+    normalized = {
+        **{key: value for key, value in request.items() if key != "messages"},
+        "messages": [{**message, "content": WHITESPACE.sub(' ', message["content"]).strip()}
+                     for message in request["messages"]]
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def estimate_text_tokens(text: str) -> int:
+    """Rough token count of English-like text: about four characters per token"""
+    return (len(text) + 3) // 4
+
+
+def estimate_tokens(request: Dict[str, Any]) -> int:
+    """Rough token cost of a request: its prompt tokens plus the completion budget"""
+    return sum(estimate_text_tokens(message["content"]) for message in request["messages"]) + request.get("max_tokens", 0)
+
+
+class LLMResponseCache:
+    """In-process LRU of completion texts by request fingerprint, with a time to live"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "shared": 0}
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self._stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def put(self, key: str, content: str):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, content)
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_shared(self):
+        """Count a request answered by a concurrent identical call"""
+        with self._lock:
+            self._stats["shared"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+class TokenRateLimiter:
+    """
+    Token bucket over estimated LLM tokens per minute. Requests wait until
+    the bucket holds their cost; one larger than the whole bucket waits for
+    a full bucket instead of forever.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self, tokens: int):
+        if self.capacity <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        tokens = min(float(tokens), self.capacity)
+        # Waiters are served in order, so a large request is not starved by small ones
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+class LLMGateway:
+    """
+    Chat completions through a response cache, with concurrent identical
+    requests sharing one call, at most `max_concurrency` calls in flight and
+    a token-per-minute budget, so bursts queue here instead of running into
+    rate limit errors and client retries.
+
+    Blocking and async callers go through the same gate: every call runs on
+    the gateway's own event loop thread, where the limiter, the concurrency
+    bound and the in-flight requests live.
+    """
+
+    def __init__(self, async_client, cache: LLMResponseCache, max_concurrency: int, tokens_per_minute: int):
+        self.async_client = async_client
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.limiter = TokenRateLimiter(tokens_per_minute)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    def complete(self, request: Dict[str, Any], key: Optional[str] = None) -> str:
+        """
+        Blocking completion (used outside the event loop). Requests with the
+        same `key`, by default the request's prompt_fingerprint, share one
+        cached answer.
+        """
+        return self._submit(request, key).result()
+
+    async def complete_async(self, request: Dict[str, Any], key: Optional[str] = None) -> str:
+        return await asyncio.wrap_future(self._submit(request, key))
+
+    def _submit(self, request: Dict[str, Any], key: Optional[str] = None) -> concurrent.futures.Future:
+        key = key or prompt_fingerprint(request)
+        content = self.cache.get(key)
+        if content is not None:
+            future: concurrent.futures.Future = concurrent.futures.Future()
+            future.set_result(content)
+            return future
+        return asyncio.run_coroutine_threadsafe(self._shared_call(key, request), self._gate_loop())
+
+    def _gate_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="llm-gateway", daemon=True).start()
+            return self._loop
+
+    async def _shared_call(self, key: str, request: Dict[str, Any]) -> str:
+        """Runs on the gateway loop; joins an identical call in flight or starts one"""
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.cache.record_shared()
+        else:
+            future = asyncio.ensure_future(self._call(key, request))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # A caller that is cancelled must not cancel the call the others wait on
+        return await asyncio.shield(future)
+
+    async def _call(self, key: str, request: Dict[str, Any]) -> str:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            await self.limiter.acquire(estimate_tokens(request))
+            response = await self.async_client.chat.completions.create(**request)
+        content = response.choices[0].message.content
+        self.cache.put(key, content)
+        return content
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.cache.stats(),
+            "in_flight": len(self._in_flight),
+            "max_concurrency": self.max_concurrency,
+            "tokens_per_minute": int(self.limiter.capacity),
+        }
@@ -0,0 +1,335 @@
+# backend/local_insights.py
+import re
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional, Tuple
+from sampling import sample_frame
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Text and small integer columns with at most this many values are dimensions to group by
+MAX_DIMENSION_VALUES = 50
+MAX_INTEGER_DIMENSION_VALUES = 12
+# Dimensions small enough for a pie chart
+MAX_PIE_VALUES = 6
+MAX_KEY_INSIGHTS = 8
+# Findings of one kind (e.g. outliers) kept, so wide tables do not crowd out everything else
+MAX_FINDINGS_PER_KIND = 3
+MAX_CHART_SPECS = 6
+STRONG_CORRELATION = 0.7
+MAX_CORRELATED_MEASURES = 20
+
+# Keywords in column names that point to a business domain
+DOMAIN_KEYWORDS = {
+    'HR': {'employee', 'salary', 'department', 'hire', 'hired', 'manager', 'title', 'gender', 'tenure',
+           'payroll', 'position', 'leave', 'attrition', 'bonus', 'staff', 'job'},
+    'Sales': {'sale', 'revenue', 'order', 'customer', 'amount', 'price', 'discount', 'invoice', 'deal',
+              'region', 'quantity', 'total', 'rep', 'client'},
+    'Inventory': {'stock', 'inventory', 'sku', 'warehouse', 'reorder', 'supplier', 'item', 'unit',
+                  'bin', 'location', 'onhand', 'lot'},
+    'Operations': {'shipment', 'delivery', 'ship', 'status', 'ticket', 'duration', 'due', 'carrier',
+                   'route', 'downtime', 'shift', 'machine', 'incident', 'sla'},
+    'Product': {'product', 'feature', 'user', 'session', 'event', 'click', 'page', 'url', 'version',
+                'rating', 'review', 'device', 'browser', 'signup'},
+    'Finance': {'account', 'balance', 'transaction', 'debit', 'credit', 'expense', 'budget', 'cost',
+                'profit', 'tax', 'payment', 'ledger', 'currency'},
+    'Marketing': {'campaign', 'channel', 'lead', 'impression', 'conversion', 'ctr', 'spend', 'email',
+                  'source', 'medium', 'audience', 'open'},
+}
+CAMEL_BOUNDARY = re.compile(r'(?<=[a-z0-9])(?=[A-Z])')
+
+
+def generate_local_insights(stats: Dict[str, Any], data_preview: Dict[str, Any], data_quality_score: float,
+                            df: Optional[pd.DataFrame] = None, max_rows: int = 50000) -> Dict[str, Any]:
+    """
+    Deterministic insights computed from the profile, without the LLM.
+
+    Column roles, distributions, missing values and duplicates come from the
+    stats; when the table itself is available (at most `max_rows` sampled
+    rows of it are used), correlations, trends over the first date column and
+    outlier counts are added. Returns the ai_insights shape with chart
+    specifications and a domain guess.
+    """
+    roles = column_roles(stats, data_preview.get("columns_info", []))
+    if df is not None and len(df) > max_rows:
+        df = sample_frame(df, max_rows, seed=0)
+
+    findings: List[Tuple[float, str]] = []
+    findings += _strongest(_quality_findings(stats))
+    findings += _strongest(_distribution_findings(stats, roles, df))
+    findings += _strongest(_dominance_findings(data_preview, roles, stats["row_count"]))
+    correlations = _correlations(df, roles) if df is not None else []
+    findings += [
+        (abs(r), f"{a} and {b} are strongly {'positively' if r > 0 else 'negatively'} correlated (r = {r:.2f})")
+        for a, b, r in correlations
+    ]
+    trend_column = next(iter(_names(roles, 'date')), None)
+    if df is not None and trend_column is not None:
+        # Period totals of a sample are scaled up to the whole table
+        scale = stats["row_count"] / len(df) if len(df) else 1.0
+        findings += _strongest(_trend_findings(df, trend_column, _names(roles, 'measure')[:3], scale))
+
+    domain = guess_domain(list(roles))
+    charts = _chart_specs(roles, data_preview, correlations)
+    findings.sort(key=lambda finding: -finding[0])
+
+    return {
+        "summary": _summary(stats, roles, domain),
+        "suggested_charts": list(dict.fromkeys(chart["chart_type"] for chart in charts)),
+        "chart_specs": charts,
+        "data_quality_score": data_quality_score,
+        "key_insights": [text for _, text in findings[:MAX_KEY_INSIGHTS]],
+        "domain": domain,
+        "column_roles": roles,
+        "source": "local"
+    }
+
+
+def column_roles(stats: Dict[str, Any], columns_info: List[Dict[str, Any]]) -> Dict[str, str]:
+    """identifier | date | measure | dimension | text | other for every column"""
+    numeric = set(stats.get("numeric_columns", []))
+    dates = set(stats.get("date_columns", []))
+    keys = set(stats.get("key_duplicates", {}))
+    data_types = stats.get("data_types", {})
+    roles = {}
+    for info in columns_info:
+        name = info["name"]
+        unique_count = info.get("unique_count", 0)
+        if name in dates:
+            roles[name] = 'date'
+        elif name in keys:
+            roles[name] = 'identifier'
+        elif name in numeric:
+            small_integer = 'int' in str(data_types.get(name, '')) and unique_count <= MAX_INTEGER_DIMENSION_VALUES
+            roles[name] = 'dimension' if small_integer else 'measure'
+        elif data_types.get(name) == 'bool' or unique_count <= MAX_DIMENSION_VALUES:
+            roles[name] = 'dimension'
+        elif name in stats.get("text_columns", []):
+            roles[name] = 'text'
+        else:
+            roles[name] = 'other'
+    return roles
+
+
+def guess_domain(column_names: List[Any]) -> Dict[str, Any]:
+    """Business domain whose keywords match the most column names"""
+    tokens = {name: _name_tokens(name) for name in column_names}
+    best, best_matches = 'General', []
+    for domain, keywords in DOMAIN_KEYWORDS.items():
+        matches = [name for name, words in tokens.items() if words & keywords]
+        if len(matches) > len(best_matches):
+            best, best_matches = domain, matches
+    return {
+        "name": best,
+        "confidence": round(len(best_matches) / len(column_names), 2) if column_names else 0.0,
+        "matched_columns": best_matches
+    }
+
+
+def _name_tokens(name: Any) -> set:
+    words = re.split(r'[^0-9a-z]+', CAMEL_BOUNDARY.sub(' ', str(name)).lower())
+    # Plural column names ("orders", "sales") match singular keywords
+    return {word for word in words if word} | {word[:-1] for word in words if len(word) > 3 and word.endswith('s')}
+
+
+def _strongest(findings: List[Tuple[float, str]]) -> List[Tuple[float, str]]:
+    return sorted(findings, key=lambda finding: -finding[0])[:MAX_FINDINGS_PER_KIND]
+
+
+def _names(roles: Dict[str, str], role: str) -> List[str]:
+    return [name for name, column_role in roles.items() if column_role == role]
+
+
+def _quality_findings(stats: Dict[str, Any]) -> List[Tuple[float, str]]:
+    findings = []
+    row_count = stats["row_count"]
+    if not row_count:
+        return findings
+    about = "about " if stats.get("sampled") else ""
+    for name, missing in stats.get("missing_values", {}).items():
+        share = missing / row_count
+        if share >= 0.2:
+            findings.append((0.5 + share / 2, f"{name} is {about}{share:.0%} empty"))
+    duplicates = stats.get("duplicate_rows", 0)
+    if duplicates:
+        findings.append((0.6, f"{duplicates:,} rows ({duplicates / row_count:.1%}) are exact duplicates"))
+    for name, entry in stats.get("key_duplicates", {}).items():
+        if entry["duplicates"]:
+            findings.append((0.7, f"{name} looks like an identifier but repeats {entry['duplicates']:,} times"))
+    return findings
+
+
+def _distribution_findings(stats: Dict[str, Any], roles: Dict[str, str],
+                           df: Optional[pd.DataFrame]) -> List[Tuple[float, str]]:
+    findings = []
+    # Extremes of a sample only bound the file's
+    in_sample = " in the sampled rows" if stats.get("sampled") else ""
+    for name, summary in stats.get("numeric_summary", {}).items():
+        if roles.get(name) != 'measure' or not summary.get("count"):
+            continue
+        mean, median, std = summary["mean"], summary["50%"], summary["std"]
+        if summary["min"] == summary["max"]:
+            findings.append((0.55, f"{name} is constant at {_format_number(summary['min'])}{in_sample}"))
+            continue
+        if std and not np.isnan(std):
+            skew = (mean - median) / std
+            if abs(skew) >= 0.2:
+                direction = 'above' if skew > 0 else 'below'
+                findings.append((0.4 + min(abs(skew), 1) / 4,
+                                 f"{name} is {'right' if skew > 0 else 'left'}-skewed: the mean "
+                                 f"({_format_number(mean)}) is well {direction} the median ({_format_number(median)})"))
+
+        q1, q3 = summary["25%"], summary["75%"]
+        iqr = q3 - q1
+        if iqr <= 0:
+            continue
+        low, high = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        if df is not None and name in df.columns:
+            values = _numeric_values(df[name])
+            outliers = int(((values < low) | (values > high)).sum())
+            share = outliers / max(np.count_nonzero(~np.isnan(values)), 1)
+            # Normally distributed values put about 0.7% outside these fences
+            if share >= 0.02:
+                findings.append((0.45 + min(share, 0.2), f"{share:.1%} of {name} values are outliers "
+                                                         f"outside {_format_number(low)} to {_format_number(high)}"))
+        elif summary["max"] > q3 + 3 * iqr or summary["min"] < q1 - 3 * iqr:
+            findings.append((0.45, f"{name} has extreme values ({_format_number(summary['min'])} to "
+                                   f"{_format_number(summary['max'])}{in_sample}) far outside its typical range"))
+    return findings
+
+
+def _dominance_findings(data_preview: Dict[str, Any], roles: Dict[str, str], row_count: int) -> List[Tuple[float, str]]:
+    findings = []
+    for info in data_preview.get("columns_info", []):
+        top = info.get("top_values") or []
+        if roles.get(info["name"]) != 'dimension' or not top or not row_count:
+            continue
+        non_null = row_count - info.get("null_count", 0)
+        share = top[0]["count"] / non_null if non_null else 0
+        if share >= 0.5 and info.get("unique_count", 0) > 1:
+            findings.append((0.3 + share / 4, f"{top[0]['value']} accounts for {share:.0%} of {info['name']}"))
+    return findings
+
+
+def _correlations(df: pd.DataFrame, roles: Dict[str, str]) -> List[Tuple[str, str, float]]:
+    """Strongly correlated pairs of measures, strongest first"""
+    measures = [name for name in _names(roles, 'measure') if name in df.columns][:MAX_CORRELATED_MEASURES]
+    if len(measures) < 2:
+        return []
+    matrix = pd.DataFrame({name: _numeric_values(df[name]) for name in measures}).corr().to_numpy()
+    pairs = []
+    for i in range(len(measures)):
+        for j in range(i + 1, len(measures)):
+            r = matrix[i, j]
+            if not np.isnan(r) and abs(r) >= STRONG_CORRELATION:
+                pairs.append((measures[i], measures[j], float(r)))
+    return sorted(pairs, key=lambda pair: -abs(pair[2]))[:3]
+
+
+def _trend_findings(df: pd.DataFrame, date_column: str, measures: List[str],
+                    scale: float = 1.0) -> List[Tuple[float, str]]:
+    """Growth or decline of the row count and the first measures per period of a date column"""
+    dates = df[date_column]
+    valid = dates.notna().to_numpy()
+    if valid.sum() < 10:
+        return []
+    span_days = (dates.max() - dates.min()).days
+    freq, period_name = ('M', 'month') if span_days > 730 else ('W', 'week') if span_days > 60 else ('D', 'day')
+    periods = dates[valid].dt.to_period(freq)
+
+    series = {'rows': pd.Series(1, index=periods.index).groupby(periods).sum()}
+    for name in measures:
+        series[name] = pd.Series(_numeric_values(df[name])[valid], index=periods.index).groupby(periods).sum()
+
+    findings = []
+    for name, values in series.items():
+        values = values.sort_index()
+        if len(values) < 4:
+            continue
+        start, end, fit = _linear_trend(values.to_numpy(dtype='float64'))
+        if fit >= 0.5 and abs(end - start) >= 0.2 * abs(values.mean()):
+            label = 'The number of rows' if name == 'rows' else f"Total {name}"
+            findings.append((0.5 + fit / 4, f"{label} per {period_name} {'rises' if end > start else 'falls'} steadily "
+                                            f"over {len(values)} {period_name}s of {date_column}, from about "
+                                            f"{_format_number(start * scale)} to {_format_number(end * scale)}"))
+        if measures and name == measures[0] and values.max() >= 1.5 * values.median() > 0:
+            peak = values.idxmax()
+            findings.append((0.35, f"Total {name} peaked in the {period_name} of {peak} "
+                                   f"({_format_number(values.max() * scale)})"))
+    return findings
+
+
+def _linear_trend(values: np.ndarray) -> Tuple[float, float, float]:
+    """First and last value of a straight-line fit, and its R²"""
+    if np.all(values == values[0]):
+        return values[0], values[0], 0.0
+    x = np.arange(len(values), dtype='float64')
+    slope, intercept = np.polyfit(x, values, 1)
+    residual = values - (slope * x + intercept)
+    fit = 1 - (residual ** 2).sum() / ((values - values.mean()) ** 2).sum()
+    return float(intercept), float(slope * x[-1] + intercept), float(fit)
+
+
+def _chart_specs(roles: Dict[str, str], data_preview: Dict[str, Any],
+                 correlations: List[Tuple[str, str, float]]) -> List[Dict[str, Any]]:
+    """Charts suited to the column roles, as chart type plus axes and aggregation"""
+    measures, dimensions, dates = _names(roles, 'measure'), _names(roles, 'dimension'), _names(roles, 'date')
+    unique_counts = {info["name"]: info.get("unique_count", 0) for info in data_preview.get("columns_info", [])}
+    charts = []
+
+    def add(chart_type: str, title: str, x: str, y: Optional[str] = None, agg: str = 'count', reason: str = ''):
+        charts.append({"chart_type": chart_type, "title": title, "x_column": x, "y_column": y,
+                       "agg": agg, "reason": reason})
+
+    if dates:
+        if measures:
+            add('line', f"Total {measures[0]} over time", dates[0], measures[0], 'sum', "a date column and a measure")
+        else:
+            add('line', "Rows over time", dates[0], reason="a date column")
+    for dimension in dimensions[:2]:
+        if measures:
+            add('bar', f"Total {measures[0]} by {dimension}", dimension, measures[0], 'sum', "a measure split by a category")
+        else:
+            add('bar', f"Rows by {dimension}", dimension, reason="a categorical column")
+    small = [name for name in dimensions if 1 < unique_counts.get(name, 0) <= MAX_PIE_VALUES]
+    if small:
+        add('pie', f"Share of rows by {small[0]}", small[0], reason=f"a category with at most {MAX_PIE_VALUES} values")
+    if correlations:
+        a, b, r = correlations[0]
+        add('scatter', f"{b} against {a}", a, b, 'none', f"correlation of {r:.2f}")
+    elif len(measures) >= 2:
+        add('scatter', f"{measures[1]} against {measures[0]}", measures[0], measures[1], 'none', "two measures")
+    if measures:
+        add('histogram', f"Distribution of {measures[0]}", measures[0], reason="a numeric measure")
+    if len(measures) >= 3:
+        add('heatmap', "Correlation between measures", measures[0], reason="three or more measures")
+    return charts[:MAX_CHART_SPECS]
+
+
+def _summary(stats: Dict[str, Any], roles: Dict[str, str], domain: Dict[str, Any]) -> str:
+    counts = {role: len(_names(roles, role)) for role in ('measure', 'dimension', 'date', 'identifier', 'text')}
+    kind = f"{domain['name']} data" if domain['name'] != 'General' else "a general-purpose table"
+    parts = [f"{counts['measure']} numeric measure{'s' if counts['measure'] != 1 else ''}",
+             f"{counts['dimension']} categor{'ies' if counts['dimension'] != 1 else 'y'}"]
+    if counts['date']:
+        parts.append(f"{counts['date']} date column{'s' if counts['date'] != 1 else ''}")
+    if counts['identifier']:
+        parts.append(f"{counts['identifier']} identifier{'s' if counts['identifier'] != 1 else ''}")
+    summary = (f"{stats['row_count']:,} rows and {stats['column_count']} columns that look like {kind}, "
+               f"with {', '.join(parts)}.")
+    if stats.get("sampled"):
+        summary += " Figures are estimated from a random sample."
+    return summary
+
+
+def _numeric_values(series: pd.Series) -> np.ndarray:
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+
+def _format_number(value: float) -> str:
+    if abs(value) >= 1000:
+        return f"{value:,.0f}"
+    return f"{value:.3g}"
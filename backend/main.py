@@ -1,13 +1,26 @@
 # backend/main.py
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
-import os
-import tempfile
-import shutil
-from file_processor import FileProcessor
-from supabase import create_client, Client
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Callable, Tuple, Literal, Set
+import time
+import uuid
+import asyncio
+from file_processor import FileProcessor, PROCESSOR_VERSION
+from result_cache import ResultCache
+from processing_pool import ProcessingPool
+from job_queue import JobStore, JobQueue, QueueFullError, PermanentJobError
+from storage import StorageClient, DownloadedFile, FileTooLargeError
+from bulk_writer import BulkWriter
+from aggregation import aggregate, build_filter_mask, AggregationError
+from row_store import RowStore, RowQueryError
+from progress_events import ProgressBus
+from readers import EXCEL_TYPES
+from serialization import FastJSONResponse, to_jsonable, dumps
+import metrics
+from supabase._async.client import create_client as create_async_client, Client as AsyncClient
 import logging
 from datetime import datetime
 
@@ -15,7 +28,7 @@ from datetime import datetime
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Instagraph File Processing API", version="1.0.0")
+app = FastAPI(title="Instagraph File Processing API", version="1.0.0", default_response_class=FastJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -27,31 +40,49 @@ app.add_middleware(
 )
 
 # Import configuration
-from config import SUPABASE_URL, SUPABASE_SERVICE_KEY, OPENAI_API_KEY
+from config import (
+    SUPABASE_URL, SUPABASE_SERVICE_KEY, OPENAI_API_KEY,
+    RESULT_CACHE_DIR, RESULT_CACHE_MEMORY_ENTRIES, RESULT_CACHE_MAX_MB,
+    PROCESS_POOL_WORKERS, JOB_DB_PATH, JOB_WORKERS, JOB_QUEUE_MAX, JOB_MAX_ATTEMPTS,
+    JOB_RETRY_BACKOFF_SECONDS, JOB_RETENTION_SECONDS, STORAGE_DOWNLOAD_CONCURRENCY, DB_WRITE_CONCURRENCY, BATCH_WRITE_SIZE,
+    BATCH_MAX_FILES, TEMP_DIR, MAX_FILE_SIZE_MB, IN_MEMORY_MAX_MB, STREAMING_THRESHOLD_MB, SAMPLING_THRESHOLD_MB,
+    ROW_STORE_DIR, ROW_STORE_MAX_MB, ROW_VIEW_CACHE_ENTRIES,
+    PROGRESS_HISTORY_EVENTS, PROGRESS_SUBSCRIBER_QUEUE, PROGRESS_RETENTION_SECONDS, PROGRESS_KEEPALIVE_SECONDS
+)
 
 if not all([OPENAI_API_KEY, SUPABASE_URL, SUPABASE_SERVICE_KEY]):
     raise ValueError("Missing required environment variables. Please check your .env file.")
 
+# Files above the download limit never reach the large-file paths
+for threshold_name, threshold_mb in (("STREAMING_THRESHOLD_MB", STREAMING_THRESHOLD_MB),
+                                     ("SAMPLING_THRESHOLD_MB", SAMPLING_THRESHOLD_MB)):
+    if threshold_mb >= MAX_FILE_SIZE_MB:
+        logger.warning(f"{threshold_name}={threshold_mb} is not below MAX_FILE_SIZE_MB={MAX_FILE_SIZE_MB}; "
+                       f"files large enough for it are rejected at download")
+
 # Initialize services
 file_processor = FileProcessor(OPENAI_API_KEY)
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-
-def clean_for_json(obj):
-    """Recursively clean objects for JSON serialization"""
-    if isinstance(obj, dict):
-        return {key: clean_for_json(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [clean_for_json(item) for item in obj]
-    elif hasattr(obj, 'isoformat'):  # datetime objects
-        return obj.isoformat()
-    elif hasattr(obj, 'item'):  # numpy scalars
-        return obj.item()
-    elif hasattr(obj, 'tolist'):  # numpy arrays
-        return obj.tolist()
-    elif hasattr(obj, '__dict__'):  # custom objects
-        return str(obj)
-    else:
-        return obj
+supabase: AsyncClient = create_async_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+result_cache = ResultCache(RESULT_CACHE_DIR, RESULT_CACHE_MEMORY_ENTRIES, RESULT_CACHE_MAX_MB, PROCESSOR_VERSION)
+processing_pool = ProcessingPool(PROCESS_POOL_WORKERS)
+storage_client = StorageClient(SUPABASE_URL, SUPABASE_SERVICE_KEY, 'user-uploads', STORAGE_DOWNLOAD_CONCURRENCY)
+row_store = RowStore(ROW_STORE_DIR, ROW_STORE_MAX_MB, ROW_VIEW_CACHE_ENTRIES)
+progress_bus = ProgressBus(PROGRESS_HISTORY_EVENTS, PROGRESS_SUBSCRIBER_QUEUE, PROGRESS_RETENTION_SECONDS)
+
+@app.on_event("startup")
+async def start_processing_pool():
+    processing_pool.start()
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def stop_processing_pool():
+    await job_queue.stop()
+    # Unfinished enrichments are retried the next time the file is processed
+    for task in list(enrichment_tasks):
+        task.cancel()
+    await batch_result_writer.close()
+    await storage_client.close()
+    processing_pool.shutdown()
 
 # Pydantic models
 class ProcessFileRequest(BaseModel):
@@ -59,12 +90,63 @@ class ProcessFileRequest(BaseModel):
     user_id: str
     file_path: str
     file_type: str
+    # Workbook sheet to process; the first sheet when omitted
+    sheet_name: Optional[str] = None
+    # "auto" estimates results for very large files from a sample and queues an exact run
+    mode: Literal['auto', 'exact', 'sampled'] = 'auto'
+
+class BatchProcessRequest(BaseModel):
+    files: List[ProcessFileRequest]
 
 class ProcessFileResponse(BaseModel):
     success: bool
     message: str
     data: Optional[Dict[str, Any]] = None
 
+class AggregateRequest(BaseModel):
+    x_column: str
+    y_column: Optional[str] = None
+    group_by: Optional[str] = None
+    agg: str = "sum"
+    chart_type: str = "bar"
+    numeric_ranges: Dict[str, Dict[str, Optional[float]]] = {}
+    category_filters: Dict[str, List[Any]] = {}
+    date_ranges: Dict[str, Dict[str, Optional[str]]] = {}
+    bins: Optional[int] = Field(None, ge=1, le=200)
+    max_points: int = 500
+
+class SortKey(BaseModel):
+    column: str
+    descending: bool = False
+
+class RowsRequest(BaseModel):
+    offset: int = Field(0, ge=0)
+    limit: int = Field(100, ge=1, le=1000)
+    # Opaque position returned as `next_cursor`; overrides offset
+    cursor: Optional[str] = None
+    sort: List[SortKey] = []
+    # All columns when omitted
+    columns: Optional[List[str]] = None
+    numeric_ranges: Dict[str, Dict[str, Optional[float]]] = {}
+    category_filters: Dict[str, List[Any]] = {}
+    date_ranges: Dict[str, Dict[str, Optional[str]]] = {}
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    with metrics.in_flight("requests"):
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Label by route template so file ids do not create a series each
+            route = request.scope.get("route")
+            metrics.REQUEST_SECONDS.labels(
+                request.method, route.path if route else "unmatched", str(status)
+            ).observe(time.perf_counter() - started)
+
 @app.get("/")
 async def root():
     return {"message": "Instagraph File Processing API", "status": "running"}
@@ -73,44 +155,42 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "file-processor"}
 
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus metrics: stage latency and memory histograms, error counters, queue and in-flight gauges
+    """
+    # Collecting the queue depth reads the job database
+    content = await run_in_threadpool(metrics.render)
+    return Response(content=content, media_type=metrics.CONTENT_TYPE_LATEST)
+
 @app.post("/process-file", response_model=ProcessFileResponse)
-async def process_file(request: ProcessFileRequest, background_tasks: BackgroundTasks):
+async def process_file(request: ProcessFileRequest):
     """
     Process an uploaded file and update the database with insights
     """
     try:
         logger.info(f"Processing file request for file_id: {request.file_id}")
         
-        # Download file from Supabase storage
-        file_content = await download_file_from_storage(request.file_path)
-        if not file_content:
+        processing_result = await run_file_processing(request)
+        if processing_result is None:
             raise HTTPException(status_code=404, detail="File not found in storage")
+        ai_context = processing_result.pop("ai_context", None)
         
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{request.file_type}") as temp_file:
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
+        # Update database with processing results; LLM enrichment follows in the background
+        await update_file_processing_results(request.file_id, processing_result)
+        publish_saved(request, processing_result, schedule_ai_enrichment(request, processing_result, ai_context))
         
-        try:
-            # Process the file
-            processing_result = file_processor.process_file(temp_file_path, request.file_type)
-            
-            # Update database with processing results
-            await update_file_processing_results(request.file_id, processing_result)
-            
-            return ProcessFileResponse(
-                success=True,
-                message="File processed successfully",
-                data=processing_result
-            )
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        # Serialized straight from the result; skips re-validating it through the response model
+        return FastJSONResponse({
+            "success": True,
+            "message": "File processed successfully",
+            "data": processing_result
+        })
                 
     except Exception as e:
         logger.error(f"Error processing file {request.file_id}: {str(e)}")
+        publish_progress(request, "error", {"message": str(e)}, final=True)
         
         # Update database with error status
         await update_file_processing_results(request.file_id, {
@@ -126,106 +206,699 @@ async def process_file(request: ProcessFileRequest, background_tasks: Background
         )
 
 @app.post("/process-file-async", response_model=ProcessFileResponse)
-async def process_file_async(request: ProcessFileRequest, background_tasks: BackgroundTasks):
+async def process_file_async(request: ProcessFileRequest):
     """
-    Process file asynchronously in the background
+    Queue a file for processing; poll /jobs/{job_id} for progress
     """
     try:
-        # Add to background tasks
-        background_tasks.add_task(process_file_background, request)
+        job = await job_queue.submit(request.dict())
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    publish_progress(request, "queued", {"job_id": job["id"]})
+    
+    return ProcessFileResponse(
+        success=True,
+        message="File processing queued",
+        data={"job_id": job["id"], "status": job["status"]}
+    )
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Status, current stage and progress of a processing job
+    """
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running processing job
+    """
+    job = await job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == "cancelled":
+        publish_progress(ProcessFileRequest(**job["payload"]), "error", {"message": "Processing cancelled"}, final=True)
+    return job
+
+@app.post("/process-files-batch", response_model=ProcessFileResponse)
+async def process_files_batch(request: BatchProcessRequest):
+    """
+    Queue several files at once; poll /batches/{batch_id} for aggregate progress
+    """
+    if not request.files:
+        raise HTTPException(status_code=400, detail="No files to process")
+    if len(request.files) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_FILES} files per batch")
+    
+    batch_id = str(uuid.uuid4())
+    try:
+        jobs = await job_queue.submit_many([file.dict() for file in request.files], batch_id=batch_id)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    for file, job in zip(request.files, jobs):
+        publish_progress(file, "queued", {"job_id": job["id"]})
+    
+    return ProcessFileResponse(
+        success=True,
+        message=f"Queued {len(jobs)} files for processing",
+        data={"batch_id": batch_id, "job_ids": [job["id"] for job in jobs]}
+    )
+
+@app.get("/batches/{batch_id}")
+async def get_batch(batch_id: str):
+    """
+    Aggregate progress of a batch and the status of each of its jobs
+    """
+    jobs = await job_queue.list_batch(batch_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    counts: Dict[str, int] = {}
+    for job in jobs:
+        counts[job["status"]] = counts.get(job["status"], 0) + 1
+    finished = sum(counts.get(status, 0) for status in ("completed", "failed", "cancelled"))
+    
+    return {
+        "batch_id": batch_id,
+        "total": len(jobs),
+        "status_counts": counts,
+        "progress": round(sum(job["progress"] for job in jobs) / len(jobs), 3),
+        "done": finished == len(jobs),
+        "jobs": [
+            {key: job[key] for key in ("id", "file_id", "status", "stage", "progress", "error")}
+            for job in jobs
+        ]
+    }
+
+async def process_job(job: Dict[str, Any], report: Callable[[str, float], None]):
+    """
+    Job handler: process the file and store the results
+    """
+    request = ProcessFileRequest(**job["payload"])
+    logger.info(f"Starting job {job['id']} for file_id: {request.file_id}")
+    
+    try:
+        processing_result = await run_file_processing(request, report)
+    except FileTooLargeError as e:
+        raise PermanentJobError(str(e))
+    if processing_result is None:
+        raise FileNotFoundError(f"File not found in storage: {request.file_path}")
+    ai_context = processing_result.pop("ai_context", None)
+    
+    # Update database with processing results; batch jobs are written together
+    report("saving", 0.9)
+    if job.get("batch_id"):
+        await batch_result_writer.write(request.file_id, build_processing_update(processing_result))
+    else:
+        await update_file_processing_results(request.file_id, processing_result)
+    publish_saved(request, processing_result, schedule_ai_enrichment(request, processing_result, ai_context))
+    
+    if processing_result.get("processing_status") == "error":
+        raise PermanentJobError(processing_result.get("error_message", "Processing failed"))
+    
+    logger.info(f"Successfully processed file {request.file_id}")
+
+async def record_job_failure(job: Dict[str, Any], error: str):
+    """
+    Mark the file as failed once a job has exhausted its retries
+    """
+    publish_progress(ProcessFileRequest(**job["payload"]), "error", {"message": error}, final=True)
+    await update_file_processing_results(job["payload"]["file_id"], {
+        "processing_status": "error",
+        "error_message": error,
+        "processed_at": None
+    })
+
+job_queue = JobQueue(
+    JobStore(JOB_DB_PATH),
+    handler=process_job,
+    workers=JOB_WORKERS,
+    max_pending=JOB_QUEUE_MAX,
+    max_attempts=JOB_MAX_ATTEMPTS,
+    retry_backoff_seconds=JOB_RETRY_BACKOFF_SECONDS,
+    on_failure=record_job_failure,
+    retention_seconds=JOB_RETENTION_SECONDS
+)
+metrics.register_queue(job_queue.depth)
+
+def _ignore_progress(stage: str, progress: float):
+    pass
+
+async def run_file_processing(
+    request: ProcessFileRequest,
+    report: Callable[[str, float], None] = _ignore_progress
+) -> Optional[Dict[str, Any]]:
+    """
+    Process a file, reusing the cached parse of identical content when available.
+    Stage changes are passed to `report`. Returns None if the file is not in storage.
+    The time spent in each stage of this run is added to metadata["timings"].
+    """
+    with metrics.in_flight("processing"), metrics.collect_timings() as timings:
+        processing_result = await process_with_caches(request, report)
+    if processing_result is None:
+        return None
+    
+    metadata = processing_result.setdefault("metadata", {})
+    metadata["timings"] = {**metadata.get("timings", {}), **timings.as_dict()}
+    if processing_result.get("processing_status") == "completed":
+        publish_progress(request, "insights", {
+            "row_count": processing_result.get("row_count", 0),
+            "column_count": processing_result.get("column_count", 0),
+            "sampled": processing_result.get("sampled", False),
+            "ai_insights": processing_result.get("ai_insights", {}),
+        })
+    return processing_result
+
+async def process_with_caches(
+    request: ProcessFileRequest,
+    report: Callable[[str, float], None]
+) -> Optional[Dict[str, Any]]:
+    # The recorded hash only describes the object while its storage version is unchanged
+    stored_metadata = await get_stored_metadata(request.file_id)
+    content_hash = await trusted_content_hash(stored_metadata, request.file_path)
+    if content_hash:
+        version = stored_metadata['storage_version']
+        with metrics.track("result_cache_read"):
+            cached_result = await run_in_threadpool(result_cache.get, content_hash, request.file_type, request.sheet_name)
+        if cached_result is not None:
+            logger.info(f"Result cache hit for file_id: {request.file_id}")
+            return with_storage_version(cached_result, version)
+    if file_processor.has_cached_table(content_hash, request.file_type, request.sheet_name):
+        logger.info(f"Using cached parse for file_id: {request.file_id}")
+        processing_result = await process_and_cache(
+            None, request.file_type, content_hash, report, sheet_name=request.sheet_name, mode=request.mode,
+            on_stage=stage_publisher(request)
+        )
+        return await schedule_exact_recompute(request, with_storage_version(processing_result, version))
+    
+    # Download file from Supabase storage (in memory if small, otherwise streamed to TEMP_DIR)
+    report("downloading", 0.05)
+    downloaded = await download_file_from_storage(request.file_path, request.file_type)
+    if downloaded is None:
+        return None
+    publish_progress(request, "downloaded", {"size_bytes": downloaded.size, "content_hash": downloaded.content_hash})
+    
+    try:
+        # Identical uploads reuse the stored result
+        with metrics.track("result_cache_read"):
+            cached_result = await run_in_threadpool(
+                result_cache.get, downloaded.content_hash, request.file_type, request.sheet_name
+            )
+        if cached_result is not None:
+            logger.info(f"Result cache hit for file_id: {request.file_id}")
+            return with_storage_version(cached_result, downloaded.version)
         
-        return ProcessFileResponse(
-            success=True,
-            message="File processing started in background",
-            data=None
+        processing_result = await process_and_cache(
+            downloaded.path, request.file_type, downloaded.content_hash, report,
+            content=downloaded.content, sheet_name=request.sheet_name, mode=request.mode,
+            on_stage=stage_publisher(request)
+        )
+        return await schedule_exact_recompute(request, with_storage_version(processing_result, downloaded.version))
+    finally:
+        # Clean up temporary file
+        downloaded.cleanup()
+
+def with_storage_version(processing_result: Dict[str, Any], version: Optional[str]) -> Dict[str, Any]:
+    """
+    Record the storage version the result describes, so later requests can
+    trust its content hash without downloading the object again
+    """
+    processing_result.setdefault("metadata", {})["storage_version"] = version
+    return processing_result
+
+async def schedule_exact_recompute(request: ProcessFileRequest, processing_result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Queue an exact run when auto mode estimated the result from a sample;
+    its result replaces the sampled one in the database and the result cache
+    """
+    if not processing_result.get("sampled") or request.mode != "auto":
+        return processing_result
+    try:
+        job = await job_queue.submit({**request.dict(), "mode": "exact"})
+    except QueueFullError:
+        logger.warning(f"Queue full, no exact recompute for sampled file_id: {request.file_id}")
+        return processing_result
+    processing_result["metadata"]["exact_job_id"] = job["id"]
+    return processing_result
+
+async def process_and_cache(
+    file_path: Optional[str],
+    file_type: str,
+    content_hash: str,
+    report: Callable[[str, float], None] = _ignore_progress,
+    content: Optional[bytes] = None,
+    sheet_name: Optional[str] = None,
+    mode: str = 'auto',
+    on_stage: Optional[Callable[[str, Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Profile the file in the process pool and remember the result by content
+    hash. The result carries local insights; the cached copy keeps its
+    "ai_context" until LLM enrichment has replaced it. `on_stage` receives
+    the worker's partial results as they are computed.
+    """
+    report("profiling", 0.2)
+    with metrics.track("process_pool"):
+        processing_result = await processing_pool.profile_file(
+            file_path, file_type, content_hash, content, sheet_name, mode, on_stage
         )
+    # Stages measured inside the worker process
+    metrics.observe_timings(processing_result.get("metadata", {}).get("timings", {}))
+    await cache_result(content_hash, file_type, processing_result, sheet_name)
+    return processing_result
+
+async def cache_result(content_hash: str, file_type: str, processing_result: Dict[str, Any],
+                       sheet_name: Optional[str] = None):
+    # Timings and the storage version describe one run and one object, so they are not cached with the result
+    cached = {**processing_result, "metadata": {
+        key: value for key, value in processing_result.get("metadata", {}).items()
+        if key not in ("timings", "storage_version")
+    }}
+    with metrics.track("result_cache_write"):
+        await run_in_threadpool(result_cache.put, content_hash, file_type, cached, sheet_name)
+
+enrichment_tasks: Set[asyncio.Task] = set()
+
+def schedule_ai_enrichment(request: ProcessFileRequest, processing_result: Dict[str, Any],
+                           ai_context: Optional[Dict[str, Any]]) -> bool:
+    """
+    Enrich the published local insights with the LLM in the background, so
+    the time to the first result does not depend on it. Returns whether an
+    enrichment was scheduled.
+    """
+    if ai_context is None or processing_result.get("processing_status") != "completed":
+        return False
+    task = asyncio.create_task(enrich_ai_insights(request, processing_result, ai_context))
+    enrichment_tasks.add(task)
+    task.add_done_callback(enrichment_tasks.discard)
+    return True
+
+async def enrich_ai_insights(request: ProcessFileRequest, processing_result: Dict[str, Any],
+                             ai_context: Dict[str, Any]):
+    """
+    Merge LLM insights into the stored row, and into the cached result once
+    they succeeded (a failed enrichment is retried on the next cache hit)
+    """
+    try:
+        with metrics.in_flight("ai_enrichment"), metrics.collect_timings() as timings:
+            with metrics.track("ai_insights"):
+                ai_insights = await file_processor.enrich_ai_insights_async(
+                    processing_result["ai_insights"], ai_context, request.file_type
+                )
+        if await write_ai_insights(request.file_id, ai_insights, timings.as_dict()):
+            publish_progress(request, "enriched", {"ai_insights": ai_insights}, final=True)
         
+        content_hash = processing_result.get("metadata", {}).get("content_hash")
+        if ai_insights["enrichment"] == "completed" and content_hash:
+            await cache_result(content_hash, request.file_type,
+                               {**processing_result, "ai_insights": ai_insights}, request.sheet_name)
     except Exception as e:
-        logger.error(f"Error starting background processing for file {request.file_id}: {str(e)}")
-        return ProcessFileResponse(
-            success=False,
-            message=f"Error starting processing: {str(e)}",
-            data=None
+        logger.error(f"Error enriching insights for {request.file_id}: {str(e)}")
+        publish_progress(request, "enriched", {"ai_insights": {**processing_result["ai_insights"], "enrichment": "failed"}},
+                         final=True)
+
+async def write_ai_insights(file_id: str, ai_insights: Dict[str, Any], timings: Dict[str, Any]) -> bool:
+    """
+    Replace the pending insights in a row's metadata; rows a newer run has
+    already replaced are left alone. Returns whether the row was written.
+    """
+    with metrics.track("db_read"):
+        result = await supabase.table('uploaded_files').select('metadata').eq('id', file_id).execute()
+    if not result.data:
+        return False
+    metadata = result.data[0].get('metadata') or {}
+    if (metadata.get('ai_insights') or {}).get('enrichment') != 'pending':
+        logger.info(f"Insights of file {file_id} changed during enrichment, not overwriting them")
+        return False
+    await write_file_update(file_id, {"metadata": to_jsonable({
+        **metadata,
+        "ai_insights": ai_insights,
+        "timings": {**(metadata.get('timings') or {}), **timings}
+    })})
+    return True
+
+@app.get("/files/{file_id}/events")
+async def stream_file_events(file_id: str, request: Request):
+    """
+    Server-Sent Events with the progress of a file's processing run, from
+    its first event; the stream ends after the run's final event
+    """
+    return event_stream(f"file:{file_id}", request, replay=True)
+
+@app.get("/users/{user_id}/events")
+async def stream_user_events(user_id: str, request: Request):
+    """
+    Server-Sent Events with the progress of all of a user's files, for file
+    lists; stays open, and replays only what a reconnecting client missed
+    """
+    return event_stream(f"user:{user_id}", request, replay=False)
+
+def event_stream(topic_key: str, request: Request, replay: bool) -> StreamingResponse:
+    try:
+        last_event_id = int(request.headers["last-event-id"])
+    except (KeyError, ValueError):
+        last_event_id = None
+    
+    async def events():
+        with metrics.in_flight("progress_subscribers"):
+            async for record in progress_bus.subscribe(topic_key, last_event_id, replay, PROGRESS_KEEPALIVE_SECONDS):
+                if record is None:
+                    yield b": keepalive\n\n"
+                else:
+                    yield b"id: %d\nevent: %s\ndata: %s\n\n" % (record["id"], record["event"].encode(), dumps(record))
+    
+    # Proxies must pass events through as they are written
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def publish_progress(request: ProcessFileRequest, event: str, data: Optional[Dict[str, Any]] = None,
+                     final: bool = False):
+    """
+    Push a stage of a file's processing to its subscribers and its user's
+    """
+    progress_bus.publish(request.file_id, event, data, final, request.user_id)
+
+def stage_publisher(request: ProcessFileRequest) -> Callable[[str, Dict[str, Any]], None]:
+    """Callback publishing the stages a worker process reports for this request"""
+    return lambda stage, data: publish_progress(request, stage, data)
+
+def publish_saved(request: ProcessFileRequest, processing_result: Dict[str, Any], enriching: bool):
+    """The run's results are stored; it is over unless LLM enrichment follows"""
+    publish_progress(request, "saved", {
+        "processing_status": processing_result.get("processing_status", "completed"),
+        "enrichment": "pending" if enriching else processing_result.get("ai_insights", {}).get("enrichment"),
+    }, final=not enriching)
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Hit/miss counters of the processing result cache and the LLM response cache
+    """
+    return {**result_cache.stats(), "llm": file_processor.llm.stats()}
+
+@app.delete("/cache")
+async def invalidate_cache(content_hash: Optional[str] = None):
+    """
+    Invalidate cached results for one content hash, or all of them
+    """
+    removed = await run_in_threadpool(result_cache.invalidate, content_hash)
+    return {"success": True, "removed": removed}
+
+@app.get("/files/{file_id}/columns/{column_name}/values")
+async def get_column_values(
+    file_id: str,
+    column_name: str,
+    prefix: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """
+    Page through the distinct values of a column, optionally filtered by prefix
+    """
+    record = await get_file_record(file_id)
+    metadata = record.get('metadata') or {}
+    content_hash = await trusted_content_hash(metadata, record['storage_path'])
+    # Sorted values are kept per cached table, so later pages skip loading and sorting the column
+    table_key = file_processor.columnar_cache.key_for(content_hash, record['file_type'], metadata.get('sheet_name')) \
+        if content_hash else None
+    values = file_processor.cached_column_values(table_key, column_name, prefix, offset, limit)
+    if values is None:
+        df = await load_record_dataframe(record, content_hash, columns=[column_name])
+        values = await run_in_threadpool(
+            file_processor.get_column_values, df, column_name, prefix, offset, limit, table_key
         )
+    if values is None:
+        raise HTTPException(status_code=404, detail=f"Column not found: {column_name}")
+    return FastJSONResponse(values)
 
-async def process_file_background(request: ProcessFileRequest):
+@app.post("/files/{file_id}/aggregate")
+async def aggregate_file(file_id: str, request: AggregateRequest):
     """
-    Background task to process file
+    Filter and aggregate the full dataset into chart-ready series
     """
+    columns = [request.x_column, request.y_column, request.group_by,
+               *request.numeric_ranges, *request.category_filters, *request.date_ranges]
+    df = await load_file_dataframe(file_id, columns=[col for col in columns if col])
+    
+    def run_aggregation():
+        mask = build_filter_mask(df, request.numeric_ranges, request.category_filters, request.date_ranges)
+        return aggregate(
+            df,
+            x_column=request.x_column,
+            y_column=request.y_column,
+            agg=request.agg,
+            chart_type=request.chart_type,
+            group_by=request.group_by,
+            bins=request.bins,
+            max_points=max(2, min(request.max_points, 5000)),
+            mask=mask
+        )
+    
     try:
-        logger.info(f"Starting background processing for file_id: {request.file_id}")
-        
-        # Download file from Supabase storage
-        file_content = await download_file_from_storage(request.file_path)
-        if not file_content:
-            logger.error(f"File not found in storage: {request.file_path}")
-            return
-        
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{request.file_type}") as temp_file:
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
-        
-        try:
-            # Process the file
-            processing_result = file_processor.process_file(temp_file_path, request.file_type)
-            
-            # Update database with processing results
-            await update_file_processing_results(request.file_id, processing_result)
-            
-            logger.info(f"Successfully processed file {request.file_id}")
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
-                
+        result = await run_in_threadpool(run_aggregation)
+    except AggregationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(result)
+
+@app.get("/files/{file_id}/rows")
+async def get_file_rows(
+    file_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    sort: List[str] = Query([]),
+    columns: List[str] = Query([])
+):
+    """
+    Page through the full dataset; `sort` takes one `column` or `column:desc` per key
+    """
+    request = RowsRequest(offset=offset, limit=limit, cursor=cursor, columns=columns or None, sort=[
+        SortKey(column=key[:-5], descending=True) if key.endswith(':desc')
+        else SortKey(column=key[:-4] if key.endswith(':asc') else key)
+        for key in sort
+    ])
+    return await query_file_rows(file_id, request)
+
+@app.post("/files/{file_id}/rows")
+async def query_file_rows(file_id: str, request: RowsRequest):
+    """
+    Page through the full dataset, sorted by several columns and filtered like aggregations
+    """
+    key = await load_row_table(file_id)
+    try:
+        with metrics.track("rows"):
+            page = await run_in_threadpool(
+                row_store.page, key, request.offset, request.limit,
+                [(item.column, item.descending) for item in request.sort], request.columns, request.cursor,
+                request.numeric_ranges, request.category_filters, request.date_ranges
+            )
+    except (RowQueryError, AggregationError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page is None:
+        raise HTTPException(status_code=404, detail="Table not available for row access")
+    return FastJSONResponse(page)
+
+@app.get("/files/{file_id}/sheets")
+async def get_file_sheets(file_id: str):
+    """
+    Sheet names of an uploaded workbook and the sheet that was processed
+    """
+    record = await get_file_record(file_id)
+    metadata = record.get('metadata') or {}
+    if record['file_type'] not in EXCEL_TYPES:
+        return {"sheets": [], "selected": None}
+    
+    try:
+        downloaded = await download_file_from_storage(record['storage_path'], record['file_type'])
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    if downloaded is None:
+        raise HTTPException(status_code=404, detail="File not found in storage")
+    
+    try:
+        sheets = await run_in_threadpool(
+            file_processor.list_sheets, downloaded.path, record['file_type'], downloaded.content
+        )
+    finally:
+        downloaded.cleanup()
+    
+    selected = metadata.get('sheet_name') or (sheets[0] if sheets else None)
+    return {"sheets": sheets, "selected": selected}
+
+async def get_file_record(file_id: str) -> Dict[str, Any]:
+    """
+    Look up the storage path and type of an uploaded file
+    """
+    with metrics.track("db_read"):
+        result = await supabase.table('uploaded_files').select('storage_path, file_type, metadata').eq('id', file_id).execute()
+    if not result.data:
+        raise HTTPException(status_code=404, detail="File not found")
+    return result.data[0]
+
+async def get_stored_metadata(file_id: str) -> Dict[str, Any]:
+    """
+    Metadata recorded the last time this file was processed, if any
+    """
+    try:
+        with metrics.track("db_read"):
+            result = await supabase.table('uploaded_files').select('metadata').eq('id', file_id).execute()
+        if result.data:
+            return result.data[0].get('metadata') or {}
     except Exception as e:
-        logger.error(f"Error in background processing for file {request.file_id}: {str(e)}")
-        
-        # Update database with error status
-        await update_file_processing_results(request.file_id, {
-            "processing_status": "error",
-            "error_message": str(e),
-            "processed_at": None
-        })
+        logger.error(f"Error reading metadata for {file_id}: {str(e)}")
+    return {}
+
+async def trusted_content_hash(metadata: Dict[str, Any], file_path: str) -> Optional[str]:
+    """
+    Recorded content hash of a stored object, or None unless the object is
+    still at the storage version it had when the hash was recorded
+    """
+    content_hash = metadata.get('content_hash')
+    recorded_version = metadata.get('storage_version')
+    if not content_hash or not recorded_version:
+        return None
+    try:
+        with metrics.track("storage_head"):
+            current_version = await storage_client.object_version(file_path)
+    except Exception as e:
+        logger.error(f"Error reading storage version of {file_path}: {str(e)}")
+        return None
+    return content_hash if current_version == recorded_version else None
+
+async def load_file_dataframe(file_id: str, columns: Optional[List[str]] = None):
+    """
+    Load the table of an uploaded file, from the columnar cache when possible
+    """
+    record = await get_file_record(file_id)
+    content_hash = await trusted_content_hash(record.get('metadata') or {}, record['storage_path'])
+    return await load_record_dataframe(record, content_hash, columns)
+
+async def load_record_dataframe(record: Dict[str, Any], content_hash: Optional[str], columns: Optional[List[str]] = None):
+    """
+    Load an uploaded file's table from the columnar cache entry of `content_hash`,
+    parsing the stored file if there is none
+    """
+    sheet_name = (record.get('metadata') or {}).get('sheet_name')
+    if file_processor.has_cached_table(content_hash, record['file_type'], sheet_name):
+        df = await run_in_threadpool(
+            file_processor.load_dataframe, None, record['file_type'], content_hash, columns, None, sheet_name
+        )
+        if df is not None:
+            return df
+    
+    _, df = await parse_stored_file(record)
+    return df
+
+async def load_row_table(file_id: str) -> str:
+    """
+    Row store key of an uploaded file's table, laying the table out from the
+    columnar cache (parsing the stored file first if needed) on first use
+    """
+    record = await get_file_record(file_id)
+    metadata = record.get('metadata') or {}
+    file_type = record['file_type']
+    sheet_name = metadata.get('sheet_name')
+    content_hash = await trusted_content_hash(metadata, record['storage_path'])
+    if not file_processor.has_cached_table(content_hash, file_type, sheet_name):
+        # Parsing stores the table in the columnar cache under the downloaded content's hash
+        content_hash, _ = await parse_stored_file(record)
+    key = file_processor.columnar_cache.key_for(content_hash, file_type, sheet_name)
+    if row_store.has(key):
+        return key
+    parquet_path = file_processor.cached_table_path(content_hash, file_type, sheet_name)
+    if parquet_path is None or not await run_in_threadpool(row_store.build, key, parquet_path):
+        raise HTTPException(status_code=422, detail="File could not be prepared for row access")
+    return key
+
+async def parse_stored_file(record: Dict[str, Any]) -> Tuple[str, Any]:
+    """
+    Download and parse an uploaded file, caching its table; returns the content hash and the table
+    """
+    try:
+        downloaded = await download_file_from_storage(record['storage_path'], record['file_type'])
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    if downloaded is None:
+        raise HTTPException(status_code=404, detail="File not found in storage")
+    
+    try:
+        df = await run_in_threadpool(
+            file_processor.load_dataframe, downloaded.path, record['file_type'], downloaded.content_hash,
+            None, downloaded.content, (record.get('metadata') or {}).get('sheet_name')
+        )
+    finally:
+        downloaded.cleanup()
+    
+    if df is None:
+        raise HTTPException(status_code=422, detail="File could not be read")
+    return downloaded.content_hash, df
 
-async def download_file_from_storage(file_path: str) -> Optional[bytes]:
+async def download_file_from_storage(file_path: str, file_type: str) -> Optional[DownloadedFile]:
     """
-    Download file from Supabase storage
+    Download file from Supabase storage, enforcing MAX_FILE_SIZE_MB.
+    Files up to IN_MEMORY_MAX_MB stay in memory; larger ones are streamed to TEMP_DIR.
     """
     try:
-        response = supabase.storage.from_('user-uploads').download(file_path)
-        return response
+        with metrics.track("download"):
+            return await storage_client.download_to(
+                file_path,
+                temp_dir=TEMP_DIR,
+                suffix=f".{file_type}",
+                max_bytes=int(MAX_FILE_SIZE_MB * 1024 * 1024),
+                memory_threshold=int(IN_MEMORY_MAX_MB * 1024 * 1024)
+            )
+    except FileTooLargeError:
+        raise
     except Exception as e:
         logger.error(f"Error downloading file from storage: {str(e)}")
         return None
 
+def build_processing_update(processing_result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Row values for the uploaded_files table from a processing result
+    """
+    # Set processed_at to current time in proper format
+    processed_at = datetime.utcnow().isoformat() + '+00:00'
+    
+    return {
+        "row_count": processing_result.get("row_count", 0),
+        "column_count": processing_result.get("column_count", 0),
+        "data_preview": to_jsonable(processing_result.get("data_preview", {})),
+        "metadata": to_jsonable({
+            **processing_result.get("metadata", {}),
+            "ai_insights": processing_result.get("ai_insights", {}),
+            "charts": processing_result.get("charts", {}),
+            "data_types": processing_result.get("data_types", {}),
+            "missing_values": processing_result.get("missing_values", {}),
+            "numeric_summary": processing_result.get("numeric_summary", {}),
+            "sampled": processing_result.get("sampled", False),
+            "sample": processing_result.get("sample"),
+            "numeric_confidence": processing_result.get("numeric_confidence", {}),
+            "duplicate_rows": processing_result.get("duplicate_rows", 0),
+            "key_duplicates": processing_result.get("key_duplicates", {}),
+            "processing_status": processing_result.get("processing_status", "completed")
+        }),
+        "processed_at": processed_at
+    }
+
 async def update_file_processing_results(file_id: str, processing_result: Dict[str, Any]):
     """
     Update the uploaded_files table with processing results
     """
+    await write_file_update(file_id, build_processing_update(processing_result))
+
+async def write_file_update(file_id: str, update_data: Dict[str, Any]):
+    """
+    Write one row update to the uploaded_files table
+    """
     try:
-        # Set processed_at to current time in proper format
-        processed_at = datetime.utcnow().isoformat() + '+00:00'
-            
-        update_data = {
-            "row_count": processing_result.get("row_count", 0),
-            "column_count": processing_result.get("column_count", 0),
-            "data_preview": clean_for_json(processing_result.get("data_preview", {})),
-            "metadata": clean_for_json({
-                **processing_result.get("metadata", {}),
-                "ai_insights": processing_result.get("ai_insights", {}),
-                "data_types": processing_result.get("data_types", {}),
-                "missing_values": processing_result.get("missing_values", {}),
-                "numeric_summary": processing_result.get("numeric_summary", {}),
-                "processing_status": processing_result.get("processing_status", "completed")
-            }),
-            "processed_at": processed_at
-        }
-        
         # Update the database
-        result = supabase.table('uploaded_files').update(update_data).eq('id', file_id).execute()
+        with metrics.track("db_write"):
+            result = await supabase.table('uploaded_files').update(update_data).eq('id', file_id).execute()
         
         if result.data:
             logger.info(f"Successfully updated file {file_id} with processing results")
@@ -237,6 +910,25 @@ async def update_file_processing_results(file_id: str, processing_result: Dict[s
         import traceback
         traceback.print_exc()
 
+async def write_file_updates(updates: List[Tuple[str, Dict[str, Any]]]):
+    """
+    Write a group of row updates together over the shared connection pool.
+    Each row is its own UPDATE: PostgREST has no multi-row update with
+    per-row values, and an upsert of these partial rows would insert them
+    and fail the table's NOT NULL columns. The statements are issued
+    concurrently instead of as a single request.
+    """
+    semaphore = asyncio.Semaphore(DB_WRITE_CONCURRENCY)
+    
+    async def write(file_id: str, update_data: Dict[str, Any]):
+        async with semaphore:
+            await write_file_update(file_id, update_data)
+    
+    await asyncio.gather(*(write(file_id, update_data) for file_id, update_data in updates))
+    logger.info(f"Flushed {len(updates)} processing results")
+
+batch_result_writer = BulkWriter(write_file_updates, max_batch=BATCH_WRITE_SIZE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,122 @@
+# backend/metrics.py
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, Callable
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client.core import GaugeMetricFamily
+from stage_timings import StageTimings
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Stages range from sub-millisecond cache lookups to multi-minute parses
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+MEMORY_BUCKETS_MB = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+STAGE_SECONDS = Histogram(
+    'instagraph_stage_seconds', 'Duration of file processing stages', ['stage'], buckets=STAGE_BUCKETS
+)
+STAGE_ERRORS = Counter(
+    'instagraph_stage_errors_total', 'File processing stages that raised an error', ['stage']
+)
+STAGE_PEAK_RSS = Histogram(
+    'instagraph_stage_peak_rss_mb', 'Peak resident memory of a processing worker during a stage',
+    ['stage'], buckets=MEMORY_BUCKETS_MB
+)
+STAGE_RSS_GROWTH = Histogram(
+    'instagraph_stage_rss_growth_mb', 'Resident memory a processing stage added on top of what was in use',
+    ['stage'], buckets=MEMORY_BUCKETS_MB
+)
+REQUEST_SECONDS = Histogram(
+    'instagraph_http_request_seconds', 'HTTP request latency', ['method', 'route', 'status'], buckets=STAGE_BUCKETS
+)
+IN_FLIGHT = Gauge(
+    'instagraph_in_flight', 'Work currently in progress', ['kind']
+)
+
+# Stage timings of the processing run the current task belongs to
+current_timings: ContextVar[Optional[StageTimings]] = ContextVar('current_timings', default=None)
+
+
+def observe_stage(stage: str, entry: Dict[str, Any]):
+    """Record one stage entry (as produced by StageTimings) in the stage metrics"""
+    STAGE_SECONDS.labels(stage).observe(entry["seconds"])
+    if entry.get("failed"):
+        STAGE_ERRORS.labels(stage).inc()
+    if "peak_rss_mb" in entry:
+        STAGE_PEAK_RSS.labels(stage).observe(entry["peak_rss_mb"])
+        STAGE_RSS_GROWTH.labels(stage).observe(entry["rss_growth_mb"])
+
+
+def observe_timings(timings: Dict[str, Dict[str, Any]]):
+    """Record the stage timings a processing worker returned with its result"""
+    for stage, entry in timings.items():
+        observe_stage(stage, entry)
+
+
+@contextmanager
+def collect_timings():
+    """Collect the stages tracked by this block, including those of the tasks and threads it starts"""
+    timings = StageTimings(on_record=observe_stage)
+    token = current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        current_timings.reset(token)
+
+
+@contextmanager
+def track(stage: str):
+    """Time a stage into the stage metrics and the current run's timings, if any"""
+    timings = current_timings.get()
+    if timings is not None:
+        with timings.span(stage):
+            yield
+        return
+
+    started = time.perf_counter()
+    entry: Dict[str, Any] = {}
+    try:
+        yield
+    except BaseException:
+        entry["failed"] = True
+        raise
+    finally:
+        observe_stage(stage, {"seconds": time.perf_counter() - started, **entry})
+
+
+@contextmanager
+def in_flight(kind: str):
+    gauge = IN_FLIGHT.labels(kind)
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+class QueueCollector:
+    """Reports job counts by status from the job store at scrape time"""
+
+    def __init__(self, depth: Callable[[], Dict[str, int]]):
+        self.depth = depth
+
+    def collect(self):
+        family = GaugeMetricFamily('instagraph_jobs', 'Processing jobs by status', labels=['status'])
+        try:
+            for status, count in self.depth().items():
+                family.add_metric([status], count)
+        except Exception as e:
+            logger.error(f"Error reading job queue depth: {str(e)}")
+        yield family
+
+
+def register_queue(depth: Callable[[], Dict[str, int]]):
+    REGISTRY.register(QueueCollector(depth))
+
+
+def render() -> bytes:
+    return generate_latest(REGISTRY)
@@ -0,0 +1,124 @@
+# backend/processing_pool.py
+import uuid
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, Callable, Tuple
+from file_processor import FileProcessor
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# One profiling-only processor per worker process
+_worker_processor: Optional[FileProcessor] = None
+# Stage events of the running tasks, read by the parent process
+_worker_progress = None
+
+# How long to wait for a finished task's last stage events to arrive
+PROGRESS_DRAIN_SECONDS = 1.0
+
+
+def _init_worker(progress_queue=None):
+    global _worker_processor, _worker_progress
+    _worker_processor = FileProcessor()
+    _worker_progress = progress_queue
+
+
+def _profile_file(file_path: Optional[str], file_type: str, content_hash: Optional[str],
+                  content: Optional[bytes], sheet_name: Optional[str], mode: str,
+                  task_id: Optional[str] = None) -> Dict[str, Any]:
+    if task_id is None or _worker_progress is None:
+        return _worker_processor.profile_file(file_path, file_type, content_hash, content, sheet_name, mode)
+
+    def on_stage(stage: str, data: Dict[str, Any]):
+        _worker_progress.put((task_id, stage, data))
+
+    try:
+        return _worker_processor.profile_file(file_path, file_type, content_hash, content, sheet_name, mode, on_stage)
+    finally:
+        # Marks the end of the task's events; the queue keeps one process's items in order
+        _worker_progress.put((task_id, None, None))
+
+
+class ProcessingPool:
+    """
+    Runs the CPU-bound part of file processing (parsing and profiling) in a
+    pool of worker processes so the event loop stays responsive. Stage
+    events of a task come back through a queue shared with the workers and
+    are handed to the task's callback on the event loop as they happen.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._progress = None
+        self._listeners: Dict[str, Tuple[asyncio.AbstractEventLoop, Callable[[str, Dict[str, Any]], None], asyncio.Event]] = {}
+
+    def start(self):
+        if self._executor is None:
+            self._progress = multiprocessing.Queue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=_init_worker, initargs=(self._progress,)
+            )
+            threading.Thread(target=self._dispatch_progress, args=(self._progress,), daemon=True).start()
+            logger.info(f"Started processing pool with {self.max_workers} workers")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._progress.put(None)
+            self._progress = None
+
+    async def profile_file(self, file_path: Optional[str], file_type: str, content_hash: Optional[str] = None,
+                           content: Optional[bytes] = None, sheet_name: Optional[str] = None,
+                           mode: str = 'auto',
+                           on_stage: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Profile a file (on disk, or small and in memory) in a worker process.
+        `on_stage` receives the partial results of the worker's stages.
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        if on_stage is None:
+            return await loop.run_in_executor(
+                self._executor, _profile_file, file_path, file_type, content_hash, content, sheet_name, mode
+            )
+
+        task_id = uuid.uuid4().hex
+        drained = asyncio.Event()
+        self._listeners[task_id] = (loop, on_stage, drained)
+        try:
+            result = await loop.run_in_executor(
+                self._executor, _profile_file, file_path, file_type, content_hash, content, sheet_name, mode, task_id
+            )
+            # Deliver the task's stage events before its result
+            try:
+                await asyncio.wait_for(drained.wait(), PROGRESS_DRAIN_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning(f"Stage events of task {task_id} did not arrive in time")
+            return result
+        finally:
+            self._listeners.pop(task_id, None)
+
+    def _dispatch_progress(self, progress):
+        """Hand stage events from the workers to their tasks' event loops (runs in a thread)"""
+        while True:
+            item = progress.get()
+            if item is None:
+                return
+            task_id, stage, data = item
+            listener = self._listeners.get(task_id)
+            if listener is None:
+                continue
+            loop, on_stage, drained = listener
+            try:
+                if stage is None:
+                    loop.call_soon_threadsafe(drained.set)
+                else:
+                    loop.call_soon_threadsafe(on_stage, stage, data)
+            except RuntimeError:
+                pass  # the loop has closed
@@ -0,0 +1,158 @@
+# backend/profile_checkpoints.py
+import os
+import json
+import pickle
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional, Tuple
+from streaming_profiler import ProfileState
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def header_hash(file_path: str) -> Optional[str]:
+    """Hash of a CSV's header line, which every version of a growing export shares"""
+    try:
+        with open(file_path, 'rb') as f:
+            return hashlib.sha256(f.readline()).hexdigest()[:16]
+    except OSError:
+        return None
+
+
+def prefix_hash(file_path: str, length: int) -> str:
+    """SHA-256 of the first `length` bytes of a file"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        remaining = length
+        while remaining > 0:
+            block = f.read(min(HASH_BLOCK_BYTES, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+class ProfileCheckpoints:
+    """
+    Streaming profiler states of large CSVs, keyed by content hash.
+
+    A later upload whose first bytes are exactly a checkpointed file (its
+    SHA-256 is that file's content hash) and that continues after a complete
+    line is an append of it, so its profile resumes from the checkpoint on
+    the new rows only. Each checkpoint is a pickled state plus a small JSON
+    index entry; `version` must change whenever the state classes do. The
+    directory is kept under `max_size_mb` by evicting the least recently used
+    checkpoints.
+    """
+
+    def __init__(self, cache_dir: str, max_size_mb: float, version: str):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.version = version
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, content_hash: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, f"{content_hash}-{self.version}.{suffix}")
+
+    def save(self, content_hash: str, file_path: str, state: ProfileState):
+        """Checkpoint the profile state of a whole file"""
+        if self.max_size_bytes <= 0:
+            return
+        state_path = self._path(content_hash, 'pkl')
+        entry = {"content_hash": content_hash, "size": os.path.getsize(file_path),
+                 "header": header_hash(file_path), "rows": state.row_count}
+        try:
+            tmp_path = f"{state_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, state_path)
+            # The index entry is written last, so it never points at a missing state
+            with open(self._path(content_hash, 'json'), 'w') as f:
+                json.dump(entry, f)
+        except Exception as e:
+            logger.error(f"Error saving profile checkpoint {content_hash}: {str(e)}")
+            return
+        self._evict()
+
+    def find_base(self, file_path: str) -> Optional[Tuple[Dict[str, Any], ProfileState]]:
+        """
+        The largest checkpointed file that this file appends rows to, with its
+        profile state, or None. Candidates share the header line and are
+        confirmed by hashing the file's prefix of their length.
+        """
+        header = header_hash(file_path)
+        size = os.path.getsize(file_path)
+        candidates = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(f"-{self.version}.json"):
+                continue
+            try:
+                with open(os.path.join(self.cache_dir, name)) as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if entry.get("header") == header and entry["size"] < size:
+                candidates.append(entry)
+
+        for entry in sorted(candidates, key=lambda entry: -entry["size"]):
+            if not self._ends_line(file_path, entry["size"]) or prefix_hash(file_path, entry["size"]) != entry["content_hash"]:
+                continue
+            state = self._load(entry["content_hash"])
+            if state is not None:
+                return entry, state
+        return None
+
+    def _ends_line(self, file_path: str, offset: int) -> bool:
+        """Whether the first `offset` bytes end with a complete line, so the rest holds whole rows"""
+        with open(file_path, 'rb') as f:
+            f.seek(offset - 1)
+            return f.read(1) == b'\n'
+
+    def _load(self, content_hash: str) -> Optional[ProfileState]:
+        path = self._path(content_hash, 'pkl')
+        try:
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error loading profile checkpoint {content_hash}: {str(e)}")
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return state
+
+    def _evict(self):
+        """Remove least recently used checkpoints until the directory fits its size cap"""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.pkl'):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_size_bytes:
+                    break
+                for victim in (path[:-len('.pkl')] + '.json', path):
+                    try:
+                        os.unlink(victim)
+                    except FileNotFoundError:
+                        pass
+                total -= size
+                logger.info(f"Evicted profile checkpoint {os.path.basename(path)}")
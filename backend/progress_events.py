@@ -0,0 +1,119 @@
+# backend/progress_events.py
+import time
+import asyncio
+import logging
+import itertools
+from collections import deque
+from typing import Dict, Any, Optional, Set, AsyncIterator
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class _Topic:
+    def __init__(self, history_size: int):
+        self.events: deque = deque(maxlen=history_size)
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.closed = False
+        self.updated = time.monotonic()
+
+
+class ProgressBus:
+    """
+    In-process fan-out of processing progress events.
+
+    Every event of a file's run is published once to the file's topic and,
+    when the run belongs to a user, to that user's topic. Each subscriber
+    has its own bounded queue, so publishing never waits on a slow client:
+    a full queue drops its oldest event instead. A file topic keeps the
+    events of its latest run, so late subscribers catch up, and is closed
+    by a final event; the next run of the file starts a fresh history.
+    Topics without subscribers are forgotten `retention_seconds` after
+    their last event. Must be used from the event loop.
+    """
+
+    def __init__(self, history_size: int, subscriber_queue_size: int, retention_seconds: float):
+        self.history_size = history_size
+        self.subscriber_queue_size = subscriber_queue_size
+        self.retention_seconds = retention_seconds
+        self._topics: Dict[str, _Topic] = {}
+        self._ids = itertools.count(1)
+
+    def publish(self, file_id: str, event: str, data: Optional[Dict[str, Any]] = None,
+                final: bool = False, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Send an event to the file's subscribers (and the user's); a final event ends the run"""
+        record = {
+            "id": next(self._ids),
+            "file_id": file_id,
+            "event": event,
+            "data": data or {},
+            "final": final,
+            "time": time.time(),
+        }
+        topic = self._topic(f"file:{file_id}")
+        if topic.closed:
+            # A new run of the file replaces the history of the previous one
+            topic.events.clear()
+            topic.closed = False
+        self._send(topic, record)
+        topic.closed = final
+        if user_id:
+            # User topics span many runs and are never closed
+            self._send(self._topic(f"user:{user_id}"), {**record, "final": False})
+        self._prune()
+        return record
+
+    async def subscribe(self, topic_key: str, last_event_id: Optional[int] = None, replay: bool = True,
+                        keepalive_seconds: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Events of a topic ("file:<id>" or "user:<id>") as they are published,
+        after replaying the retained ones newer than `last_event_id`. Yields
+        None when `keepalive_seconds` pass without an event, and stops after
+        a final event.
+        """
+        topic = self._topic(topic_key)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_queue_size)
+        if replay or last_event_id is not None:
+            for record in topic.events:
+                if last_event_id is None or record["id"] > last_event_id:
+                    self._offer(queue, record)
+        if topic.closed and queue.empty():
+            return
+
+        topic.subscribers.add(queue)
+        try:
+            while True:
+                try:
+                    record = await asyncio.wait_for(queue.get(), keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield record
+                if record["final"]:
+                    return
+        finally:
+            topic.subscribers.discard(queue)
+            topic.updated = time.monotonic()
+
+    def _topic(self, key: str) -> _Topic:
+        topic = self._topics.get(key)
+        if topic is None:
+            topic = self._topics[key] = _Topic(self.history_size)
+        return topic
+
+    def _send(self, topic: _Topic, record: Dict[str, Any]):
+        topic.events.append(record)
+        topic.updated = time.monotonic()
+        for queue in topic.subscribers:
+            self._offer(queue, record)
+
+    def _offer(self, queue: asyncio.Queue, record: Dict[str, Any]):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(record)
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.retention_seconds
+        for key in [key for key, topic in self._topics.items() if not topic.subscribers and topic.updated < cutoff]:
+            del self._topics[key]
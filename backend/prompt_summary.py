@@ -0,0 +1,223 @@
+# backend/prompt_summary.py
+import logging
+import numpy as np
+from typing import Dict, Any, List, Optional
+from local_insights import column_roles
+from llm_client import estimate_text_tokens
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# How much a column of each role tells the model about the dataset
+ROLE_WEIGHTS = {'measure': 1.0, 'date': 0.9, 'dimension': 0.8, 'text': 0.4, 'identifier': 0.3, 'other': 0.2}
+# Share of the budget kept for sample rows and the list of omitted columns
+RESERVED_SHARE = 0.2
+SAMPLE_ROWS = 3
+SAMPLE_COLUMNS = 8
+MAX_VALUE_CHARS = 24
+TOP_VALUES = 3
+# Distinct counts up to this are part of the schema; larger ones are given as a share of the values
+MAX_EXACT_DISTINCT = 100
+TYPE_FAMILIES = (('datetime', ('datetime',)), ('bool', ('bool',)), ('int', ('int',)), ('float', ('float',)),
+                 ('text', ('object', 'string', 'category', 'str')))
+
+
+def summarize_for_prompt(stats: Dict[str, Any], data_preview: Dict[str, Any], token_budget: int = 1500) -> Dict[str, str]:
+    """
+    Compact dataset description for the LLM prompt, kept within `token_budget`
+    estimated tokens however wide the table is.
+
+    Columns are ranked by how informative they are (role, completeness,
+    whether they vary) and described one line each, most informative first:
+    role, type, missing share, distinct count and a few statistics or top
+    values. Lines are added until the budget is nearly used; the remaining
+    columns are listed by name as far as the budget allows.
+
+    The description comes in two parts. "profile" is the layout of the table
+    with every figure rounded to two significant digits and shares to
+    steps of 5%, so files of the same schema (monthly exports, say) usually
+    share it. "exact" holds what is specific to this file: the exact row and
+    duplicate counts and sample rows of the top columns.
+    """
+    columns_info = data_preview.get("columns_info", [])
+    roles = column_roles(stats, columns_info)
+    row_count = stats.get("row_count", 0)
+    ranked = _rank_columns(columns_info, roles, row_count)
+
+    lines = [
+        "Dataset Overview:",
+        f"- Rows: {_count(row_count)}",
+        f"- Columns: {stats.get('column_count', len(columns_info))}",
+    ]
+    if stats.get("duplicate_rows") and row_count:
+        lines.append(f"- Duplicate rows: {_share(stats['duplicate_rows'] / row_count)}")
+    if stats.get("sampled"):
+        lines.append("- Statistics are estimated from a random sample of the rows.")
+    lines.append("Columns (most informative first): name | role | type | missing | distinct | summary")
+
+    exact = [f"- Rows: {row_count}"]
+    if stats.get("duplicate_rows"):
+        exact.append(f"- Duplicate rows: {stats['duplicate_rows']}")
+    if stats.get("sampled"):
+        sample = stats["sample"]
+        exact.append(f"- Sampled rows: {sample['rows']} of {sample['total_rows']}")
+
+    column_budget = token_budget * (1 - RESERVED_SHARE)
+    used = estimate_text_tokens("\n".join(lines + exact))
+    included = []
+    for info in ranked:
+        line = _column_line(info, roles, stats, row_count)
+        cost = estimate_text_tokens(line) + 1
+        if used + cost > column_budget:
+            break
+        lines.append(line)
+        included.append(info["name"])
+        used += cost
+
+    omitted = [info["name"] for info in ranked[len(included):]]
+    if omitted:
+        # Half of what is left names the omitted columns, the rest is for sample rows
+        note = _omitted_note(omitted, (token_budget - used) / 2)
+        lines.append(note)
+        used += estimate_text_tokens(note) + 1
+
+    sample_rows = _sample_rows(data_preview.get("preview_data", []), included[:SAMPLE_COLUMNS])
+    if sample_rows and used + estimate_text_tokens(sample_rows) + 1 <= token_budget:
+        exact.append(sample_rows)
+    return {"profile": "\n".join(lines), "exact": "\n".join(exact)}
+
+
+def _rank_columns(columns_info: List[Dict[str, Any]], roles: Dict[str, str], row_count: int) -> List[Dict[str, Any]]:
+    """
+    Columns by informativeness, each further column of a role discounted so a
+    wide table's many measures do not crowd out its dates and dimensions
+    """
+    by_score = sorted(columns_info, key=lambda info: -_informativeness(info, roles, row_count))
+    seen: Dict[str, int] = {}
+    scored = []
+    for info in by_score:
+        role = roles.get(info["name"], 'other')
+        scored.append((_informativeness(info, roles, row_count) / (1 + seen.get(role, 0)), info))
+        seen[role] = seen.get(role, 0) + 1
+    return [info for _, info in sorted(scored, key=lambda item: -item[0])]
+
+
+def _informativeness(info: Dict[str, Any], roles: Dict[str, str], row_count: int) -> float:
+    score = ROLE_WEIGHTS.get(roles.get(info["name"], 'other'), 0.2)
+    if row_count:
+        score *= 0.5 + 0.5 * (1 - info.get("null_count", 0) / row_count)
+    if info.get("unique_count", 0) <= 1:
+        score *= 0.1  # constant or empty
+    return score
+
+
+def _column_line(info: Dict[str, Any], roles: Dict[str, str], stats: Dict[str, Any], row_count: int) -> str:
+    name = info["name"]
+    role = roles.get(name, 'other')
+    return (f"- {name} | {role} | {_type_family(info.get('type', ''))} | {_missing(info, row_count)} | "
+            f"{_distinct(info, row_count)} | {_column_summary(info, role, stats, row_count)}")
+
+
+def _missing(info: Dict[str, Any], row_count: int) -> str:
+    """Missing share of a column, as a range when it was estimated from a sample"""
+    if not row_count:
+        return "0%"
+    interval = info.get("null_count_interval")
+    if interval:
+        low, high = _share(interval[0] / row_count), _share(interval[1] / row_count)
+        if low != high:
+            return f"{low} to {high}"
+    return _share(info.get('null_count', 0) / row_count)
+
+
+def _column_summary(info: Dict[str, Any], role: str, stats: Dict[str, Any], row_count: int) -> str:
+    summary = stats.get("numeric_summary", {}).get(info["name"])
+    if role == 'measure' and summary and summary.get("count"):
+        # Quartiles rather than the extremes, which move with every new file
+        parts = [f"mean {_number(summary['mean'])}", f"median {_number(summary['50%'])}",
+                 f"quartiles {_number(summary['25%'])}..{_number(summary['75%'])}"]
+        if summary.get("std") is not None and not np.isnan(summary["std"]):
+            parts.append(f"sd {_number(summary['std'])}")
+        return ", ".join(parts)
+
+    top = info.get("top_values") or []
+    non_null = row_count - info.get("null_count", 0)
+    if role == 'dimension' and top and non_null:
+        return "top " + ", ".join(
+            f"{_value(entry['value'])} {_share(entry['count'] / non_null)}" for entry in top[:TOP_VALUES]
+        )
+    # Sample values differ from file to file; they reach the model through the sample rows
+    return ""
+
+
+def _omitted_note(names: List[Any], max_tokens: float) -> str:
+    note = f"{len(names)} less informative columns omitted"
+    listed = []
+    for name in names:
+        candidate = f"{note}: {', '.join(str(n) for n in listed + [name])}"
+        if estimate_text_tokens(candidate) > max_tokens:
+            break
+        listed.append(name)
+    if not listed:
+        return note + "."
+    more = len(names) - len(listed)
+    return f"{note}: {', '.join(str(n) for n in listed)}{f' and {more} more' if more else ''}."
+
+
+def _sample_rows(preview_data: List[Dict[str, Any]], columns: List[Any]) -> Optional[str]:
+    if not preview_data or not columns:
+        return None
+    rows = [" | ".join(str(column) for column in columns)]
+    for record in preview_data[:SAMPLE_ROWS]:
+        rows.append(" | ".join(_value(record.get(column)) for column in columns))
+    return f"Sample rows ({len(columns)} top columns):\n" + "\n".join(rows)
+
+
+def _value(value: Any) -> str:
+    if isinstance(value, float):
+        return "nan" if np.isnan(value) else f"{value:.6g}"
+    text = "" if value is None else str(value)
+    return text if len(text) <= MAX_VALUE_CHARS else text[:MAX_VALUE_CHARS - 1] + "…"
+
+
+def _number(value: float) -> str:
+    """A statistic rounded to two significant digits"""
+    if value is None or np.isnan(value):
+        return "nan"
+    rounded = float(f"{value:.2g}")
+    return f"{rounded:,.0f}" if abs(rounded) >= 100 else f"{rounded:g}"
+
+
+def _count(count: int) -> str:
+    """A count rounded to two significant digits"""
+    return f"{int(float(f'{count:.2g}')):,}" if count else "0"
+
+
+def _distinct(info: Dict[str, Any], row_count: int) -> str:
+    """Distinct count of a column; large ones as a share of its values, which does not grow with the file"""
+    unique = info.get("unique_count", 0)
+    non_null = row_count - info.get("null_count", 0)
+    if unique <= MAX_EXACT_DISTINCT or non_null <= 0:
+        return str(unique)
+    return f"{_share(min(unique / non_null, 1.0))} unique"
+
+
+def _type_family(dtype: str) -> str:
+    """Kind of a dtype, independent of the width typed loading picked for this file"""
+    dtype = str(dtype).lower()
+    for family, markers in TYPE_FAMILIES:
+        if any(marker in dtype for marker in markers):
+            return family
+    return dtype
+
+
+def _share(share: float) -> str:
+    """A share in steps of 5%, keeping small nonzero ones visible"""
+    if share <= 0:
+        return "0%"
+    if share < 0.01:
+        return "<1%"
+    if share < 0.05:
+        return "1-5%"
+    return f"{round(share * 20) * 5}%"
@@ -0,0 +1,149 @@
+# backend/readers.py
+import os
+import io
+import logging
+import datetime
+import itertools
+import pandas as pd
+import openpyxl
+from pandas.io.parsers import TextParser
+from typing import Dict, Any, List, Optional, Union, BinaryIO
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # optional; Excel files are then read by pandas' default engines
+    CalamineWorkbook = None
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Source = Union[str, BinaryIO]
+
+EXCEL_TYPES = ('xlsx', 'xls', 'xlsb')
+DEFAULT_EXCEL_ENGINES = {'xlsx': 'openpyxl', 'xls': 'xlrd', 'xlsb': 'pyxlsb'}
+
+# Sheet rows converted to Python values and parsed at a time by the calamine reader
+CALAMINE_CHUNK_ROWS = 50000
+
+
+def source_size(source: Source) -> int:
+    """Size in bytes of a path or an in-memory buffer"""
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    if isinstance(source, io.BytesIO):
+        return source.getbuffer().nbytes
+    return 0
+
+
+def rewind(source: Source):
+    if not isinstance(source, str):
+        source.seek(0)
+
+
+def choose_csv_engine(source: Source, engine: str = 'auto', arrow_min_bytes: int = 0) -> str:
+    """Resolve "auto" to pyarrow for files large enough to benefit from multithreaded parsing"""
+    if engine != 'auto':
+        return engine
+    return 'pyarrow' if source_size(source) >= arrow_min_bytes else 'c'
+
+
+def read_csv(source: Source, engine: str = 'auto', arrow_min_bytes: int = 0,
+             dtype: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """
+    Read a CSV with the selected engine, falling back to the C parser.
+    `dtype` maps column names to the dtypes to parse them into.
+
+    The pyarrow engine parses blocks in parallel into Arrow columns and then
+    converts them to the same NumPy dtypes the C parser produces, so the rest
+    of the pipeline sees identical frames whichever engine ran.
+    """
+    engine = choose_csv_engine(source, engine, arrow_min_bytes)
+    if engine == 'pyarrow':
+        try:
+            return pd.read_csv(source, engine='pyarrow', dtype=dtype)
+        except Exception as e:
+            logger.warning(f"pyarrow CSV parser failed, falling back to the C parser: {str(e)}")
+            rewind(source)
+    return pd.read_csv(source, dtype=dtype)
+
+
+def choose_excel_engine(file_type: str, engine: str = 'auto') -> str:
+    if engine == 'auto':
+        return 'calamine' if CalamineWorkbook is not None else 'default'
+    if engine == 'calamine' and CalamineWorkbook is None:
+        logger.warning("python-calamine is not installed, using the default Excel engine")
+        return 'default'
+    return engine
+
+
+def read_excel(source: Source, file_type: str, sheet_name: Optional[str] = None, engine: str = 'auto') -> pd.DataFrame:
+    """
+    Read one sheet (the first by default) of an Excel workbook.
+
+    The calamine engine streams cell values out of a Rust parser and is several
+    times faster than openpyxl; any failure falls back to pandas' default engine
+    for the file type.
+    """
+    if choose_excel_engine(file_type, engine) == 'calamine':
+        try:
+            return _read_excel_calamine(source, sheet_name)
+        except Exception as e:
+            logger.warning(f"calamine Excel reader failed, falling back to {DEFAULT_EXCEL_ENGINES[file_type]}: {str(e)}")
+            rewind(source)
+    return pd.read_excel(source, sheet_name=sheet_name if sheet_name is not None else 0,
+                         engine=DEFAULT_EXCEL_ENGINES[file_type])
+
+
+def _read_excel_calamine(source: Source, sheet_name: Optional[str]) -> pd.DataFrame:
+    """
+    Read a sheet with calamine. calamine keeps the sheet's cells in native
+    memory; rows leave it CALAMINE_CHUNK_ROWS at a time, so only one chunk
+    exists as Python values at once. Each chunk gets the same cell
+    conversions pandas applies to openpyxl values and the same header and
+    type inference as pd.read_excel; chunks are then concatenated, which
+    widens a column whose chunks inferred different types (e.g. to object).
+    """
+    workbook = CalamineWorkbook.from_object(source)
+    name = sheet_name if sheet_name is not None else workbook.sheet_names[0]
+    rows = workbook.get_sheet_by_name(name).iter_rows()
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+    header = [_convert_cell(value) for value in header]
+
+    frames = []
+    while True:
+        chunk = [[_convert_cell(value) for value in row] for row in itertools.islice(rows, CALAMINE_CHUNK_ROWS)]
+        if chunk or not frames:
+            frames.append(TextParser([header] + chunk, header=0).read())
+        if len(chunk) < CALAMINE_CHUNK_ROWS:
+            break
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def _convert_cell(value):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        return pd.Timestamp(value)
+    return value
+
+
+def list_sheets(source: Source, file_type: str) -> List[str]:
+    """Sheet names of a workbook, without parsing any cell data where the engine allows it"""
+    if file_type not in EXCEL_TYPES:
+        return []
+    if CalamineWorkbook is not None:
+        try:
+            return list(CalamineWorkbook.from_object(source).sheet_names)
+        except Exception as e:
+            logger.warning(f"calamine could not list sheets: {str(e)}")
+            rewind(source)
+    if file_type == 'xlsx':
+        workbook = openpyxl.load_workbook(source, read_only=True)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+    return list(pd.ExcelFile(source, engine=DEFAULT_EXCEL_ENGINES[file_type]).sheet_names)
@@ -0,0 +1,159 @@
+# backend/result_cache.py
+import os
+import copy
+import pickle
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from columnar_cache import sheet_suffix
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def source_fingerprint(*paths: str) -> str:
+    """Short hash of source files, so cache keys change whenever the code that produced a result changes"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+class ResultCache:
+    """
+    Two-tier cache of processing results.
+
+    An in-process LRU holds the most recent results; every result is also
+    pickled to disk so it survives restarts. The disk tier is kept under
+    `max_disk_mb` by evicting the least recently used files.
+    """
+
+    def __init__(self, cache_dir: str, memory_entries: int, max_disk_mb: float, version: str):
+        self.cache_dir = cache_dir
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        self.version = version
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key_for(self, content_hash: str, file_type: str, sheet_name: Optional[str] = None) -> str:
+        return f"{content_hash}-{file_type}{sheet_suffix(sheet_name)}-{self.version}"
+
+    def get(self, content_hash: str, file_type: str, sheet_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        key = self.key_for(content_hash, file_type, sheet_name)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return copy.deepcopy(self._memory[key])
+
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._remember(key, result)
+        return copy.deepcopy(result)
+
+    def put(self, content_hash: str, file_type: str, result: Dict[str, Any], sheet_name: Optional[str] = None):
+        # Failed runs are never cached, nor sampled ones, which the exact recompute replaces
+        if result.get("processing_status") != "completed" or result.get("sampled"):
+            return
+        key = self.key_for(content_hash, file_type, sheet_name)
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._remember(key, result)
+            self._stats["stores"] += 1
+        self._write_disk(key, result)
+
+    def invalidate(self, content_hash: Optional[str] = None) -> int:
+        """Drop cached results for one content hash, or everything; returns the number of entries removed"""
+        removed = 0
+        with self._lock:
+            for key in list(self._memory):
+                if content_hash is None or key.startswith(f"{content_hash}-"):
+                    del self._memory[key]
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.pkl') and (content_hash is None or name.startswith(f"{content_hash}-")):
+                    try:
+                        os.unlink(os.path.join(self.cache_dir, name))
+                        removed += 1
+                    except FileNotFoundError:
+                        pass
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                **self._stats,
+                "hits": hits,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "version": self.version,
+            }
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path_for(key)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+            os.utime(path, None)
+            return result
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error reading cached result {key}: {str(e)}")
+            return None
+
+    def _write_disk(self, key: str, result: Dict[str, Any]):
+        path = self._path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error caching result {key}: {str(e)}")
+            return
+        self._evict_disk()
+
+    def _evict_disk(self):
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.pkl'):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_disk_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,294 @@
+# backend/row_store.py
+import os
+import json
+import base64
+import hashlib
+import logging
+import threading
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from aggregation import build_filter_mask
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (column, descending) pairs, most significant first
+SortSpec = List[Tuple[str, bool]]
+
+
+class RowQueryError(ValueError):
+    """Raised when a row request references unknown columns or carries an invalid cursor"""
+
+
+class RowStore:
+    """
+    Parsed tables laid out for random row access.
+
+    Each table is stored once as an uncompressed Arrow IPC file, written one
+    record batch per Parquet row group so building it never holds the whole
+    table in memory. Memory-mapped reads of any rows only touch the batches
+    holding them (rows are taken batch by batch, since a take on the chunked
+    table would concatenate it first). Sort orders are
+    computed once per sort specification and persisted next to the table as
+    row positions; filtered views are kept in an in-memory LRU. Paging deep
+    into a sorted, filtered table then costs about as much as its first page.
+
+    Entries are keyed like the columnar cache, so they are content-addressed
+    and never stale. The directory is kept under `max_size_mb` by evicting
+    the least recently used files.
+    """
+
+    def __init__(self, store_dir: str, max_size_mb: float, view_cache_entries: int):
+        self.store_dir = store_dir
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.view_cache_entries = view_cache_entries
+        self._tables: Dict[str, pa.Table] = {}
+        self._views: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.store_dir, f"{key}.arrow")
+
+    def has(self, key: str) -> bool:
+        return os.path.exists(self.path_for(key))
+
+    def build(self, key: str, parquet_path: str) -> bool:
+        """Lay out a table from the columnar cache for row access"""
+        path = self.path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            source = pq.ParquetFile(parquet_path, memory_map=True)
+            # Row groups carry their own dictionaries, which an IPC file cannot
+            # replace between batches, so categorical columns are stored as values
+            schema = pa.schema([
+                field.with_type(field.type.value_type) if pa.types.is_dictionary(field.type) else field
+                for field in source.schema_arrow
+            ])
+            with ipc.new_file(tmp_path, schema) as writer:
+                for i in range(source.num_row_groups):
+                    writer.write_table(source.read_row_group(i).cast(schema))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error building row store entry {key}: {str(e)}")
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            return False
+
+        self._evict()
+        return True
+
+    def page(self, key: str, offset: int = 0, limit: int = 100, sort: Optional[SortSpec] = None,
+             columns: Optional[List[str]] = None, cursor: Optional[str] = None,
+             numeric_ranges: Optional[Dict[str, Dict[str, Optional[float]]]] = None,
+             category_filters: Optional[Dict[str, List[Any]]] = None,
+             date_ranges: Optional[Dict[str, Dict[str, Optional[str]]]] = None) -> Optional[Dict[str, Any]]:
+        """
+        One page of rows in the requested order and after the requested
+        filters, with the positions of those rows in the file. A cursor from
+        a previous page overrides `offset` and must come from the same view.
+        """
+        table = self._open(key)
+        if table is None:
+            return None
+
+        sort = list(dict((column, descending) for column, descending in (sort or [])).items())
+        filters = {
+            "numeric_ranges": numeric_ranges or {},
+            "category_filters": {col: values for col, values in (category_filters or {}).items() if values},
+            "date_ranges": date_ranges or {},
+        }
+        filter_columns = [col for group in filters.values() for col in group]
+        columns = list(dict.fromkeys(columns)) if columns else table.column_names
+        self._check_columns(table, columns + [column for column, _ in sort] + filter_columns)
+
+        view_id = _digest(key, sort, filters)
+        if cursor is not None:
+            offset = self._decode_cursor(cursor, view_id)
+
+        positions = self._view(key, view_id, table, sort, filters)
+        matched = table.num_rows if positions is None else len(positions)
+        selected = table.select(columns)
+        if positions is None:
+            rows = selected.slice(offset, limit)
+            row_numbers = list(range(offset, offset + rows.num_rows))
+        else:
+            page_positions = np.asarray(positions[offset:offset + limit])
+            rows = _take(selected, page_positions)
+            row_numbers = page_positions.tolist()
+
+        next_offset = offset + rows.num_rows
+        has_more = next_offset < matched
+        return {
+            "columns": columns,
+            "rows": rows.to_pylist(),
+            "row_numbers": row_numbers,
+            "total_rows": table.num_rows,
+            "matched_rows": matched,
+            "offset": offset,
+            "limit": limit,
+            "has_more": has_more,
+            "next_cursor": _encode_cursor(view_id, next_offset) if has_more else None,
+        }
+
+    def _open(self, key: str) -> Optional[pa.Table]:
+        with self._lock:
+            table = self._tables.get(key)
+        if table is not None:
+            return table
+        path = self.path_for(key)
+        try:
+            table = ipc.open_file(pa.memory_map(path)).read_all()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error opening row store entry {key}: {str(e)}")
+            return None
+
+        _touch(path)
+        with self._lock:
+            self._tables[key] = table
+        return table
+
+    def _check_columns(self, table: pa.Table, columns: List[str]):
+        missing = [col for col in dict.fromkeys(columns) if col not in table.column_names]
+        if missing:
+            raise RowQueryError(f"Column not found: {', '.join(map(str, missing))}")
+
+    def _view(self, key: str, view_id: str, table: pa.Table, sort: SortSpec,
+              filters: Dict[str, Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Row positions of a sorted and/or filtered view, or None for the file order"""
+        if not sort and not any(filters.values()):
+            return None
+        with self._lock:
+            positions = self._views.get(view_id)
+            if positions is not None:
+                self._views.move_to_end(view_id)
+                return positions
+
+        order = self._sort_order(key, table, sort) if sort else None
+        if any(filters.values()):
+            filter_columns = list(dict.fromkeys(col for group in filters.values() for col in group))
+            mask = build_filter_mask(table.select(filter_columns).to_pandas(), **filters)
+            positions = np.flatnonzero(mask) if order is None else order[mask[order]]
+        else:
+            positions = order
+
+        if self.view_cache_entries > 0:
+            with self._lock:
+                self._views[view_id] = positions
+                while len(self._views) > self.view_cache_entries:
+                    self._views.popitem(last=False)
+        return positions
+
+    def _sort_order(self, key: str, table: pa.Table, sort: SortSpec) -> np.ndarray:
+        """Row positions in sort order, computed once and then memory-mapped from disk"""
+        path = os.path.join(self.store_dir, f"{key}.sort-{_digest(sort)}.npy")
+        try:
+            order = np.load(path, mmap_mode='r')
+            _touch(path)
+            return order
+        except FileNotFoundError:
+            pass
+
+        # Dictionary (categorical) columns sort by their values
+        keys = {}
+        for i, (column, _) in enumerate(sort):
+            values = table.column(column)
+            keys[f"k{i}"] = values.cast(values.type.value_type) if pa.types.is_dictionary(values.type) else values
+        try:
+            indices = pc.sort_indices(
+                pa.table(keys),
+                sort_keys=[(f"k{i}", "descending" if descending else "ascending") for i, (_, descending) in enumerate(sort)],
+                null_placement="at_end"
+            )
+        except (pa.ArrowNotImplementedError, pa.ArrowTypeError) as e:
+            raise RowQueryError(f"Cannot sort by {', '.join(column for column, _ in sort)}: {str(e)}")
+        order = indices.to_numpy().astype(np.int32 if table.num_rows < 2 ** 31 else np.int64)
+
+        try:
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npy"
+            np.save(tmp_path, order)
+            os.replace(tmp_path, path)
+            self._evict()
+        except OSError as e:
+            logger.error(f"Error persisting sort order for {key}: {str(e)}")
+        return order
+
+    def _decode_cursor(self, cursor: str, view_id: str) -> int:
+        try:
+            state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            offset = int(state["offset"])
+        except (ValueError, KeyError, TypeError):
+            raise RowQueryError("Invalid cursor")
+        if state.get("view") != view_id or offset < 0:
+            raise RowQueryError("Cursor belongs to a different sort or filter")
+        return offset
+
+    def _evict(self):
+        """Remove least recently used files until the store fits its size cap"""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.store_dir):
+                if name.endswith('.tmp') or name.endswith('.tmp.npy'):
+                    continue
+                path = os.path.join(self.store_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_size_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                    total -= size
+                    if path.endswith('.arrow'):
+                        self._tables.pop(os.path.basename(path)[:-len('.arrow')], None)
+                    logger.info(f"Evicted row store file {os.path.basename(path)}")
+                except FileNotFoundError:
+                    pass
+
+
+def _take(table: pa.Table, positions: np.ndarray) -> pa.Table:
+    """Rows at `positions`, in that order, taken from each record batch separately"""
+    batches = table.to_batches()
+    if len(batches) <= 1:
+        return table.take(positions)
+    starts = np.cumsum([0] + [batch.num_rows for batch in batches[:-1]])
+    owners = np.searchsorted(starts, positions, side='right') - 1
+    by_batch = np.argsort(owners, kind='stable')
+    pieces = [
+        batches[owner].take(positions[by_batch][owners[by_batch] == owner] - starts[owner])
+        for owner in np.unique(owners)
+    ]
+    if not pieces:
+        return table.slice(0, 0)
+    # Back from batch order to the requested order
+    return pa.Table.from_batches(pieces, schema=table.schema).take(np.argsort(by_batch))
+
+
+def _digest(*parts: Any) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _encode_cursor(view_id: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"view": view_id, "offset": offset}).encode()).decode()
+
+
+def _touch(path: str):
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
@@ -0,0 +1,146 @@
+# backend/sampling.py
+import logging
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUANTILES = {'25%': 0.25, '50%': 0.5, '75%': 0.75}
+
+
+class RowReservoir:
+    """
+    Uniform random sample of rows over a stream of DataFrame chunks.
+
+    Every row gets a random key and the `capacity` rows with the smallest
+    keys are kept, which is a uniform sample of everything seen so far.
+    The sample is returned in file order.
+    """
+
+    def __init__(self, capacity: int, seed: Optional[int] = None):
+        self.capacity = capacity
+        self.rows_seen = 0
+        self._rng = np.random.default_rng(seed)
+        self._rows: Optional[pd.DataFrame] = None
+        self._keys = np.empty(0, dtype='float64')
+
+    def update(self, chunk: pd.DataFrame):
+        positions = np.arange(self.rows_seen, self.rows_seen + len(chunk))
+        self.rows_seen += len(chunk)
+        keys = self._rng.random(len(chunk))
+        if len(self._keys) >= self.capacity:
+            # Only rows that beat the current worst key can enter the sample
+            keep = keys < self._keys.max()
+            if not keep.any():
+                return
+            chunk, keys, positions = chunk[keep], keys[keep], positions[keep]
+        self._merge(chunk.set_axis(positions, axis=0), keys)
+
+    def _merge(self, chunk: pd.DataFrame, keys: np.ndarray):
+        rows = chunk if self._rows is None else pd.concat([self._rows, chunk])
+        keys = np.concatenate([self._keys, keys])
+        if len(keys) > self.capacity:
+            idx = np.argpartition(keys, self.capacity)[:self.capacity]
+            rows, keys = rows.iloc[idx], keys[idx]
+        self._rows, self._keys = rows, keys
+
+    def sample(self) -> pd.DataFrame:
+        if self._rows is None:
+            return pd.DataFrame()
+        return self._rows.sort_index(kind='stable').reset_index(drop=True)
+
+
+def sample_csv(file_path: str, capacity: int, chunk_rows: int = 50000,
+               preview_rows: int = 5, seed: Optional[int] = None) -> Tuple[pd.DataFrame, pd.DataFrame, int]:
+    """One streaming pass over a CSV: returns a row sample, the first rows and the total row count"""
+    reservoir = RowReservoir(capacity, seed)
+    head: Optional[pd.DataFrame] = None
+    for chunk in pd.read_csv(file_path, chunksize=chunk_rows):
+        if head is None:
+            head = chunk.head(preview_rows)
+        reservoir.update(chunk)
+    logger.info(f"Sampled {min(capacity, reservoir.rows_seen)} of {reservoir.rows_seen} rows from {file_path}")
+    return reservoir.sample(), head if head is not None else pd.DataFrame(), reservoir.rows_seen
+
+
+def sample_frame(df: pd.DataFrame, capacity: int, seed: Optional[int] = None) -> pd.DataFrame:
+    """Uniform row sample of an in-memory table, in original order"""
+    if len(df) <= capacity:
+        return df
+    return df.sample(n=capacity, random_state=seed).sort_index(kind='stable').reset_index(drop=True)
+
+
+def scale_count(count: int, sample_rows: int, total_rows: int) -> int:
+    """Estimate a population count from a count observed in the sample"""
+    if sample_rows == 0:
+        return 0
+    return int(round(count * total_rows / sample_rows))
+
+
+def count_interval(count: int, sample_rows: int, total_rows: int, confidence: float = 0.95) -> List[int]:
+    """
+    Interval for a whole-file count estimated from a count in a uniform
+    sample: the Wilson score interval, which stays informative when the
+    sample count is 0 (a column whose few nulls were not sampled). The rows
+    seen in the sample bound it on both sides.
+    """
+    if sample_rows == 0:
+        return [0, total_rows]
+    if sample_rows >= total_rows:
+        return [count, count]
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    share = count / sample_rows
+    denominator = 1 + z * z / sample_rows
+    center = (share + z * z / (2 * sample_rows)) / denominator
+    margin = z * np.sqrt(share * (1 - share) / sample_rows + z * z / (4 * sample_rows ** 2)) / denominator
+    low = max(int(np.floor(max(center - margin, 0.0) * total_rows)), count)
+    high = min(int(np.ceil(min(center + margin, 1.0) * total_rows)), total_rows - (sample_rows - count))
+    return [low, high]
+
+
+def confidence_intervals(sample: pd.DataFrame, columns: List[str], total_rows: int,
+                         confidence: float = 0.95) -> Dict[str, Dict[str, List[Optional[float]]]]:
+    """
+    Confidence intervals for the describe() statistics of numeric columns
+    estimated from a uniform sample: normal intervals (with finite population
+    correction) for the non-null count and mean, and distribution-free
+    order-statistic intervals for the quartiles. The sample's extremes only
+    bound the file's, so min and max get open intervals ([None, sample min]
+    and [sample max, None]) unless the sample is the whole file.
+    """
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    sample_rows = len(sample)
+    fpc = np.sqrt((total_rows - sample_rows) / (total_rows - 1)) if total_rows > 1 else 0.0
+    intervals = {}
+
+    for col in columns:
+        values = np.sort(sample[col].dropna().to_numpy(dtype='float64'))
+        n = values.size
+        if n == 0:
+            continue
+
+        share = n / sample_rows
+        count_margin = z * total_rows * np.sqrt(share * (1 - share) / sample_rows) * fpc
+        col_intervals = {"count": [max(0.0, total_rows * share - count_margin), total_rows * share + count_margin]}
+
+        mean = float(values.mean())
+        if n > 1:
+            margin = z * float(values.std(ddof=1)) / np.sqrt(n) * fpc
+            col_intervals["mean"] = [mean - margin, mean + margin]
+
+        for key, q in QUANTILES.items():
+            spread = z * np.sqrt(n * q * (1 - q))
+            lo = int(np.clip(np.floor(n * q - spread), 0, n - 1))
+            hi = int(np.clip(np.ceil(n * q + spread), 0, n - 1))
+            col_intervals[key] = [float(values[lo]), float(values[hi])]
+
+        whole = sample_rows >= total_rows
+        col_intervals["min"] = [float(values[0]) if whole else None, float(values[0])]
+        col_intervals["max"] = [float(values[-1]), float(values[-1]) if whole else None]
+
+        intervals[col] = col_intervals
+    return intervals
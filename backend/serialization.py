@@ -0,0 +1,57 @@
+# backend/serialization.py
+import decimal
+import logging
+import numpy as np
+import pandas as pd
+import orjson
+from typing import Any
+from fastapi.responses import ORJSONResponse
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# NumPy arrays and scalars, datetimes and non-string keys are handled natively in C;
+# NaN/inf floats become null
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for the few types orjson does not serialize itself"""
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, pd.Timestamp):
+        # orjson formats the plain datetime natively, several times faster than Timestamp.isoformat
+        return obj.to_pydatetime(warn=False)
+    if hasattr(obj, 'isoformat'):  # Timedelta and other date-like values
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):  # object-dtype arrays
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize processing results and API payloads to JSON bytes"""
+    return orjson.dumps(obj, default=_default, option=OPTIONS)
+
+
+def to_jsonable(obj: Any) -> Any:
+    """
+    Convert an object to plain JSON types (dict, list, str, int, float, bool,
+    None), e.g. for payloads handed to the Supabase client. Both directions
+    run in orjson's C code instead of a recursive Python walk.
+    """
+    return orjson.loads(dumps(obj))
+
+
+class FastJSONResponse(ORJSONResponse):
+    """ORJSONResponse that also handles pandas values; return it directly to skip response_model validation"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
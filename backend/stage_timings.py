@@ -0,0 +1,99 @@
+# backend/stage_timings.py
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Callable
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def read_rss() -> Optional[Dict[str, int]]:
+    """Current and peak resident memory of this process in bytes, where /proc provides them"""
+    try:
+        with open('/proc/self/status') as f:
+            values = {}
+            for line in f:
+                if line.startswith(('VmRSS:', 'VmHWM:')):
+                    name, value = line.split(':', 1)
+                    values[name] = int(value.split()[0]) * 1024
+        return {"rss": values["VmRSS"], "peak": values["VmHWM"]}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def reset_peak_rss() -> bool:
+    """Restart peak RSS tracking from the current RSS (Linux 4.0+)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class StageTimings:
+    """
+    Wall time of named processing stages, and with `track_memory` the peak
+    resident memory reached during each one and how far it rose above the
+    memory in use when the stage started. A stage entered more than once
+    accumulates its time and keeps its highest peak.
+
+    Peak memory is process-wide, so it is only meaningful where one stage
+    runs at a time, as in the processing pool workers.
+    """
+
+    def __init__(self, track_memory: bool = False,
+                 on_record: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        self.track_memory = track_memory
+        self.on_record = on_record
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def span(self, stage: str):
+        start_rss = read_rss() if self.track_memory and reset_peak_rss() else None
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            entry = {"seconds": time.perf_counter() - started}
+            end_rss = read_rss() if start_rss is not None else None
+            if end_rss is not None:
+                entry["peak_rss_mb"] = end_rss["peak"] / MB
+                entry["rss_growth_mb"] = max(0, end_rss["peak"] - start_rss["rss"]) / MB
+            if failed:
+                entry["failed"] = True
+            self.record(stage, entry)
+
+    def record(self, stage: str, entry: Dict[str, Any]):
+        previous = self.stages.get(stage)
+        if previous is None:
+            self.stages[stage] = entry
+        else:
+            self.stages[stage] = {
+                **previous,
+                **entry,
+                "seconds": previous["seconds"] + entry["seconds"],
+                **{key: max(previous[key], entry[key]) for key in ("peak_rss_mb", "rss_growth_mb")
+                   if key in previous and key in entry}
+            }
+        # Observers see each occurrence, not the running total
+        if self.on_record is not None:
+            try:
+                self.on_record(stage, entry)
+            except Exception as e:
+                logger.error(f"Error recording stage {stage}: {str(e)}")
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Stage entries rounded for storage with the processing result"""
+        return {
+            stage: {key: round(value, 4) if isinstance(value, float) else value for key, value in entry.items()}
+            for stage, entry in self.stages.items()
+        }
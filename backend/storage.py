@@ -0,0 +1,156 @@
+# backend/storage.py
+import os
+import asyncio
+import hashlib
+import logging
+import tempfile
+import httpx
+from dataclasses import dataclass
+from typing import Optional, List, Mapping
+from urllib.parse import quote
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class FileTooLargeError(Exception):
+    """Raised when a stored object exceeds the configured size limit"""
+
+
+def object_version(headers: Mapping[str, str]) -> Optional[str]:
+    """
+    Version of a stored object from its response headers: the ETag, or its
+    size and modification time when the ETag is missing
+    """
+    etag = headers.get("etag")
+    if etag:
+        return etag
+    modified = headers.get("last-modified")
+    if modified:
+        return f"{headers.get('content-length', '')}@{modified}"
+    return None
+
+
+@dataclass
+class DownloadedFile:
+    """
+    A downloaded object, either kept in memory (`content`) or spooled to a
+    temporary file (`path`), together with the SHA-256 of its bytes and the
+    storage version it was downloaded at.
+    """
+    content_hash: str
+    size: int
+    path: Optional[str] = None
+    content: Optional[bytes] = None
+    version: Optional[str] = None
+
+    def cleanup(self):
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class StorageClient:
+    """
+    Supabase Storage downloads over one shared, pooled HTTP connection.
+
+    All downloads reuse keep-alive connections from a single httpx client and
+    at most `max_concurrency` transfers run at once.
+    """
+
+    def __init__(self, supabase_url: str, service_key: str, bucket: str, max_concurrency: int = 8, timeout: float = 60.0):
+        self.base_url = f"{supabase_url.rstrip('/')}/storage/v1/object/{bucket}"
+        self.headers = {"apikey": service_key, "Authorization": f"Bearer {service_key}"}
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def url_for(self, file_path: str) -> str:
+        return f"{self.base_url}/{quote(file_path)}"
+
+    async def object_version(self, file_path: str) -> Optional[str]:
+        """
+        Current version of an object, read with a HEAD request; None if the
+        object does not exist or storage reports no version for it
+        """
+        async with self._semaphore:
+            response = await self.client.head(self.url_for(file_path))
+        if response.status_code in (400, 404):
+            return None
+        response.raise_for_status()
+        return object_version(response.headers)
+
+    async def download_to(
+        self,
+        file_path: str,
+        temp_dir: str,
+        suffix: str = "",
+        max_bytes: Optional[int] = None,
+        memory_threshold: int = 0
+    ) -> Optional[DownloadedFile]:
+        """
+        Stream an object in chunks, hashing as it arrives.
+
+        Objects up to `memory_threshold` bytes are returned in memory; larger
+        ones are written straight to a temporary file in `temp_dir`. The
+        transfer is aborted with FileTooLargeError as soon as it exceeds
+        `max_bytes`. Returns None if the object does not exist.
+        """
+        digest = hashlib.sha256()
+        chunks: List[bytes] = []
+        size = 0
+        spool = None
+
+        async with self._semaphore:
+            async with self.client.stream("GET", self.url_for(file_path)) as response:
+                if response.status_code in (400, 404):
+                    return None
+                response.raise_for_status()
+                version = object_version(response.headers)
+
+                declared = int(response.headers.get("content-length") or 0)
+                if max_bytes is not None and declared > max_bytes:
+                    raise FileTooLargeError(f"File is {declared} bytes, limit is {max_bytes}")
+
+                try:
+                    async for chunk in response.aiter_bytes():
+                        size += len(chunk)
+                        if max_bytes is not None and size > max_bytes:
+                            raise FileTooLargeError(f"File exceeds the {max_bytes} byte limit")
+                        digest.update(chunk)
+
+                        if spool is None and size > memory_threshold:
+                            # Too big for memory: move what we have to disk and keep streaming there
+                            spool = tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=temp_dir)
+                            spool.writelines(chunks)
+                            chunks = []
+                        if spool is not None:
+                            spool.write(chunk)
+                        else:
+                            chunks.append(chunk)
+                except BaseException:
+                    if spool is not None:
+                        spool.close()
+                        os.unlink(spool.name)
+                    raise
+
+        if spool is not None:
+            spool.close()
+            return DownloadedFile(content_hash=digest.hexdigest(), size=size, path=spool.name, version=version)
+        return DownloadedFile(content_hash=digest.hexdigest(), size=size, content=b"".join(chunks), version=version)
@@ -0,0 +1,336 @@
+# backend/streaming_profiler.py
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, Any, Callable, Iterable, List, Optional
+from chart_data import CoMoments, MAX_CORRELATION_COLUMNS, SCATTER_SAMPLE_ROWS
+from sampling import RowReservoir
+from sketches import ColumnSketch, DuplicateCounter, RowHasher, hash_column
+from table_profile import is_key_candidate, key_duplicate_entry
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RunningMoments:
+    """Mergeable count/mean/variance/min/max accumulator (Chan et al. parallel update)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def update(self, values: np.ndarray):
+        """Fold a batch of non-null values into the running moments"""
+        values = np.asarray(values, dtype='float64')
+        if values.size == 0:
+            return
+        batch = RunningMoments()
+        batch.count = int(values.size)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other: "RunningMoments"):
+        """Merge another accumulator into this one"""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> Optional[float]:
+        """Sample variance (ddof=1), matching pandas describe()"""
+        if self.count < 2:
+            return None
+        return self.m2 / (self.count - 1)
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles from a fixed-size uniform sample.
+
+    Every value gets a random key and only the `capacity` smallest keys are
+    kept, so the sample is uniform over everything seen and two sketches can
+    be merged by concatenating and trimming again.
+    """
+
+    def __init__(self, capacity: int = 10000, seed: Optional[int] = None):
+        self.capacity = capacity
+        self._rng = np.random.default_rng(seed)
+        self._keys = np.empty(0, dtype='float64')
+        self._values = np.empty(0, dtype='float64')
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype='float64')
+        if values.size == 0:
+            return
+        keys = self._rng.random(values.size)
+        self._keep(np.concatenate([self._keys, keys]), np.concatenate([self._values, values]))
+
+    def merge(self, other: "QuantileSketch"):
+        self._keep(np.concatenate([self._keys, other._keys]), np.concatenate([self._values, other._values]))
+
+    def _keep(self, keys: np.ndarray, values: np.ndarray):
+        if keys.size > self.capacity:
+            idx = np.argpartition(keys, self.capacity)[:self.capacity]
+            keys, values = keys[idx], values[idx]
+        self._keys, self._values = keys, values
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self._values.size == 0:
+            return None
+        return float(np.quantile(self._values, q))
+
+
+class ColumnAccumulator:
+    """Per-column state carried across chunks"""
+
+    def __init__(self, name: str, max_tracked_unique: int, top_k: int = 20, sample_size: int = 3):
+        self.name = name
+        self.dtype: Optional[np.dtype] = None
+        self.null_count = 0
+        self.moments = RunningMoments()
+        self.quantiles = QuantileSketch()
+        self.sample_values: List[Any] = []
+        self.sample_size = sample_size
+        self.sketch = ColumnSketch(max_exact=max_tracked_unique, top_k=top_k)
+        # Set on the first chunk for identifier-like columns
+        self.key_duplicates: Optional[DuplicateCounter] = None
+        # Whether numbers are hashed as text, fixed by the first chunk with values
+        self.numbers_as_text: Optional[bool] = None
+
+    def update(self, series: pd.Series) -> np.ndarray:
+        """Fold a chunk into the accumulator; returns the chunk's value hashes for row hashing"""
+        first_chunk = self.dtype is None
+        self.dtype = _merge_dtypes(self.dtype, series.dtype)
+        mask = series.notna().to_numpy()
+        hashes = self._hash(series, mask)
+        non_null = series[mask]
+        self.null_count += int(len(series) - len(non_null))
+
+        if len(self.sample_values) < self.sample_size:
+            self.sample_values.extend(non_null.head(self.sample_size - len(self.sample_values)).tolist())
+
+        if _is_numeric(series.dtype):
+            values = non_null.to_numpy(dtype='float64')
+            self.moments.update(values)
+            self.quantiles.update(values)
+
+        self.sketch.update_non_null(non_null, hashes[mask])
+
+        if first_chunk and is_key_candidate(self.name, series.dtype, non_null.nunique(), len(non_null)):
+            self.key_duplicates = DuplicateCounter()
+        if self.key_duplicates is not None:
+            self.key_duplicates.update_hashes(hashes[mask])
+        return hashes
+
+    def _hash(self, series: pd.Series, mask: np.ndarray) -> np.ndarray:
+        """
+        Value hashes that agree across chunks parsed with different dtypes. A
+        column holding both numbers and text hashes the numbers the way its
+        first chunk with values was parsed: as numbers, or as their text.
+        """
+        numeric = _is_numeric(series.dtype)
+        if self.numbers_as_text is None and mask.any():
+            self.numbers_as_text = not numeric
+        if numeric and self.numbers_as_text:
+            return hash_column(_numbers_as_text(series))
+        if series.dtype == object and self.numbers_as_text is False:
+            numbers = pd.to_numeric(series, errors='coerce')
+            return np.where(numbers.notna().to_numpy(), hash_column(numbers), hash_column(series))
+        return hash_column(series)
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.dtype is not None and _is_numeric(self.dtype)
+
+    def numeric_summary(self) -> Dict[str, Any]:
+        """Summary in the same layout as DataFrame.describe()"""
+        variance = self.moments.variance
+        return {
+            "count": float(self.moments.count),
+            "mean": self.moments.mean if self.moments.count else None,
+            "std": float(np.sqrt(variance)) if variance is not None else None,
+            "min": self.moments.min,
+            "25%": self.quantiles.quantile(0.25),
+            "50%": self.quantiles.quantile(0.5),
+            "75%": self.quantiles.quantile(0.75),
+            "max": self.moments.max,
+        }
+
+
+class ProfileState:
+    """
+    Everything a streaming profile accumulates. All of it is mergeable, so a
+    profile can be resumed with rows appended to the file it was built from.
+    """
+
+    def __init__(self, duplicates: DuplicateCounter):
+        self.columns: Dict[str, ColumnAccumulator] = {}
+        self.preview: Optional[pd.DataFrame] = None
+        self.row_count = 0
+        self.duplicates = duplicates
+        # Correlations and a scatter sample of the first chunk's numeric columns
+        self.co_moments: Optional[CoMoments] = None
+        self.scatter_rows: Optional[RowReservoir] = None
+
+
+class StreamingProfiler:
+    """
+    Single-pass, bounded-memory profiler for large CSV files.
+
+    The file is read in fixed-size chunks and only per-column accumulators
+    and the preview rows are retained, so peak memory depends on the chunk
+    size rather than the file size.
+    """
+
+    def __init__(self, chunk_rows: int = 50000, max_tracked_unique: int = 100, top_k: int = 20, preview_rows: int = 5,
+                 duplicates_exact_limit: int = 5_000_000, duplicates_bloom_bits: int = 32 * 8 * 1024 * 1024):
+        self.chunk_rows = chunk_rows
+        self.max_tracked_unique = max_tracked_unique
+        self.top_k = top_k
+        self.preview_rows = preview_rows
+        self.duplicates_exact_limit = duplicates_exact_limit
+        self.duplicates_bloom_bits = duplicates_bloom_bits
+
+    def profile_csv(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Profile a CSV file and return stats plus data_preview in process_file's layout"""
+        return self.stats(self.read_csv(file_path))
+
+    def read_csv(self, file_path: str, state: Optional[ProfileState] = None, offset: int = 0,
+                 on_chunk: Optional[Callable[[pd.DataFrame], None]] = None) -> ProfileState:
+        """
+        Fold a CSV file into a profile state. With the state of a profile of
+        the file's first `offset` bytes, only the rows after them are read.
+        Every parsed chunk is also passed to `on_chunk`.
+        """
+        if state is None:
+            state = self.read_frames(pd.read_csv(file_path, chunksize=self.chunk_rows), on_chunk)
+            logger.info(f"Streamed {state.row_count} rows from {file_path} in chunks of {self.chunk_rows}")
+            return state
+
+        base_rows = state.row_count
+        with open(file_path, 'rb') as f:
+            f.seek(offset)
+            try:
+                # The appended rows have no header line of their own
+                self._update(state, pd.read_csv(f, header=None, names=list(state.columns), chunksize=self.chunk_rows),
+                             on_chunk)
+            except pd.errors.EmptyDataError:
+                pass
+        logger.info(f"Streamed {state.row_count - base_rows} appended rows from {file_path} "
+                    f"onto a profile of {base_rows} rows")
+        return state
+
+    def read_frames(self, frames: Iterable[pd.DataFrame],
+                    on_chunk: Optional[Callable[[pd.DataFrame], None]] = None) -> ProfileState:
+        """Fold already parsed chunks of a table, e.g. the row groups of a cached one, into a new profile state"""
+        state = ProfileState(DuplicateCounter(self.duplicates_exact_limit, self.duplicates_bloom_bits))
+        self._update(state, frames, on_chunk)
+        return state
+
+    def _update(self, state: ProfileState, chunks: Iterable[pd.DataFrame],
+                on_chunk: Optional[Callable[[pd.DataFrame], None]] = None):
+        for chunk in chunks:
+            if on_chunk is not None:
+                on_chunk(chunk)
+            if state.preview is None:
+                state.preview = chunk.head(self.preview_rows).copy()
+                for col in chunk.columns:
+                    state.columns[col] = ColumnAccumulator(col, self.max_tracked_unique, self.top_k)
+                numeric = [col for col in chunk.columns if _is_numeric(chunk[col].dtype)][:MAX_CORRELATION_COLUMNS]
+                if len(numeric) >= 2:
+                    state.co_moments = CoMoments(numeric)
+                    state.scatter_rows = RowReservoir(SCATTER_SAMPLE_ROWS, seed=0)
+            state.row_count += len(chunk)
+            row_hasher = RowHasher(len(chunk), len(chunk.columns))
+            for col in chunk.columns:
+                row_hasher.add(state.columns[col].update(chunk[col]))
+            state.duplicates.update_hashes(row_hasher.result())
+            if state.co_moments is not None:
+                state.co_moments.update(chunk)
+                state.scatter_rows.update(chunk[state.co_moments.columns])
+
+    def stats(self, state: ProfileState) -> Optional[Dict[str, Any]]:
+        """Stats plus data_preview of a profile state, in process_file's layout"""
+        if state.preview is None:
+            return None
+
+        row_count = state.row_count
+        duplicates = state.duplicates
+        accumulators = list(state.columns.values())
+        numeric_columns = [acc.name for acc in accumulators if acc.is_numeric]
+        stats = {
+            "row_count": row_count,
+            "column_count": len(accumulators),
+            "file_size_mb": 0,  # Will be updated by caller
+            "data_types": {acc.name: str(acc.dtype) for acc in accumulators},
+            "missing_values": {acc.name: acc.null_count for acc in accumulators},
+            "numeric_columns": numeric_columns,
+            "text_columns": [acc.name for acc in accumulators if acc.dtype == np.dtype('O')],
+            "date_columns": [acc.name for acc in accumulators if pd.api.types.is_datetime64_any_dtype(acc.dtype)],
+        }
+        if numeric_columns:
+            stats["numeric_summary"] = {acc.name: acc.numeric_summary() for acc in accumulators if acc.is_numeric}
+
+        stats["duplicate_rows"] = duplicates.duplicates
+        stats["duplicate_rows_approximate"] = duplicates.approximate
+        stats["key_duplicates"] = {
+            acc.name: key_duplicate_entry(acc.key_duplicates.duplicates, row_count - acc.null_count)
+            for acc in accumulators if acc.key_duplicates is not None
+        }
+
+        stats["data_preview"] = {
+            "preview_data": state.preview.to_dict('records'),
+            "columns_info": [self._column_info(acc) for acc in accumulators],
+            "total_rows": row_count,
+            "total_columns": len(accumulators),
+        }
+        return stats
+
+    def _column_info(self, acc: ColumnAccumulator) -> Dict[str, Any]:
+        return {
+            "name": acc.name,
+            "type": str(acc.dtype),
+            "sample_values": acc.sample_values,
+            "null_count": acc.null_count,
+            **acc.sketch.summary(),
+        }
+
+
+def _is_numeric(dtype) -> bool:
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def _numbers_as_text(series: pd.Series) -> pd.Series:
+    """Numbers as the text a CSV writes for them (whole floats without ".0"), nulls kept"""
+    values = series.dropna()
+    text = values.astype(str)
+    if pd.api.types.is_float_dtype(values.dtype):
+        whole = (values % 1 == 0).to_numpy()
+        text[whole] = values[whole].astype('int64').astype(str)
+    return text.reindex(series.index)
+
+
+def _merge_dtypes(current, new):
+    """Widen the column dtype seen so far with the dtype inferred for a new chunk"""
+    if current is None or current == new:
+        return new
+    if _is_numeric(current) and _is_numeric(new):
+        return np.promote_types(current, new)
+    return np.dtype('O')
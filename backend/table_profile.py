@@ -0,0 +1,200 @@
+# backend/table_profile.py
+import re
+import logging
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+from pandas.api import types as ptypes
+from sketches import ColumnSketch, DuplicateCounter, RowHasher, hash_column
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NUMERIC_SUMMARY_KEYS = ('count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max')
+
+# Column names that usually hold identifiers: "id", "order_id", "customerId", "SKU", "Invoice Number"
+KEY_NAME_TOKENS = {'id', 'uuid', 'guid', 'key', 'code', 'sku', 'number'}
+CAMEL_CASE_ID = re.compile(r'[a-z](Id|ID)$')
+# Columns with a key-like name need this share of distinct values to count as keys
+KEY_NAME_UNIQUE_RATIO = 0.9
+# Integer or text columns this close to all-distinct are treated as keys too
+KEY_UNIQUE_RATIO = 0.99
+
+
+@dataclass(frozen=True)
+class ColumnProfile:
+    """Everything the processing stages need to know about one column"""
+    name: str
+    dtype: str
+    kind: str  # numeric | bool | datetime | text | other
+    null_count: int
+    sample_values: Tuple[Any, ...]
+    cardinality: Dict[str, Any]
+    numeric_summary: Optional[Dict[str, float]] = None
+    # Repeated non-null values; only counted for identifier-like columns
+    duplicate_values: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class TableProfile:
+    """
+    Result of a single profiling pass over a DataFrame.
+
+    Built once by `build_table_profile`; stats, preview, AI summary and quality
+    score are all derived from it instead of rescanning the frame.
+    """
+    row_count: int
+    columns: Tuple[ColumnProfile, ...]
+    head: pd.DataFrame
+    duplicate_rows: int
+    duplicate_rows_approximate: bool = False
+
+    @property
+    def column_count(self) -> int:
+        return len(self.columns)
+
+    @property
+    def null_cells(self) -> int:
+        return sum(col.null_count for col in self.columns)
+
+    def names(self, kind: Optional[str] = None) -> List[str]:
+        return [col.name for col in self.columns if kind is None or col.kind == kind]
+
+    def data_types(self) -> Dict[str, str]:
+        return {col.name: col.dtype for col in self.columns}
+
+    def missing_values(self) -> Dict[str, int]:
+        return {col.name: col.null_count for col in self.columns}
+
+    def numeric_summary(self) -> Dict[str, Dict[str, float]]:
+        """Same shape as DataFrame.describe().to_dict() over the numeric columns"""
+        return {col.name: dict(col.numeric_summary) for col in self.columns if col.numeric_summary is not None}
+
+    def key_duplicates(self) -> Dict[str, Dict[str, Any]]:
+        """Duplicate count and share of non-null values for each identifier-like column"""
+        return {
+            col.name: key_duplicate_entry(col.duplicate_values, self.row_count - col.null_count)
+            for col in self.columns if col.duplicate_values is not None
+        }
+
+
+def column_kind(dtype) -> str:
+    """Classify a dtype the way select_dtypes(number/datetime/object) does, counting categories and strings as text"""
+    if ptypes.is_bool_dtype(dtype):
+        return 'bool'
+    if ptypes.is_numeric_dtype(dtype):
+        return 'numeric'
+    if ptypes.is_datetime64_dtype(dtype):
+        return 'datetime'
+    if is_text_dtype(dtype):
+        return 'text'
+    return 'other'
+
+
+def is_text_dtype(dtype) -> bool:
+    """Object, string and categorical columns (typed loading stores text in the latter two)"""
+    return ptypes.is_object_dtype(dtype) or ptypes.is_string_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype)
+
+
+def is_key_candidate(name: Any, dtype, unique_count: int, non_null_count: int) -> bool:
+    """
+    Whether a column looks like it should hold one distinct value per row: a
+    key-like name with mostly distinct values, or an integer or text column
+    with almost only distinct values. A key-like name alone is not enough;
+    "Country Code" or "Phone Number" may repeat by design.
+    """
+    if non_null_count == 0:
+        return False
+    label = str(name).strip()
+    tokens = re.split(r'[^0-9a-z]+', label.lower())
+    if tokens[-1] in KEY_NAME_TOKENS or CAMEL_CASE_ID.search(label):
+        return unique_count >= KEY_NAME_UNIQUE_RATIO * non_null_count
+    if not (ptypes.is_integer_dtype(dtype) or is_text_dtype(dtype)):
+        return False
+    return unique_count >= KEY_UNIQUE_RATIO * non_null_count
+
+
+def key_duplicate_entry(duplicates: int, non_null_count: int) -> Dict[str, Any]:
+    return {
+        "duplicates": duplicates,
+        "share": round(duplicates / non_null_count, 4) if non_null_count else 0.0
+    }
+
+
+def build_table_profile(df: pd.DataFrame, head_rows: int = 5, sample_count: int = 3,
+                        max_exact: int = 100, top_k: int = 20,
+                        duplicate_counter: Optional[DuplicateCounter] = None) -> TableProfile:
+    """
+    Profile every column of `df`, dropping nulls and hashing values once per
+    column. The column hashes feed the cardinality sketches and are combined
+    into row hashes for duplicate detection.
+    """
+    duplicate_counter = duplicate_counter or DuplicateCounter()
+    row_hasher = RowHasher(len(df), len(df.columns))
+    columns = tuple(
+        _profile_column(name, df[name], row_hasher, sample_count, max_exact, top_k)
+        for name in df.columns
+    )
+    if len(df.columns):
+        duplicate_counter.update_hashes(row_hasher.result())
+
+    return TableProfile(
+        row_count=len(df),
+        columns=columns,
+        head=df.head(head_rows),
+        duplicate_rows=duplicate_counter.duplicates,
+        duplicate_rows_approximate=duplicate_counter.approximate
+    )
+
+
+def _profile_column(name: str, series: pd.Series, row_hasher: RowHasher, sample_count: int,
+                    max_exact: int, top_k: int) -> ColumnProfile:
+    kind = column_kind(series.dtype)
+    hashes = hash_column(series)
+    row_hasher.add(hashes)
+
+    mask = series.notna().to_numpy()
+    non_null = series[mask]
+    non_null_hashes = hashes[mask]
+
+    sketch = ColumnSketch(max_exact=max_exact, top_k=top_k)
+    sketch.update_non_null(non_null, non_null_hashes)
+    cardinality = sketch.summary()
+
+    duplicate_values = None
+    if is_key_candidate(name, series.dtype, cardinality["unique_count"], len(non_null)):
+        counter = DuplicateCounter()
+        counter.update_hashes(non_null_hashes)
+        duplicate_values = counter.duplicates
+
+    return ColumnProfile(
+        name=name,
+        dtype=str(series.dtype),
+        kind=kind,
+        null_count=len(series) - len(non_null),
+        sample_values=tuple(non_null.head(sample_count).tolist()),
+        cardinality=cardinality,
+        numeric_summary=_numeric_summary(non_null) if kind == 'numeric' else None,
+        duplicate_values=duplicate_values
+    )
+
+
+def _numeric_summary(non_null: pd.Series) -> Dict[str, float]:
+    """describe() statistics computed directly on the non-null values"""
+    values = non_null.to_numpy(dtype='float64')
+    count = values.size
+    if count == 0:
+        return {'count': 0.0, **{key: np.nan for key in NUMERIC_SUMMARY_KEYS[1:]}}
+    q25, q50, q75 = np.percentile(values, [25, 50, 75])
+    return {
+        'count': float(count),
+        'mean': float(values.mean()),
+        'std': float(values.std(ddof=1)) if count > 1 else np.nan,
+        'min': float(values.min()),
+        '25%': float(q25),
+        '50%': float(q50),
+        '75%': float(q75),
+        'max': float(values.max()),
+    }
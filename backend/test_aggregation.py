@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# backend/test_aggregation.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import pandas as pd
+import pytest
+from aggregation import aggregate, build_filter_mask, AggregationError
+
+
+@pytest.fixture
+def sales():
+    return pd.DataFrame({
+        "region": ["north", "north", "south", "south", "east", "west", "west", "center"],
+        "revenue": [1.0, 1.0, 2.0, 2.0, 10.0, 100.0, 100.0, 4.0],
+        "day": pd.date_range("2024-01-01", periods=8),
+    })
+
+
+def _points(result):
+    return {point["x"]: point["y"] for point in result["series"][0]["points"]}
+
+
+@pytest.mark.parametrize("agg", ["mean", "min", "max"])
+def test_other_is_computed_from_rows(sales, agg):
+    points = _points(aggregate(sales, "region", "revenue", agg=agg, max_points=3))
+    folded = sales[~sales["region"].isin([x for x in points if x != "Other"])]
+    assert len(points) == 3
+    assert points["Other"] == pytest.approx(folded["revenue"].agg(agg))
+
+
+@pytest.mark.parametrize("agg", ["sum", "count"])
+def test_other_adds_up_additive_aggregations(sales, agg):
+    result = aggregate(sales, "region", "revenue", agg=agg, max_points=3)
+    assert result["downsampled"]
+    expected = len(sales) if agg == "count" else sales["revenue"].sum()
+    assert sum(_points(result).values()) == pytest.approx(expected)
+
+
+def test_invalid_requests_raise_aggregation_error(sales):
+    with pytest.raises(AggregationError):
+        aggregate(sales, "revenue", chart_type="histogram", bins=-1)
+    with pytest.raises(AggregationError):
+        aggregate(sales, "revenue", chart_type="histogram", bins=0)
+    with pytest.raises(AggregationError):
+        aggregate(sales, "region", "revenue", agg="median")
+    with pytest.raises(AggregationError):
+        aggregate(sales, "missing")
+
+
+def test_invalid_dates_raise_aggregation_error(sales):
+    with pytest.raises(AggregationError):
+        build_filter_mask(sales, date_ranges={"day": {"start": "not a date"}})
+    with pytest.raises(AggregationError):
+        build_filter_mask(sales, date_ranges={"day": {"end": "2024-01-03T00:00:00+02:00"}})
+    mask = build_filter_mask(sales, date_ranges={"day": {"start": "2024-01-03", "end": "2024-01-04"}})
+    assert mask.sum() == 2
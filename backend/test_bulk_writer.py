@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# backend/test_bulk_writer.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+import gc
+import pytest
+from bulk_writer import BulkWriter
+
+
+class _Table:
+    """Records each flushed batch"""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    async def write_many(self, updates):
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.batches.append(updates)
+
+
+def test_updates_close_together_share_a_flush():
+    async def run():
+        table = _Table()
+        writer = BulkWriter(table.write_many, max_batch=3, max_delay=0.05)
+        await asyncio.gather(*(writer.write(f"f{i}", {"status": "done"}) for i in range(7)))
+        return table.batches
+
+    # A full batch flushes on the next loop iteration, taking whatever arrived meanwhile
+    batches = asyncio.run(run())
+    assert [[row_id for row_id, _ in batch] for batch in batches] == [[f"f{i}" for i in range(7)]]
+
+
+def test_timed_flush_survives_garbage_collection():
+    """The delayed flush task is referenced by the writer, not only by the loop"""
+    async def run():
+        table = _Table()
+        writer = BulkWriter(table.write_many, max_batch=10, max_delay=0.01)
+        write = asyncio.ensure_future(writer.write("f1", {"status": "done"}))
+        await asyncio.sleep(0.02)
+        gc.collect()
+        await asyncio.wait_for(write, 1)
+        return table.batches, writer._flushes
+
+    batches, running = asyncio.run(run())
+    assert batches == [[("f1", {"status": "done"})]]
+    assert not running
+
+
+def test_failed_flush_reaches_every_writer():
+    async def run():
+        writer = BulkWriter(_Table(fail=True).write_many, max_batch=2)
+        return await asyncio.gather(writer.write("f1", {}), writer.write("f2", {}), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_close_flushes_pending_updates():
+    async def run():
+        table = _Table()
+        writer = BulkWriter(table.write_many, max_batch=10, max_delay=60)
+        write = asyncio.ensure_future(writer.write("f1", {"status": "done"}))
+        await asyncio.sleep(0)
+        await writer.close()
+        await write
+        return table.batches
+
+    assert asyncio.run(run()) == [[("f1", {"status": "done"})]]
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# backend/test_columnar_cache.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import numpy as np
+import pandas as pd
+import pytest
+from columnar_cache import ColumnarCache, hash_file
+
+
+def test_table_writer_widens_types_across_chunks(tmp_path):
+    cache = ColumnarCache(str(tmp_path), 100)
+    writer = cache.writer("orders")
+    writer.write(pd.DataFrame({"qty": [1, 2], "code": [10, 11], "note": [np.nan, np.nan]}))
+    writer.write(pd.DataFrame({"qty": [2.5, np.nan], "code": ["C-1", "C-2"], "note": ["x", None]}))
+    assert not cache.has("orders")
+    assert writer.close()
+
+    df = cache.load("orders")
+    assert cache.is_streamed("orders")
+    assert df["qty"].tolist()[:3] == [1.0, 2.0, 2.5] and df["qty"].isna().sum() == 1
+    assert df["code"].tolist() == ["10", "11", "C-1", "C-2"]
+    assert df["note"].tolist()[2] == "x" and df["note"].isna().sum() == 3
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["orders.parquet"]
+
+
+def test_table_writer_abort_leaves_nothing(tmp_path):
+    cache = ColumnarCache(str(tmp_path), 100)
+    writer = cache.writer("orders")
+    writer.write(pd.DataFrame({"a": [1, 2]}))
+    writer.abort()
+    assert not cache.has("orders")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_streaming_profile_caches_the_table(tmp_path, monkeypatch):
+    """A streamed CSV lands in the columnar cache, and reprocessing it streams the cached row groups"""
+    import file_processor
+    from profile_checkpoints import ProfileCheckpoints
+    from streaming_profiler import StreamingProfiler
+
+    monkeypatch.setattr(file_processor, "STREAMING_THRESHOLD_MB", 0)
+    processor = file_processor.FileProcessor()
+    processor.streaming_profiler = StreamingProfiler(chunk_rows=1000)
+    processor.columnar_cache = ColumnarCache(str(tmp_path / "tables"), 100)
+    processor.profile_checkpoints = ProfileCheckpoints(str(tmp_path / "checkpoints"), 10, "test")
+
+    rng = np.random.default_rng(4)
+    path = tmp_path / "orders.csv"
+    expected = pd.DataFrame({
+        "region": rng.choice(["north", "south"], 4500),
+        "amount": rng.normal(100, 20, 4500).round(2),
+        "day": pd.date_range("2024-01-01", periods=4500, freq="h").astype(str),
+    })
+    expected.to_csv(path, index=False)
+    content_hash = hash_file(str(path))
+
+    streamed = processor.profile_file(str(path), "csv", content_hash, mode="exact")
+    assert "stream_profile" in streamed["metadata"]["timings"]
+    assert processor.has_cached_table(content_hash, "csv")
+    pd.testing.assert_frame_equal(processor.load_dataframe(None, "csv", content_hash), expected, check_dtype=False)
+    assert processor.load_dataframe(None, "csv", content_hash, columns=["amount"]).columns.tolist() == ["amount"]
+
+    cached = processor.profile_file(None, "csv", content_hash, mode="exact")
+    assert "stream_profile" in cached["metadata"]["timings"] and "read" not in cached["metadata"]["timings"]
+    assert cached["row_count"] == streamed["row_count"] == 4500
+    assert cached["missing_values"] == streamed["missing_values"]
+    assert cached["numeric_summary"]["amount"]["mean"] == pytest.approx(streamed["numeric_summary"]["amount"]["mean"])
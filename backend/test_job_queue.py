@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# backend/test_job_queue.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+import threading
+import time
+import pytest
+from job_queue import JobStore, JobQueue, QueueFullError, PermanentJobError
+
+
+async def _until(job_queue: JobQueue, job_id: str, statuses, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = await job_queue.get(job_id)
+        if job['status'] in statuses or time.monotonic() > deadline:
+            return job
+        await asyncio.sleep(0.01)
+
+
+def test_failed_job_is_retried_then_completes(tmp_path):
+    calls = []
+
+    async def handler(job, report):
+        calls.append(job['attempts'])
+        report("working", 0.5)
+        if len(calls) < 3:
+            raise RuntimeError("storage unavailable")
+
+    async def run():
+        job_queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite3")), handler, workers=1, max_pending=10,
+                             max_attempts=3, retry_backoff_seconds=0.01)
+        await job_queue.start()
+        job = await job_queue.submit({"file_id": "f1"})
+        done = await _until(job_queue, job['id'], ('completed', 'failed'))
+        await job_queue.stop()
+        return done
+
+    job = asyncio.run(run())
+    assert calls == [1, 2, 3]
+    assert job['status'] == 'completed' and job['attempts'] == 3
+    assert job['progress'] == 1.0 and job['error'] is None
+
+
+def test_permanent_failure_is_not_retried(tmp_path):
+    failures = []
+
+    async def handler(job, report):
+        raise PermanentJobError("file too large")
+
+    async def on_failure(job, error):
+        failures.append((job['payload']['file_id'], error))
+
+    async def run():
+        job_queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite3")), handler, workers=1, max_pending=10,
+                             max_attempts=3, retry_backoff_seconds=0.01, on_failure=on_failure)
+        await job_queue.start()
+        job = await job_queue.submit({"file_id": "f1"})
+        done = await _until(job_queue, job['id'], ('failed',))
+        await job_queue.stop()
+        return done
+
+    job = asyncio.run(run())
+    assert job['status'] == 'failed' and job['attempts'] == 1
+    assert failures == [("f1", "file too large")]
+
+
+def test_cancel_running_job(tmp_path):
+    async def run():
+        running = asyncio.Event()
+
+        async def handler(job, report):
+            running.set()
+            await asyncio.sleep(60)
+
+        job_queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite3")), handler, workers=1, max_pending=10)
+        await job_queue.start()
+        job = await job_queue.submit({"file_id": "f1"})
+        await asyncio.wait_for(running.wait(), 5)
+        cancelled = await job_queue.cancel(job['id'])
+        await asyncio.sleep(0.05)
+        stored = await job_queue.get(job['id'])
+        await job_queue.stop()
+        return cancelled, stored, job_queue._running
+
+    cancelled, stored, running = asyncio.run(run())
+    assert cancelled['status'] == stored['status'] == 'cancelled'
+    assert not running
+
+
+def test_full_queue_rejects_the_whole_batch(tmp_path):
+    async def handler(job, report):
+        pass
+
+    async def run():
+        # Not started: submitted jobs stay queued
+        job_queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite3")), handler, workers=1, max_pending=3)
+        await job_queue.submit_many([{"file_id": "f1"}, {"file_id": "f2"}], batch_id="b1")
+        with pytest.raises(QueueFullError):
+            await job_queue.submit_many([{"file_id": "f3"}, {"file_id": "f4"}], batch_id="b2")
+        return await job_queue.list_batch("b1"), await job_queue.list_batch("b2")
+
+    first, second = asyncio.run(run())
+    assert [job['file_id'] for job in first] == ["f1", "f2"]
+    assert second == []
+
+
+def test_store_runs_off_the_event_loop(tmp_path):
+    threads = set()
+
+    class _RecordingStore(JobStore):
+        def claim_next(self):
+            threads.add(threading.current_thread().name)
+            return super().claim_next()
+
+    async def handler(job, report):
+        pass
+
+    async def run():
+        job_queue = JobQueue(_RecordingStore(str(tmp_path / "jobs.sqlite3")), handler, workers=2, max_pending=10)
+        await job_queue.start()
+        job = await job_queue.submit({"file_id": "f1"})
+        await _until(job_queue, job['id'], ('completed',))
+        await job_queue.stop()
+
+    asyncio.run(run())
+    assert threads and threading.main_thread().name not in threads
+
+
+def test_purge_finished_keeps_active_and_recent_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    old_done, old_failed, recent_done, queued = (store.create({"file_id": f"f{i}"}, 3) for i in range(4))
+    store.update(old_done['id'], status='completed')
+    store.update(old_failed['id'], status='failed')
+    time.sleep(0.01)
+    cutoff = time.time()
+    time.sleep(0.01)
+    store.update(recent_done['id'], status='completed')
+
+    assert store.purge_finished(cutoff) == 2
+    assert store.get(old_done['id']) is None and store.get(old_failed['id']) is None
+    assert store.get(recent_done['id'])['status'] == 'completed'
+    assert store.get(queued['id'])['status'] == 'queued'
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# backend/test_llm_client.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from llm_client import prompt_fingerprint
+
+
+def _request(prompt: str, **options) -> dict:
+    return {"model": "gpt-3.5-turbo", "temperature": 0.2, **options,
+            "messages": [{"role": "system", "content": "You are a data analyst."},
+                         {"role": "user", "content": prompt}]}
+
+
+def test_fingerprint_ignores_whitespace_only():
+    assert prompt_fingerprint(_request("Rows: 100\n\nColumns:  4 ")) == prompt_fingerprint(_request("Rows: 100 Columns: 4"))
+
+
+def test_fingerprint_separates_numbers():
+    """Prompts that differ only in their statistics must not share an answer"""
+    prompts = [
+        "Rows: 1000, mean revenue 12.5",
+        "Rows: 1001, mean revenue 12.5",
+        "Rows: 1000, mean revenue 12.51",
+        "Rows: 1000, mean revenue 12.5, from 2023-01-01",
+        "Rows: 1000, mean revenue 12.5, from 2024-01-01",
+    ]
+    assert len({prompt_fingerprint(_request(prompt)) for prompt in prompts}) == len(prompts)
+
+
+def test_fingerprint_separates_request_options():
+    base = prompt_fingerprint(_request("Rows: 10"))
+    assert prompt_fingerprint(_request("Rows: 10", temperature=0.7)) != base
+    assert prompt_fingerprint(_request("Rows: 10", model="gpt-4o-mini")) != base
+    assert prompt_fingerprint(_request("rows: 10")) != base
+
+
+class _CountingClient:
+    """Async OpenAI client stand-in that counts completion calls"""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = self
+        self.completions = self
+
+    async def create(self, **request):
+        self.calls += 1
+        message = type("Message", (), {"content": f"answer {self.calls}"})
+        return type("Response", (), {"choices": [type("Choice", (), {"message": message})]})
+
+
+def test_same_profile_shares_one_answer():
+    """Files whose rounded profile matches share the cached answer; their exact parts differ"""
+    from file_processor import FileProcessor
+    from llm_client import LLMGateway, LLMResponseCache
+
+    processor = FileProcessor()
+    client = _CountingClient()
+    processor.llm = LLMGateway(client, LLMResponseCache(16, 60), max_concurrency=2, tokens_per_minute=0)
+    profile = "Dataset Overview:\n- Rows: 10,000\n- amount | measure | float | 0% | 100% unique | mean 100"
+    january = {"profile": profile, "exact": "- Rows: 10012"}
+    february = {"profile": profile, "exact": "- Rows: 9987"}
+    march = {"profile": profile.replace("mean 100", "mean 120"), "exact": "- Rows: 10012"}
+
+    assert processor._ai_cache_key(january, "csv") == processor._ai_cache_key(february, "csv")
+    assert processor._ai_cache_key(january, "csv") != processor._ai_cache_key(march, "csv")
+    assert "- Rows: 9987" in processor._ai_request(february, "csv")["messages"][1]["content"]
+
+    local = {"summary": "local", "suggested_charts": [], "key_insights": []}
+    answers = [processor._generate_ai_insights(summary, "csv", local)["summary"] for summary in (january, february, march)]
+    assert answers == ["answer 1", "answer 1", "answer 2"]
+    assert client.calls == 2
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# backend/test_local_insights.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import numpy as np
+import pandas as pd
+import pytest
+from local_insights import generate_local_insights, guess_domain
+
+
+@pytest.fixture
+def sales():
+    rng = np.random.default_rng(8)
+    rows = 2000
+    quantity = rng.integers(1, 40, rows).astype('float64')
+    df = pd.DataFrame({
+        "order_id": np.arange(rows),
+        "order_date": pd.date_range("2023-01-01", periods=rows, freq="6h"),
+        "region": rng.choice(["north", "south", "east", "west"], rows, p=[0.7, 0.1, 0.1, 0.1]),
+        "quantity": quantity,
+        "revenue": (quantity * 25 + rng.normal(0, 10, rows)).round(2),
+        "discount": rng.uniform(0, 1, rows).round(3),
+    })
+    df.loc[rng.choice(rows, 600, replace=False), "discount"] = np.nan
+    return df
+
+
+def _insights(df: pd.DataFrame):
+    from file_processor import FileProcessor
+    from table_profile import build_table_profile
+
+    processor = FileProcessor()
+    profile = build_table_profile(df, max_exact=100, top_k=20)
+    stats, preview = processor._extract_basic_stats(profile), processor._generate_data_preview(profile)
+    return generate_local_insights(stats, preview, processor._calculate_data_quality_score(stats), df)
+
+
+def test_roles_domain_and_findings(sales):
+    insights = _insights(sales)
+    assert insights["source"] == "local"
+    assert insights["column_roles"] == {
+        "order_id": "identifier", "order_date": "date", "region": "dimension",
+        "quantity": "measure", "revenue": "measure", "discount": "measure",
+    }
+    assert insights["domain"]["name"] == "Sales"
+    findings = " | ".join(insights["key_insights"])
+    assert "discount is 30% empty" in findings
+    assert "quantity and revenue are strongly positively correlated" in findings
+    assert "north accounts for " in findings
+
+
+def test_chart_specs_follow_the_roles(sales):
+    specs = {spec["chart_type"]: spec for spec in _insights(sales)["chart_specs"]}
+    assert specs["line"]["x_column"] == "order_date" and specs["line"]["agg"] == "sum"
+    assert specs["bar"]["x_column"] == "region"
+    assert {specs["scatter"]["x_column"], specs["scatter"]["y_column"]} == {"quantity", "revenue"}
+    assert specs["scatter"]["reason"].startswith("correlation of")
+
+
+def test_profile_only_insights_skip_table_findings(sales):
+    """Without the table (streamed files) only profile-based findings are made"""
+    from file_processor import FileProcessor
+    from table_profile import build_table_profile
+
+    processor = FileProcessor()
+    profile = build_table_profile(sales, max_exact=100, top_k=20)
+    stats, preview = processor._extract_basic_stats(profile), processor._generate_data_preview(profile)
+    insights = generate_local_insights(stats, preview, 90.0)
+    assert not any("correlated" in finding for finding in insights["key_insights"])
+    assert insights["data_quality_score"] == 90.0
+
+
+def test_guess_domain_from_column_names():
+    assert guess_domain(["EmployeeId", "department", "hire_date", "salary"])["name"] == "HR"
+    assert guess_domain(["a", "b"])["name"] == "General"
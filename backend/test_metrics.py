@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# backend/test_metrics.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+import pytest
+import metrics
+from prometheus_client import REGISTRY
+from stage_timings import StageTimings
+
+
+def _count(stage: str, metric: str = 'instagraph_stage_seconds_count') -> float:
+    return REGISTRY.get_sample_value(metric, {'stage': stage}) or 0.0
+
+
+def test_stage_timings_accumulate_and_flag_failures():
+    timings = StageTimings()
+    for _ in range(2):
+        with timings.span("read"):
+            pass
+    with pytest.raises(ValueError):
+        with timings.span("profile"):
+            raise ValueError("bad row")
+    assert set(timings.stages) == {"read", "profile"}
+    assert timings.stages["profile"]["failed"]
+    assert "failed" not in timings.stages["read"]
+
+
+def test_track_records_stage_metrics_and_errors():
+    before, errors = _count("test_download"), _count("test_download", 'instagraph_stage_errors_total')
+    with metrics.track("test_download"):
+        pass
+    with pytest.raises(RuntimeError):
+        with metrics.track("test_download"):
+            raise RuntimeError("timeout")
+    assert _count("test_download") == before + 2
+    assert _count("test_download", 'instagraph_stage_errors_total') == errors + 1
+
+
+def test_collect_timings_follows_tasks_and_threads():
+    """Stages of tasks and threads started inside the block (with its context) land in the run's timings"""
+    def parse():
+        with metrics.track("test_parse"):
+            pass
+
+    async def fetch():
+        with metrics.track("test_fetch"):
+            await asyncio.sleep(0)
+
+    async def run():
+        with metrics.collect_timings() as timings:
+            await asyncio.gather(fetch(), asyncio.to_thread(parse))
+        return timings.stages
+
+    before = _count("test_fetch")
+    stages = asyncio.run(run())
+    assert set(stages) == {"test_fetch", "test_parse"}
+    assert _count("test_fetch") == before + 1
+
+
+def test_queue_depth_is_read_at_scrape_time():
+    depth = {"queued": 2, "running": 1}
+    family = next(metrics.QueueCollector(lambda: depth).collect())
+    assert {sample.labels["status"]: sample.value for sample in family.samples} == {"queued": 2, "running": 1}
+
+    def broken():
+        raise RuntimeError("database locked")
+    assert next(metrics.QueueCollector(broken).collect()).samples == []
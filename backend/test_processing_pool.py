@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# backend/test_processing_pool.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+import numpy as np
+import pandas as pd
+from processing_pool import ProcessingPool
+
+
+def _orders_csv(path: Path, rows: int = 200000):
+    rng = np.random.default_rng(6)
+    pd.DataFrame({
+        "order_id": np.arange(rows),
+        "region": rng.choice(["north", "south", "east"], rows),
+        "amount": rng.normal(100, 20, rows).round(2),
+    }).to_csv(path, index=False)
+
+
+def test_profiles_in_a_worker_with_stage_events(tmp_path):
+    """Stage events reach the event loop before the result, and the loop keeps running meanwhile"""
+    path = tmp_path / "orders.csv"
+    _orders_csv(path)
+    pool = ProcessingPool(max_workers=1)
+    stages, ticks = [], []
+
+    async def ticker(done: asyncio.Event):
+        while not done.is_set():
+            ticks.append(1)
+            await asyncio.sleep(0.005)
+
+    async def run():
+        done = asyncio.Event()
+        ticking = asyncio.create_task(ticker(done))
+        result = await pool.profile_file(str(path), "csv", mode="exact", on_stage=lambda stage, data: stages.append(stage))
+        stages.append("result")
+        done.set()
+        await ticking
+        return result
+
+    try:
+        result = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert result["processing_status"] == "completed"
+    assert result["row_count"] == 200000
+    assert stages == ["parsed", "profiled", "result"]
+    assert len(ticks) > 5
+
+
+def test_profile_without_listener(tmp_path):
+    path = tmp_path / "orders.csv"
+    _orders_csv(path, rows=100)
+    pool = ProcessingPool(max_workers=1)
+    try:
+        result = asyncio.run(pool.profile_file(str(path), "csv"))
+        missing = asyncio.run(pool.profile_file(str(tmp_path / "missing.csv"), "csv"))
+    finally:
+        pool.shutdown()
+    assert result["row_count"] == 100
+    assert missing["processing_status"] == "error"
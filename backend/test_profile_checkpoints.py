@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# backend/test_profile_checkpoints.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import numpy as np
+import pandas as pd
+import pytest
+from columnar_cache import hash_file
+from profile_checkpoints import ProfileCheckpoints
+from streaming_profiler import StreamingProfiler
+
+
+def _orders(start: int, rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(start)
+    return pd.DataFrame({
+        "order_id": np.arange(start, start + rows),
+        "region": rng.choice(["north", "south", "east"], rows),
+        "amount": rng.normal(100, 20, rows).round(2),
+    })
+
+
+def test_resume_after_append_matches_full_profile(tmp_path):
+    original = tmp_path / "orders.csv"
+    appended = tmp_path / "orders-v2.csv"
+    first, rest = _orders(0, 3000), _orders(3000, 1500)
+    first.to_csv(original, index=False)
+    first.to_csv(appended, index=False)
+    rest.iloc[:10].to_csv(appended, mode="a", header=False, index=False)  # a repeated order counts once more
+    rest.to_csv(appended, mode="a", header=False, index=False)
+
+    profiler = StreamingProfiler(chunk_rows=1000)
+    checkpoints = ProfileCheckpoints(str(tmp_path / "checkpoints"), 10, "test")
+    checkpoints.save(hash_file(str(original)), str(original), profiler.read_csv(str(original)))
+
+    base = checkpoints.find_base(str(appended))
+    assert base is not None
+    entry, state = base
+    assert entry["rows"] == 3000
+    resumed = profiler.stats(profiler.read_csv(str(appended), state, offset=entry["size"]))
+    full = profiler.stats(profiler.read_csv(str(appended)))
+
+    assert resumed["row_count"] == full["row_count"] == 4510
+    assert resumed["duplicate_rows"] == full["duplicate_rows"] == 10
+    assert resumed["missing_values"] == full["missing_values"]
+    assert resumed["key_duplicates"] == full["key_duplicates"]
+    for stat in ("count", "mean", "std", "min", "max"):
+        assert resumed["numeric_summary"]["amount"][stat] == pytest.approx(full["numeric_summary"]["amount"][stat])
+
+
+def test_no_base_for_unrelated_or_truncated_files(tmp_path):
+    original = tmp_path / "orders.csv"
+    _orders(0, 500).to_csv(original, index=False)
+    checkpoints = ProfileCheckpoints(str(tmp_path / "checkpoints"), 10, "test")
+    checkpoints.save(hash_file(str(original)), str(original), StreamingProfiler().read_csv(str(original)))
+
+    edited = tmp_path / "edited.csv"
+    _orders(1, 600).to_csv(edited, index=False)
+    shorter = tmp_path / "shorter.csv"
+    _orders(0, 400).to_csv(shorter, index=False)
+    assert checkpoints.find_base(str(edited)) is None
+    assert checkpoints.find_base(str(shorter)) is None
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# backend/test_progress_events.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+from progress_events import ProgressBus
+
+
+async def _collect(bus: ProgressBus, topic: str, **options):
+    return [record async for record in bus.subscribe(topic, **options)]
+
+
+def _run(bus: ProgressBus, publish, topic: str = "file:f1", **options):
+    """Subscribe, then publish once the subscriber is waiting; returns what it received"""
+    async def run():
+        subscriber = asyncio.create_task(_collect(bus, topic, **options))
+        await asyncio.sleep(0)
+        publish()
+        return await asyncio.wait_for(subscriber, 1)
+
+    return asyncio.run(run())
+
+
+def test_live_subscriber_gets_the_run_until_its_final_event():
+    bus = ProgressBus(history_size=10, subscriber_queue_size=10, retention_seconds=60)
+
+    def publish():
+        bus.publish("f1", "queued")
+        bus.publish("f2", "queued")
+        bus.publish("f1", "profiled", {"row_count": 3})
+        bus.publish("f1", "saved", final=True)
+
+    records = _run(bus, publish)
+    assert [record["event"] for record in records] == ["queued", "profiled", "saved"]
+    assert records[1]["data"] == {"row_count": 3}
+
+
+def test_late_subscribers_replay_and_resume():
+    bus = ProgressBus(history_size=10, subscriber_queue_size=10, retention_seconds=60)
+    queued = bus.publish("f1", "queued")
+    bus.publish("f1", "saved", final=True)
+
+    assert [r["event"] for r in asyncio.run(_collect(bus, "file:f1"))] == ["queued", "saved"]
+    assert [r["event"] for r in asyncio.run(_collect(bus, "file:f1", last_event_id=queued["id"]))] == ["saved"]
+
+    # The next run of the file starts a fresh history
+    bus.publish("f1", "queued")
+    records = _run(bus, lambda: bus.publish("f1", "error", final=True))
+    assert [record["event"] for record in records] == ["queued", "error"]
+
+
+def test_slow_subscriber_drops_its_oldest_events():
+    bus = ProgressBus(history_size=10, subscriber_queue_size=2, retention_seconds=60)
+
+    def publish():
+        for stage in ("queued", "parsed", "profiled"):
+            bus.publish("f1", stage)
+        bus.publish("f1", "saved", final=True)
+
+    assert [record["event"] for record in _run(bus, publish)] == ["profiled", "saved"]
+
+
+def test_user_topic_spans_runs_and_keepalives():
+    bus = ProgressBus(history_size=10, subscriber_queue_size=10, retention_seconds=60)
+
+    async def run():
+        received = []
+        async for record in bus.subscribe("user:u1", replay=False, keepalive_seconds=0.01):
+            received.append(record)
+            if len(received) == 1:
+                bus.publish("f1", "saved", final=True, user_id="u1")
+                bus.publish("f2", "queued", user_id="u1")
+            if len(received) == 3:
+                return received
+
+    received = asyncio.run(asyncio.wait_for(run(), 1))
+    assert received[0] is None
+    assert [(record["file_id"], record["final"]) for record in received[1:]] == [("f1", False), ("f2", False)]
+
+
+def test_idle_topics_are_forgotten():
+    bus = ProgressBus(history_size=10, subscriber_queue_size=10, retention_seconds=0)
+    bus.publish("f1", "saved", final=True)
+    bus.publish("f2", "queued")
+    assert set(bus._topics) <= {"file:f2"}
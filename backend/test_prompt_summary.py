@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# backend/test_prompt_summary.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import numpy as np
+import pandas as pd
+import pytest
+from llm_client import estimate_text_tokens
+from prompt_summary import summarize_for_prompt
+from table_profile import build_table_profile
+
+
+def _summary_inputs(df: pd.DataFrame):
+    from file_processor import FileProcessor
+
+    processor = FileProcessor()
+    profile = build_table_profile(df, max_exact=100, top_k=20)
+    return processor._extract_basic_stats(profile), processor._generate_data_preview(profile)
+
+
+def _wide(rows: int, measures: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    columns = {f"metric_{i:03d}": rng.normal(100 + i, 10, rows).round(2) for i in range(measures)}
+    columns["region"] = rng.choice(["north", "south", "east"], rows)
+    columns["order_date"] = pd.date_range("2024-01-01", periods=rows, freq="h")
+    return pd.DataFrame(columns)
+
+
+@pytest.fixture(scope="module")
+def wide():
+    return _summary_inputs(_wide(200, 400))
+
+
+@pytest.mark.parametrize("budget", [300, 800, 1500])
+def test_wide_table_stays_within_budget(wide, budget):
+    stats, preview = wide
+    summary = summarize_for_prompt(stats, preview, token_budget=budget)
+    assert estimate_text_tokens(summary["profile"]) + estimate_text_tokens(summary["exact"]) <= budget
+    assert "less informative columns omitted" in summary["profile"]
+
+
+def test_dates_and_categories_are_not_crowded_out(wide):
+    """Many measures are discounted so the single date and category columns still make the cut"""
+    stats, preview = wide
+    profile = summarize_for_prompt(stats, preview, token_budget=600)["profile"]
+    described = [line.split(" | ")[0][2:] for line in profile.splitlines() if line.count(" | ") >= 5]
+    assert "order_date" in described and "region" in described
+    assert len(described) < 400
+
+
+def test_narrow_table_is_described_in_full():
+    stats, preview = _summary_inputs(_wide(200, 3))
+    summary = summarize_for_prompt(stats, preview)
+    for name in ("metric_000", "metric_001", "metric_002", "region", "order_date"):
+        assert f"- {name} |" in summary["profile"]
+    assert "omitted" not in summary["profile"]
+    assert "Sample rows" in summary["exact"]
+
+
+def test_same_schema_shares_the_profile_part():
+    """Exports of one schema differ in their exact part only"""
+    january = summarize_for_prompt(*_summary_inputs(_wide(1000, 5, seed=1)))
+    february = summarize_for_prompt(*_summary_inputs(_wide(1003, 5, seed=1)))
+    assert january["profile"] == february["profile"]
+    assert "- Rows: 1000" in january["exact"] and "- Rows: 1003" in february["exact"]
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# backend/test_readers.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import io
+import numpy as np
+import pandas as pd
+import pytest
+import readers
+
+
+@pytest.fixture
+def workbook() -> bytes:
+    df = pd.DataFrame({
+        "id": range(20),
+        "amount": np.arange(20) * 1.5,
+        "when": pd.date_range("2024-01-01", periods=20),
+        "name": list("abcdefghijklmnopqrst"),
+    })
+    df.loc[7, "amount"] = np.nan
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer) as writer:
+        df.to_excel(writer, sheet_name="orders", index=False)
+        df.head(3).to_excel(writer, sheet_name="totals", index=False)
+    return buffer.getvalue()
+
+
+@pytest.mark.skipif(readers.CalamineWorkbook is None, reason="python-calamine is not installed")
+@pytest.mark.parametrize("chunk_rows", [3, 20, 50000])
+def test_calamine_chunks_match_openpyxl(workbook, monkeypatch, chunk_rows):
+    monkeypatch.setattr(readers, "CALAMINE_CHUNK_ROWS", chunk_rows)
+    expected = pd.read_excel(io.BytesIO(workbook), engine="openpyxl")
+    pd.testing.assert_frame_equal(readers.read_excel(io.BytesIO(workbook), "xlsx", engine="calamine"), expected)
+
+
+def test_sheets_are_listed_and_selected(workbook):
+    assert readers.list_sheets(io.BytesIO(workbook), "xlsx") == ["orders", "totals"]
+    assert len(readers.read_excel(io.BytesIO(workbook), "xlsx", sheet_name="totals")) == 3
+    assert readers.list_sheets(io.BytesIO(b"a,b\n"), "csv") == []
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# backend/test_result_cache.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from result_cache import ResultCache, source_fingerprint
+
+
+def _result(rows: int, **fields) -> dict:
+    return {"processing_status": "completed", "row_count": rows, "metadata": {}, **fields}
+
+
+def test_results_survive_restarts_of_the_same_version(tmp_path):
+    ResultCache(str(tmp_path), 4, 10, "v1").put("abc", "csv", _result(10))
+    restarted = ResultCache(str(tmp_path), 4, 10, "v1")
+    assert restarted.get("abc", "csv")["row_count"] == 10
+    assert restarted.get("abc", "xlsx") is None
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_new_processor_version_misses_old_results(tmp_path):
+    """Results computed by other code are never served, from memory or disk"""
+    old = ResultCache(str(tmp_path), 4, 10, "v1")
+    old.put("abc", "csv", _result(10))
+    assert ResultCache(str(tmp_path), 4, 10, "v2").get("abc", "csv") is None
+
+
+def test_source_fingerprint_follows_the_code(tmp_path):
+    module = tmp_path / "module.py"
+    module.write_text("VALUE = 1\n")
+    before = source_fingerprint(str(module))
+    assert source_fingerprint(str(module)) == before
+    module.write_text("VALUE = 2\n")
+    assert source_fingerprint(str(module)) != before
+
+
+def test_sampled_and_failed_results_are_not_cached(tmp_path):
+    cache = ResultCache(str(tmp_path), 4, 10, "v1")
+    cache.put("sampled", "csv", _result(10, sampled=True))
+    cache.put("failed", "csv", {"processing_status": "error"})
+    assert cache.get("sampled", "csv") is None and cache.get("failed", "csv") is None
+
+
+def test_invalidate_one_hash_or_everything(tmp_path):
+    cache = ResultCache(str(tmp_path), 4, 10, "v1")
+    cache.put("abc", "csv", _result(10))
+    cache.put("abc", "xlsx", _result(10), sheet_name="Sheet2")
+    cache.put("def", "csv", _result(20))
+    assert cache.invalidate("abc") == 2
+    assert cache.get("abc", "csv") is None and cache.get("def", "csv")["row_count"] == 20
+    assert cache.invalidate() == 1
+    assert cache.get("def", "csv") is None
+
+
+def test_cached_results_are_copies(tmp_path):
+    cache = ResultCache(str(tmp_path), 4, 10, "v1")
+    cache.put("abc", "csv", _result(10))
+    cache.get("abc", "csv")["metadata"]["storage_version"] = "etag"
+    assert "storage_version" not in cache.get("abc", "csv")["metadata"]
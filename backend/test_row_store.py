@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# backend/test_row_store.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from row_store import RowStore, RowQueryError
+
+
+@pytest.fixture
+def orders():
+    rng = np.random.default_rng(5)
+    return pd.DataFrame({
+        "order_id": np.arange(1000),
+        "region": pd.Categorical(rng.choice(["north", "south", "east", "west"], 1000)),
+        "amount": rng.normal(100, 20, 1000).round(2),
+    })
+
+
+def _store(tmp_path, df: pd.DataFrame, row_group_size: int = 128) -> RowStore:
+    parquet_path = tmp_path / "orders.parquet"
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), parquet_path, row_group_size=row_group_size)
+    store = RowStore(str(tmp_path / "rows"), 100, view_cache_entries=4)
+    assert store.build("orders", str(parquet_path))
+    return store
+
+
+def test_build_writes_row_groups_as_batches(tmp_path, orders):
+    """Each row group, with its own dictionary, becomes one batch of plain values"""
+    store = _store(tmp_path, orders)
+    table = store._open("orders")
+    assert table.num_rows == 1000
+    assert len(table.to_batches()) == 8
+    assert table.schema.field("region").type == pa.string()
+    assert table.column("region").to_pylist() == orders["region"].astype(str).tolist()
+
+
+def test_sorted_page_across_batches(tmp_path, orders):
+    store = _store(tmp_path, orders)
+    page = store.page("orders", offset=10, limit=50, sort=[("region", False), ("amount", True)])
+    expected = orders.assign(region=orders["region"].astype(str)).sort_values(["region", "amount"], ascending=[True, False])
+    assert page["row_numbers"] == expected.index[10:60].tolist()
+    assert [row["order_id"] for row in page["rows"]] == expected["order_id"].iloc[10:60].tolist()
+
+
+def test_cursor_walks_a_filtered_view(tmp_path, orders):
+    """Following next_cursor visits every matching row once, in order"""
+    store = _store(tmp_path, orders)
+    query = {"sort": [("amount", False)], "category_filters": {"region": ["north", "east"]},
+             "numeric_ranges": {"amount": {"min": 90, "max": None}}}
+    expected = orders[orders["region"].isin(["north", "east"]) & (orders["amount"] >= 90)].sort_values("amount", kind="stable")
+
+    seen, cursor = [], None
+    while True:
+        page = store.page("orders", limit=64, cursor=cursor, **query)
+        assert page["matched_rows"] == len(expected)
+        seen += page["row_numbers"]
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            break
+    assert cursor is None
+    assert seen == expected.index.tolist()
+
+
+def test_cursor_from_another_view_is_rejected(tmp_path, orders):
+    store = _store(tmp_path, orders)
+    cursor = store.page("orders", limit=10, sort=[("amount", False)])["next_cursor"]
+    with pytest.raises(RowQueryError):
+        store.page("orders", limit=10, sort=[("amount", True)], cursor=cursor)
+    with pytest.raises(RowQueryError):
+        store.page("orders", limit=10, cursor="not-a-cursor")
+    with pytest.raises(RowQueryError):
+        store.page("orders", columns=["missing"])
+
+
+def test_unsorted_pages_follow_file_order(tmp_path, orders):
+    store = _store(tmp_path, orders)
+    page = store.page("orders", offset=990, limit=50, columns=["order_id"])
+    assert page["columns"] == ["order_id"]
+    assert page["row_numbers"] == list(range(990, 1000))
+    assert [row["order_id"] for row in page["rows"]] == list(range(990, 1000))
+    assert not page["has_more"] and page["next_cursor"] is None
+    assert store.page("unknown") is None
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# backend/test_sampling.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import numpy as np
+import pandas as pd
+from sampling import RowReservoir, sample_csv, scale_count, count_interval, confidence_intervals
+
+
+def test_reservoir_is_uniform_and_in_file_order():
+    hits = np.zeros(1000)
+    for seed in range(200):
+        reservoir = RowReservoir(100, seed=seed)
+        rows = pd.DataFrame({"row": np.arange(1000)})
+        for start in range(0, 1000, 150):
+            reservoir.update(rows.iloc[start:start + 150])
+        rows = reservoir.sample()["row"].to_numpy()
+        assert len(rows) == 100 and (np.diff(rows) > 0).all()
+        hits[rows] += 1
+    # Every row is kept 20 times on average; early and late chunks alike
+    assert abs(hits[:500].mean() - hits[500:].mean()) < 2
+    assert hits.min() > 3
+
+
+def test_sample_csv_counts_every_row(tmp_path):
+    path = tmp_path / "rows.csv"
+    pd.DataFrame({"row": np.arange(2500)}).to_csv(path, index=False)
+    sample, head, total = sample_csv(str(path), 300, chunk_rows=400, seed=0)
+    assert total == 2500 and len(sample) == 300
+    assert head["row"].tolist() == [0, 1, 2, 3, 4]
+
+
+def test_count_interval_covers_true_counts():
+    """Intervals at 95% confidence miss the true count in about 5% of samples, and rarely when it is tiny"""
+    rng = np.random.default_rng(6)
+    total_rows, sample_rows = 100000, 2000
+    for true_count in (1, 40, 5000):
+        population = np.zeros(total_rows, dtype=bool)
+        population[:true_count] = True
+        misses = 0
+        for _ in range(200):
+            count = int(rng.choice(population, sample_rows, replace=False).sum())
+            low, high = count_interval(count, sample_rows, total_rows)
+            assert low <= scale_count(count, sample_rows, total_rows) <= high
+            misses += not low <= true_count <= high
+        assert misses <= 20
+
+
+def test_count_interval_of_unsampled_nulls_is_not_zero():
+    low, high = count_interval(0, 10000, 1000000)
+    assert low == 0 and high > 0
+    assert count_interval(7, 50, 50) == [7, 7]
+
+
+def test_confidence_intervals_cover_the_file():
+    rng = np.random.default_rng(7)
+    values = pd.Series(rng.lognormal(3, 1, 200000))
+    sample = values.sample(5000, random_state=1).to_frame("amount")
+    intervals = confidence_intervals(sample, ["amount"], len(values))["amount"]
+
+    assert intervals["mean"][0] <= values.mean() <= intervals["mean"][1]
+    for key, q in (("25%", 0.25), ("50%", 0.5), ("75%", 0.75)):
+        assert intervals[key][0] <= values.quantile(q) <= intervals[key][1]
+    # The sample's extremes only bound the file's
+    assert intervals["min"] == [None, sample["amount"].min()] and values.min() <= intervals["min"][1]
+    assert intervals["max"] == [sample["amount"].max(), None] and values.max() >= intervals["max"][0]
+
+
+def test_sampled_profile_flags_missing_counts_as_estimates():
+    """One null in a large file is usually not sampled; the profile and prompt must not call it exact"""
+    from file_processor import FileProcessor
+
+    df = pd.DataFrame({"amount": np.arange(100000, dtype='float64'), "region": ["north", "south"] * 50000})
+    df.loc[123, "amount"] = np.nan
+    sample = df.drop(index=123).sample(2000, random_state=0)
+    result = FileProcessor()._profile_sample(sample, df.head(5), len(df), {})
+
+    assert result["sampled"] and result["missing_values"]["amount"] == 0
+    low, high = result["missing_values_confidence"]["amount"]
+    assert low == 0 and high >= 1
+    amount = next(info for info in result["data_preview"]["columns_info"] if info["name"] == "amount")
+    assert amount["null_count_interval"] == [low, high]
+    assert result["numeric_confidence"]["amount"]["max"][1] is None
+    assert "| 0% to " in result["ai_context"]["data_summary"]["profile"]
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# backend/test_serialization.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import datetime
+import decimal
+import numpy as np
+import pandas as pd
+from serialization import dumps, to_jsonable, FastJSONResponse
+
+
+def test_pandas_and_numpy_values_become_json():
+    payload = {
+        "count": np.int64(3),
+        "share": np.float32(0.5),
+        "missing": [np.nan, float("inf"), pd.NaT, pd.NA, None],
+        "when": pd.Timestamp("2024-03-01 12:30:00"),
+        "day": datetime.date(2024, 3, 1),
+        "gap": pd.Timedelta(hours=1),
+        "values": np.array([1, 2, 3]),
+        "mixed": np.array(["a", 1], dtype=object),
+        "tags": {"x"},
+        "price": decimal.Decimal("2.50"),
+        7: "non-string key",
+    }
+    assert to_jsonable(payload) == {
+        "count": 3,
+        "share": 0.5,
+        "missing": [None, None, None, None, None],
+        "when": "2024-03-01T12:30:00",
+        "day": "2024-03-01",
+        "gap": "P0DT1H0M0S",
+        "values": [1, 2, 3],
+        "mixed": ["a", 1],
+        "tags": ["x"],
+        "price": 2.5,
+        "7": "non-string key",
+    }
+
+
+def test_preview_records_round_trip():
+    """Records of a frame with gaps serialize like the old recursive cleaner: nulls for every kind of missing"""
+    df = pd.DataFrame({
+        "id": [1, 2],
+        "amount": [1.5, np.nan],
+        "day": pd.to_datetime(["2024-01-01", None]),
+        "region": pd.Categorical(["north", None]),
+    })
+    assert to_jsonable(df.to_dict("records")) == [
+        {"id": 1, "amount": 1.5, "day": "2024-01-01T00:00:00", "region": "north"},
+        {"id": 2, "amount": None, "day": None, "region": None},
+    ]
+
+
+def test_response_renders_with_dumps():
+    body = {"rows": np.arange(3), "at": pd.Timestamp("2024-01-01")}
+    assert FastJSONResponse(body).body == dumps(body) == b'{"rows":[0,1,2],"at":"2024-01-01T00:00:00"}'
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# backend/test_sketches.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import numpy as np
+import pandas as pd
+from sketches import ColumnSketch, DuplicateCounter, SortedValues, SpaceSaving
+
+
+def _hashes(rows: int, distinct: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, distinct, rows).astype('uint64') * np.uint64(0x9E3779B97F4A7C15)
+
+
+def test_duplicate_counter_exact_across_chunks():
+    hashes = _hashes(200000, 50000)
+    counter = DuplicateCounter()
+    for chunk in np.array_split(hashes, 13):
+        counter.update_hashes(chunk)
+
+    assert not counter.approximate
+    assert counter.total == hashes.size
+    assert counter.duplicates == hashes.size - np.unique(hashes).size
+
+
+def test_duplicate_counter_bloom_close_to_exact():
+    """Past the exact limit the count only overcounts, and by little with a well-sized filter"""
+    hashes = _hashes(200000, 120000, seed=1)
+    exact = hashes.size - np.unique(hashes).size
+    counter = DuplicateCounter(exact_limit=10000, bloom_bits=8 * 1024 * 1024)
+    for chunk in np.array_split(hashes, 20):
+        counter.update_hashes(chunk)
+
+    assert counter.approximate
+    assert exact <= counter.duplicates <= exact * 1.01
+
+
+def test_duplicate_counter_rows():
+    df = pd.DataFrame({"a": [1, 2, 1, 1], "b": ["x", "y", "x", "z"]})
+    counter = DuplicateCounter()
+    counter.update(df.iloc[:2])
+    counter.update(df.iloc[2:])
+    assert counter.duplicates == int(df.duplicated().sum())
+
+
+def test_space_saving_counts_bound_true_counts():
+    """Every reported count is an upper bound at most its error above the true count"""
+    values = pd.Series(np.random.default_rng(2).zipf(1.3, 100000) % 3000)
+    true_counts = values.value_counts()
+    parts = [SpaceSaving(capacity=40) for _ in range(3)]
+    for i, chunk in enumerate(np.array_split(values.to_numpy(), 30)):
+        parts[i % 3].update(pd.Series(chunk))
+    summary = parts[0]
+    for part in parts[1:]:
+        summary.merge(part)
+
+    assert not summary.is_exact
+    top = summary.top()
+    assert len(top) == 40
+    for entry in top:
+        assert entry["count"] - entry["error"] <= true_counts.get(entry["value"], 0) <= entry["count"]
+    assert [entry["value"] for entry in top[:3]] == true_counts.index[:3].tolist()
+
+
+def test_space_saving_exact_below_capacity():
+    summary = SpaceSaving(capacity=10)
+    summary.update(pd.Series(["a", "b", "a", None]))
+    summary.update(pd.Series(["b", "a"], dtype="category"))
+    assert summary.is_exact
+    assert summary.top() == [{"value": "a", "count": 3, "error": 0}, {"value": "b", "count": 2, "error": 0}]
+
+
+def test_column_sketch_keeps_first_seen_order():
+    sketch = ColumnSketch(max_exact=10)
+    sketch.update(pd.Series(["pear", "apple", None, "pear"]))
+    sketch.update(pd.Series(["fig", "apple", "banana"]))
+    assert sketch.unique_values() == ["pear", "apple", "fig", "banana"]
+
+
+def test_sorted_values_prefix_pages():
+    series = pd.Series(["Berlin", "bern", "Bergen", "Oslo", "berlin", None, "Bern", "Basel"] * 3)
+    values = SortedValues(series)
+    assert values.page()["values"] == ["Basel", "Bergen", "Berlin", "Bern", "Oslo", "berlin", "bern"]
+
+    first = values.page("BER", offset=0, limit=3)
+    second = values.page("BER", offset=3, limit=3)
+    assert first["total"] == second["total"] == 5
+    assert first["has_more"] and not second["has_more"]
+    assert first["values"] + second["values"] == ["Bergen", "Berlin", "Bern", "berlin", "bern"]
+    assert values.page("x")["values"] == []
+
+
+def test_column_values_cached_per_table():
+    from file_processor import FileProcessor
+
+    processor = FileProcessor()
+    df = pd.DataFrame({"city": ["Oslo", "Bern", "Basel", "Oslo"]})
+    assert processor.cached_column_values("table", "city") is None
+    first = processor.get_column_values(df, "city", limit=2, table_key="table")
+    assert first["values"] == ["Basel", "Bern"] and first["has_more"]
+    assert processor.cached_column_values("table", "city", offset=2)["values"] == ["Oslo"]
+    assert processor.cached_column_values("table", "city", prefix="b")["total"] == 2
+    assert processor.cached_column_values("other", "city") is None
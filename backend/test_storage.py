@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# backend/test_storage.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+import hashlib
+import os
+import httpx
+import pytest
+from storage import StorageClient, FileTooLargeError
+
+
+class _Bucket:
+    """Storage stand-in whose objects get a new ETag whenever they are replaced"""
+
+    def __init__(self, chunk_size: int = 0):
+        self.objects = {}
+        self.versions = {}
+        # Objects are sent in chunks of this size without a content-length when set
+        self.chunk_size = chunk_size
+
+    def put(self, name: str, content: bytes):
+        self.objects[name] = content
+        self.versions[name] = self.versions.get(name, 0) + 1
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        name = request.url.path.split("/user-uploads/", 1)[1]
+        if name not in self.objects:
+            return httpx.Response(404)
+        content = self.objects[name]
+        headers = {"etag": f'"{name}-{self.versions[name]}"'}
+        if self.chunk_size and request.method == "GET":
+            return httpx.Response(200, headers=headers, content=self._chunks(content))
+        headers["content-length"] = str(len(content))
+        return httpx.Response(200, headers=headers, content=b"" if request.method == "HEAD" else content)
+
+    async def _chunks(self, content: bytes):
+        for start in range(0, len(content), self.chunk_size):
+            yield content[start:start + self.chunk_size]
+
+
+def _client(bucket: _Bucket) -> StorageClient:
+    storage = StorageClient("http://storage.test", "key", "user-uploads")
+    storage._client = httpx.AsyncClient(transport=httpx.MockTransport(bucket.handle))
+    return storage
+
+
+def test_download_records_the_version_head_reports(tmp_path):
+    bucket = _Bucket()
+    bucket.put("u/data.csv", b"a,b\n1,2\n")
+    storage = _client(bucket)
+
+    async def run():
+        downloaded = await storage.download_to("u/data.csv", str(tmp_path))
+        unchanged = await storage.object_version("u/data.csv")
+        bucket.put("u/data.csv", b"a,b\n3,4\n")
+        replaced = await storage.object_version("u/data.csv")
+        missing = await storage.object_version("u/other.csv")
+        await storage.close()
+        return downloaded, unchanged, replaced, missing
+
+    downloaded, unchanged, replaced, missing = asyncio.run(run())
+    assert downloaded.content_hash == hashlib.sha256(b"a,b\n1,2\n").hexdigest()
+    assert downloaded.version == unchanged
+    assert replaced != downloaded.version
+    assert missing is None
+
+
+def _download(bucket: _Bucket, name: str, tmp_path, **options):
+    storage = _client(bucket)
+
+    async def run():
+        try:
+            return await storage.download_to(name, str(tmp_path), suffix=".csv", **options)
+        finally:
+            await storage.close()
+
+    return asyncio.run(run())
+
+
+def test_small_objects_stay_in_memory(tmp_path):
+    bucket = _Bucket(chunk_size=4)
+    bucket.put("u/small.csv", b"a,b\n1,2\n")
+    downloaded = _download(bucket, "u/small.csv", tmp_path, memory_threshold=1024)
+    assert downloaded.path is None
+    assert downloaded.content == b"a,b\n1,2\n" and downloaded.size == 8
+    assert _download(bucket, "u/missing.csv", tmp_path) is None
+
+
+def test_large_objects_are_spooled_to_disk(tmp_path):
+    content = b"".join(b"%d,%d\n" % (i, i * 2) for i in range(5000))
+    bucket = _Bucket(chunk_size=1000)
+    bucket.put("u/large.csv", content)
+    downloaded = _download(bucket, "u/large.csv", tmp_path, memory_threshold=4096)
+    try:
+        assert downloaded.content is None and downloaded.path.endswith(".csv")
+        assert Path(downloaded.path).read_bytes() == content
+        assert downloaded.size == len(content)
+        assert downloaded.content_hash == hashlib.sha256(content).hexdigest()
+    finally:
+        downloaded.cleanup()
+    assert not os.path.exists(downloaded.path)
+
+
+@pytest.mark.parametrize("chunk_size", [0, 512])
+def test_size_limit_aborts_the_transfer(tmp_path, chunk_size):
+    """Declared sizes are rejected up front; undeclared ones once the stream passes the limit"""
+    bucket = _Bucket(chunk_size=chunk_size)
+    bucket.put("u/huge.csv", b"x" * 10000)
+    with pytest.raises(FileTooLargeError):
+        _download(bucket, "u/huge.csv", tmp_path, max_bytes=4000, memory_threshold=1024)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# backend/test_streaming_profiler.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import numpy as np
+import pandas as pd
+import pytest
+from streaming_profiler import RunningMoments, QuantileSketch, StreamingProfiler
+
+
+def test_running_moments_match_pandas():
+    """Moments merged from uneven chunks equal pandas' describe() of the whole column"""
+    values = pd.Series(np.random.default_rng(0).lognormal(3, 1, 100000))
+    moments = RunningMoments()
+    other = RunningMoments()
+    for i, chunk in enumerate(np.array_split(values.to_numpy(), [7, 5000, 5001, 60000])):
+        (moments if i % 2 else other).update(chunk)
+    moments.merge(other)
+
+    assert moments.count == len(values)
+    assert moments.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert moments.variance == pytest.approx(values.var(), rel=1e-9)
+    assert moments.min == values.min()
+    assert moments.max == values.max()
+
+
+def test_running_moments_single_value_has_no_variance():
+    moments = RunningMoments()
+    moments.update(np.array([4.0]))
+    moments.update(np.array([]))
+    assert moments.count == 1
+    assert moments.variance is None
+
+
+def test_quantile_sketch_close_to_pandas():
+    """Quantiles of the merged uniform sample are within a few percentile points of the exact ones"""
+    values = pd.Series(np.random.default_rng(1).normal(50, 10, 200000))
+    first, second = QuantileSketch(seed=1), QuantileSketch(seed=2)
+    for i, chunk in enumerate(np.array_split(values.to_numpy(), 20)):
+        (first if i % 2 else second).update(chunk)
+    first.merge(second)
+
+    for q in (0.25, 0.5, 0.75):
+        estimate = first.quantile(q)
+        assert (values <= estimate).mean() == pytest.approx(q, abs=0.02)
+
+
+def test_quantile_sketch_exact_below_capacity():
+    values = np.arange(1000, dtype='float64')
+    sketch = QuantileSketch(capacity=5000, seed=0)
+    sketch.update(values)
+    assert sketch.quantile(0.5) == pd.Series(values).quantile(0.5)
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def _orders_csv(path: Path, rows: int = 30000, chunk_rows: int = 4000) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "order_id": np.arange(rows),
+        "region": rng.choice(["north", "south", "east", "west"], rows),
+        "amount": rng.lognormal(4, 0.5, rows).round(2),
+        "quantity": rng.integers(1, 20, rows).astype('float64'),
+        "code": rng.integers(100, 999, rows).astype(str).astype(object),
+    })
+    df.loc[rng.choice(rows, 300, replace=False), "amount"] = np.nan
+    # Integers in the first chunk, with gaps (floats) later
+    df.loc[rng.choice(np.arange(chunk_rows, rows), 50, replace=False), "quantity"] = np.nan
+    # Numeric codes in the first chunk, text codes later
+    df.loc[chunk_rows:, "code"] = "C-" + df.loc[chunk_rows:, "code"]
+    df = pd.concat([df, df.iloc[[5, 6, 7000, 7001, 29999]]], ignore_index=True)
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_streaming_profile_matches_process_file(tmp_path):
+    """Streaming a CSV in chunks gives process_file's statistics for the same file"""
+    from file_processor import FileProcessor
+
+    path = tmp_path / "orders.csv"
+    df = _orders_csv(path)
+    streamed = StreamingProfiler(chunk_rows=4000).profile_csv(str(path))
+    exact = FileProcessor().profile_file(str(path), "csv", mode="exact")
+
+    assert streamed["row_count"] == exact["row_count"] == len(df)
+    assert streamed["missing_values"] == exact["missing_values"]
+    assert streamed["missing_values"]["quantity"] == 50
+    assert streamed["duplicate_rows"] == exact["duplicate_rows"] == 5
+
+    # Chunk dtypes are widened: int to float, then numbers and text to object
+    assert streamed["data_types"]["quantity"] == "float64"
+    assert streamed["data_types"]["code"] == "object"
+    assert "quantity" in streamed["numeric_columns"] and "code" not in streamed["numeric_columns"]
+
+    for col in ("amount", "quantity"):
+        ours, theirs = streamed["numeric_summary"][col], exact["numeric_summary"][col]
+        for stat in ("count", "mean", "std", "min", "max"):
+            assert ours[stat] == pytest.approx(theirs[stat], rel=1e-6)
+        values = df[col].dropna()
+        for stat, q in (("25%", 0.25), ("50%", 0.5), ("75%", 0.75)):
+            # Quartiles come from a 10000-value sample of 30005 rows
+            assert values.quantile(q - 0.02) <= ours[stat] <= values.quantile(q + 0.02)
+
+    preview, exact_preview = streamed["data_preview"], exact["data_preview"]
+    assert preview["total_rows"] == len(df)
+    assert len(preview["preview_data"]) == 5
+    assert [info["name"] for info in preview["columns_info"]] == [info["name"] for info in exact_preview["columns_info"]]
+    assert [info["null_count"] for info in preview["columns_info"]] == [info["null_count"] for info in exact_preview["columns_info"]]
+    region = next(info for info in preview["columns_info"] if info["name"] == "region")
+    assert sorted(region["unique_values"]) == ["east", "north", "south", "west"]
+
+
+def test_duplicates_across_chunks_with_different_dtypes(tmp_path):
+    """Rows repeated across chunks count once whatever each chunk parsed their columns as"""
+    path = tmp_path / "mixed.csv"
+    path.write_text(
+        "code,note,size\n"
+        "A,,1\n1,,2\n2.5,,3\n"     # code is text here, note is empty (float)
+        "1,,2\n2.5,,3\n7,x,4\n"    # code is numeric here, note is text
+        "7,x,4\nA,,1\n3,,5\n"
+    )
+    streamed = StreamingProfiler(chunk_rows=3).profile_csv(str(path))
+    assert streamed["data_types"]["code"] == "object"
+    assert streamed["duplicate_rows"] == int(pd.read_csv(path).duplicated().sum()) == 4
+
+
+def test_streamed_quality_score_matches_exact(tmp_path):
+    """Streamed and in-memory runs of a file score its quality the same way"""
+    from file_processor import FileProcessor
+
+    path = tmp_path / "orders.csv"
+    _orders_csv(path)
+    processor = FileProcessor()
+    streamed = processor._streamed_result(
+        StreamingProfiler(chunk_rows=4000).read_csv(str(path)), {}, lambda stage, data: None
+    )
+    exact = processor.profile_file(str(path), "csv", mode="exact")
+    score = streamed["ai_insights"]["data_quality_score"]
+    assert score == exact["ai_insights"]["data_quality_score"]
+    assert score == processor._calculate_data_quality_score(exact)
+
+
+def test_streamed_charts_fill_scatter_and_heatmap(tmp_path):
+    """Without the table, the streamed co-moments give exact correlations and the reservoir the scatter points"""
+    from chart_data import correlation_matrix, SCATTER_SAMPLE_ROWS
+    from file_processor import FileProcessor
+
+    path = tmp_path / "measures.csv"
+    rng = np.random.default_rng(4)
+    rows = 12000
+    price = rng.normal(50, 10, rows).round(2)
+    df = pd.DataFrame({
+        "price": price,
+        "revenue": (price * rng.integers(1, 9, rows) + rng.normal(0, 20, rows)).round(2),
+        "discount": rng.uniform(0, 30, rows).round(2),
+        "region": rng.choice(["north", "south"], rows),
+    })
+    df.loc[rng.choice(rows, 400, replace=False), "discount"] = np.nan
+    df.to_csv(path, index=False)
+
+    processor = FileProcessor()
+    result = processor._streamed_result(
+        StreamingProfiler(chunk_rows=1000).read_csv(str(path)), {}, lambda stage, data: None
+    )
+    charts = result["charts"]
+    columns = charts["correlation"]["columns"]
+    assert set(columns) == {"price", "revenue", "discount"}
+    assert np.allclose(np.array(charts["correlation"]["matrix"], dtype=float),
+                       correlation_matrix(df, columns), atol=1e-4, equal_nan=True)
+    assert len(charts["scatter_sample"]["rows"]) == SCATTER_SAMPLE_ROWS
+
+    specs = {spec["chart_type"]: spec for spec in charts["specs"]}
+    assert specs["heatmap"]["data"] == charts["correlation"]
+    points = specs["scatter"]["data"]["series"][0]["points"]
+    assert 0 < len(points) <= SCATTER_SAMPLE_ROWS
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# backend/test_type_inference.py
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import numpy as np
+import pandas as pd
+from type_inference import ARROW_STRING, optimize_frame, read_csv_typed
+
+
+def _orders(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({
+        "order_id": np.arange(rows),
+        "quantity": rng.integers(1, 50, rows),
+        "price": rng.integers(1, 400, rows) / 4,     # exact in float32
+        "amount": rng.normal(100, 20, rows),         # not
+        "region": rng.choice(["north", "south", "east", "west"], rows),
+        "note": [f"note {i}" for i in range(rows)],
+        "order_date": pd.date_range("2024-01-01", periods=rows, freq="min").strftime("%Y-%m-%d %H:%M"),
+    })
+
+
+def test_optimize_frame_shrinks_without_changing_values():
+    df = _orders(5000)
+    original = df.copy()
+    optimized = optimize_frame(df)
+
+    assert optimized["order_id"].dtype == np.int16 and optimized["quantity"].dtype == np.int8
+    assert optimized["price"].dtype == np.float32 and optimized["amount"].dtype == np.float64
+    assert isinstance(optimized["region"].dtype, pd.CategoricalDtype)
+    assert optimized["note"].dtype == ARROW_STRING
+    assert pd.api.types.is_datetime64_any_dtype(optimized["order_date"])
+
+    for name in ("order_id", "quantity", "price", "amount"):
+        assert (optimized[name].astype("float64") == original[name]).all()
+    assert optimized["region"].astype(str).tolist() == original["region"].tolist()
+    memory = optimized.attrs["memory"]
+    assert memory["after_bytes"] < memory["before_bytes"] and memory["reduction"] > 0.5
+
+
+def test_read_csv_typed_matches_default_parse(tmp_path):
+    """Dtypes chosen from the first rows load the whole file with the same values"""
+    path = tmp_path / "orders.csv"
+    _orders(30000).to_csv(path, index=False)
+    typed = read_csv_typed(str(path), sample_rows=1000)
+    plain = pd.read_csv(path)
+
+    assert isinstance(typed["region"].dtype, pd.CategoricalDtype)
+    assert typed["note"].dtype == ARROW_STRING
+    assert typed.attrs["memory"]["before_estimated"]
+    pd.testing.assert_frame_equal(
+        typed.assign(order_date=typed["order_date"].dt.strftime("%Y-%m-%d %H:%M")).astype(object),
+        plain.astype(object), check_dtype=False
+    )
+
+
+def test_mixed_and_unparseable_columns_are_left_alone():
+    df = pd.DataFrame({
+        "mixed": ["a", 1, None, 2.5],
+        "almost_dates": ["2024-01-01", "2024-01-02", "soon", "2024-01-04"],
+        "flag": [True, False, True, True],
+    })
+    optimized = optimize_frame(df)
+    assert optimized["mixed"].dtype == object
+    assert not pd.api.types.is_datetime64_any_dtype(optimized["almost_dates"])
+    assert optimized["flag"].dtype == bool
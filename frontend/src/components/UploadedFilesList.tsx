@@ -2,6 +2,8 @@
 import React from 'react'
 import { useNavigate } from 'react-router-dom'
 import { useUploadedFiles, UploadedFile } from '../hooks/useUploadedFiles'
+import { useAuth } from '../hooks/useAuth'
+import { fileProcessingService } from '../services/fileProcessingService'
 // Using native JavaScript date formatting instead of date-fns
 
 interface UploadedFilesListProps {
@@ -10,17 +12,26 @@ interface UploadedFilesListProps {
 }
 
 export default function UploadedFilesList({ limit, showViewMore = false }: UploadedFilesListProps) {
-  const { files, loading, error, deleteFile, fetchFiles } = useUploadedFiles()
+  const { files, loading, error, deleteFile, fetchFiles, updateFile } = useUploadedFiles()
+  const { user } = useAuth()
   const navigate = useNavigate()
   
-  // Refresh files every 5 seconds to show processing updates
+  // Processing updates are pushed by the backend instead of polling the database
   React.useEffect(() => {
-    const interval = setInterval(() => {
-      fetchFiles()
-    }, 5000)
+    if (!user) return
     
-    return () => clearInterval(interval)
-  }, [fetchFiles])
+    return fileProcessingService.subscribeToUserProgress(user.id, (event) => {
+      if (event.event === 'parsed' || event.event === 'profiled') {
+        updateFile(event.file_id, {
+          row_count: event.data.row_count ?? null,
+          column_count: event.data.column_count ?? null
+        })
+      } else if (event.event === 'saved' || event.event === 'enriched' || event.event === 'error') {
+        // The stored row is complete now
+        fetchFiles()
+      }
+    })
+  }, [user, fetchFiles, updateFile])
 
   const formatFileSize = (sizeInMB: number) => {
     if (sizeInMB < 1) {
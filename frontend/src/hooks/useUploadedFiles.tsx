@@ -1,5 +1,5 @@
 // src/hooks/useUploadedFiles.tsx
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useCallback } from 'react'
 import { supabase } from '../lib/supabase'
 import { useAuth } from './useAuth'
 
@@ -26,7 +26,7 @@ export function useUploadedFiles() {
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
 
-  const fetchFiles = async () => {
+  const fetchFiles = useCallback(async () => {
     if (!user) {
       setFiles([])
       setLoading(false)
@@ -54,19 +54,19 @@ export function useUploadedFiles() {
     } finally {
       setLoading(false)
     }
-  }
+  }, [user])
 
-  const addFile = (file: UploadedFile) => {
+  const addFile = useCallback((file: UploadedFile) => {
     setFiles(prev => [file, ...prev])
-  }
+  }, [])
 
-  const updateFile = (fileId: string, updates: Partial<UploadedFile>) => {
+  const updateFile = useCallback((fileId: string, updates: Partial<UploadedFile>) => {
     setFiles(prev => 
       prev.map(file => 
         file.id === fileId ? { ...file, ...updates } : file
       )
     )
-  }
+  }, [])
 
   const deleteFile = async (fileId: string) => {
     if (!user) return
@@ -106,7 +106,7 @@ export function useUploadedFiles() {
 
   useEffect(() => {
     fetchFiles()
-  }, [user])
+  }, [fetchFiles])
 
   return {
     files,
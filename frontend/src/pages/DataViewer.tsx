@@ -4,7 +4,7 @@ import { useParams, useNavigate } from 'react-router-dom'
 import { supabase } from '../lib/supabase'
 import { useAuth } from '../hooks/useAuth'
 import { UploadedFile } from '../hooks/useUploadedFiles'
-import { fileProcessingService } from '../services/fileProcessingService'
+import { fileProcessingService, MaterializedChart, AggregateRequest, AggregateResult } from '../services/fileProcessingService'
 import toast from 'react-hot-toast'
 import { 
   BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer,
@@ -79,96 +79,24 @@ export default function DataViewer() {
   const [sortDirection, setSortDirection] = useState<'asc' | 'desc'>('asc')
   const [filterText, setFilterText] = useState('')
   const [filterColumn, setFilterColumn] = useState<string>('')
+  const [aggregatedChart, setAggregatedChart] = useState<AggregateResult | null>(null)
+  const [aggregating, setAggregating] = useState(false)
 
-  // Memoized data processing for charts with filtering
-  const chartData = useMemo(() => {
-    if (!file?.data_preview?.preview_data || !chartConfig.xAxis || !chartConfig.yAxis) {
-      return []
-    }
-
-    const { preview_data } = file.data_preview
-    let processedData = preview_data.map((row: any) => ({
-      [chartConfig.xAxis]: row[chartConfig.xAxis],
-      [chartConfig.yAxis]: typeof row[chartConfig.yAxis] === 'number' ? row[chartConfig.yAxis] : parseFloat(row[chartConfig.yAxis]) || 0
-    }))
-
-    // Apply filters
+  // Data precomputed over the full dataset at processing time, for a suggested chart without filters
+  const materializedChart = useMemo(() => {
+    const specs: MaterializedChart[] = file?.metadata?.charts?.specs || []
     const { filters } = chartConfig
-    
-    // Filter by X-axis range (for numerical data)
-    if (filters.xAxisRange.min !== null || filters.xAxisRange.max !== null) {
-      const xAxisValues = processedData.map((item: any) => {
-        const val = item[chartConfig.xAxis]
-        return typeof val === 'number' ? val : parseFloat(val) || 0
-      })
-      const minVal = filters.xAxisRange.min !== null ? filters.xAxisRange.min : Math.min(...xAxisValues)
-      const maxVal = filters.xAxisRange.max !== null ? filters.xAxisRange.max : Math.max(...xAxisValues)
-      
-      processedData = processedData.filter((item: any) => {
-        const val = typeof item[chartConfig.xAxis] === 'number' ? item[chartConfig.xAxis] : parseFloat(item[chartConfig.xAxis]) || 0
-        return val >= minVal && val <= maxVal
-      })
-    }
-
-    // Filter by Y-axis range (for numerical data)
-    if (filters.yAxisRange.min !== null || filters.yAxisRange.max !== null) {
-      const yAxisValues = processedData.map((item: any) => item[chartConfig.yAxis])
-      const minVal = filters.yAxisRange.min !== null ? filters.yAxisRange.min : Math.min(...yAxisValues)
-      const maxVal = filters.yAxisRange.max !== null ? filters.yAxisRange.max : Math.max(...yAxisValues)
-      
-      processedData = processedData.filter((item: any) => {
-        return item[chartConfig.yAxis] >= minVal && item[chartConfig.yAxis] <= maxVal
-      })
-    }
-
-    // Filter by X-axis categories
-    if (filters.xAxisCategories.length > 0) {
-      processedData = processedData.filter((item: any) => 
-        filters.xAxisCategories.includes(String(item[chartConfig.xAxis]))
-      )
-    }
-
-    // Filter by Y-axis categories
-    if (filters.yAxisCategories.length > 0) {
-      processedData = processedData.filter((item: any) => 
-        filters.yAxisCategories.includes(String(item[chartConfig.yAxis]))
-      )
-    }
-
-    // Filter by date range - automatically detect datetime column
-    if (filters.dateRange.start && filters.dateRange.end) {
-      const datetimeColumn = availableColumns.find((col: any) => 
-        col.isDate && (col.type === 'datetime64' || col.type === 'datetime64[ns]' || col.type.includes('datetime'))
-      )
-      
-      if (datetimeColumn) {
-        const startDate = new Date(filters.dateRange.start)
-        const endDate = new Date(filters.dateRange.end)
-        
-        processedData = processedData.filter((item: any) => {
-          const itemDate = new Date(item[datetimeColumn.name])
-          return itemDate >= startDate && itemDate <= endDate
-        })
-      }
-    }
-
-    // For pie charts, aggregate data
-    if (chartConfig.type === 'pie') {
-      const aggregated = processedData.reduce((acc: any, item: any) => {
-        const key = item[chartConfig.xAxis]
-        acc[key] = (acc[key] || 0) + item[chartConfig.yAxis]
-        return acc
-      }, {})
-
-      return Object.entries(aggregated).map(([name, value]) => ({
-        name,
-        value,
-        fill: CHART_COLORS[Math.floor(Math.random() * CHART_COLORS.length)]
-      }))
-    }
-
-    return processedData
-  }, [file?.data_preview?.preview_data, chartConfig])
+    const filtered = filters.xAxisRange.min !== null || filters.xAxisRange.max !== null ||
+      filters.yAxisRange.min !== null || filters.yAxisRange.max !== null ||
+      filters.xAxisCategories.length > 0 || filters.yAxisCategories.length > 0 ||
+      (filters.dateRange.start !== null && filters.dateRange.end !== null)
+    if (filtered || !chartConfig.xAxis || !chartConfig.yAxis) return null
+    const chartType = chartConfig.type === 'area' ? 'line' : chartConfig.type
+    return specs.find(spec =>
+      spec.data && 'series' in spec.data && spec.data.series.length > 0 && spec.chart_type === chartType &&
+      spec.x_column === chartConfig.xAxis && spec.y_column === chartConfig.yAxis
+    ) || null
+  }, [file?.metadata?.charts, chartConfig])
 
   // Get available columns for chart configuration
   const availableColumns = useMemo(() => {
@@ -176,9 +104,9 @@ export default function DataViewer() {
     return file.data_preview.columns_info.map((col: any) => ({
       name: col.name,
       type: col.type,
-      isNumeric: col.type === 'int64' || col.type === 'float64' || col.type === 'number',
+      isNumeric: /^(u?int|float)\d*$/i.test(col.type) || col.type === 'number',
       isDate: col.type === 'datetime64' || col.type === 'datetime64[ns]' || col.type.includes('datetime') ||
-              (col.type === 'object' && typeof col.name === 'string' && (
+              (['object', 'string', 'category'].includes(col.type) && typeof col.name === 'string' && (
                 col.name.toLowerCase().includes('date') || 
                 col.name.toLowerCase().includes('time') ||
                 col.name.toLowerCase().includes('created') ||
@@ -187,6 +115,68 @@ export default function DataViewer() {
     }))
   }, [file?.data_preview?.columns_info])
 
+  // Filtered charts, and suggested charts stored without data, are aggregated over the full dataset
+  const aggregateRequest = useMemo((): AggregateRequest | null => {
+    if (materializedChart || !chartConfig.xAxis || !chartConfig.yAxis) return null
+    const { xAxis, yAxis, filters } = chartConfig
+    const numericRanges: NonNullable<AggregateRequest['numeric_ranges']> = {}
+    if (filters.xAxisRange.min !== null || filters.xAxisRange.max !== null) numericRanges[xAxis] = filters.xAxisRange
+    if (filters.yAxisRange.min !== null || filters.yAxisRange.max !== null) numericRanges[yAxis] = filters.yAxisRange
+    const categoryFilters: NonNullable<AggregateRequest['category_filters']> = {}
+    if (filters.xAxisCategories.length > 0) categoryFilters[xAxis] = filters.xAxisCategories
+    if (filters.yAxisCategories.length > 0) categoryFilters[yAxis] = filters.yAxisCategories
+    const dateRanges: NonNullable<AggregateRequest['date_ranges']> = {}
+    const datetimeColumn = availableColumns.find((col: any) => col.isDate && col.type.includes('datetime'))
+    if (datetimeColumn && filters.dateRange.start && filters.dateRange.end) {
+      dateRanges[datetimeColumn.name] = filters.dateRange
+    }
+    return {
+      x_column: xAxis,
+      y_column: yAxis,
+      agg: 'sum',
+      chart_type: chartConfig.type === 'scatter' ? 'scatter'
+        : chartConfig.type === 'line' || chartConfig.type === 'area' ? 'line' : 'bar',
+      numeric_ranges: numericRanges,
+      category_filters: categoryFilters,
+      date_ranges: dateRanges,
+      // Pie slices beyond the largest ones are folded into "Other"
+      max_points: chartConfig.type === 'pie' ? CHART_COLORS.length : 500
+    }
+  }, [materializedChart, chartConfig.xAxis, chartConfig.yAxis, chartConfig.type, chartConfig.filters, availableColumns])
+
+  useEffect(() => {
+    if (!fileId || !aggregateRequest) {
+      setAggregatedChart(null)
+      return
+    }
+    let cancelled = false
+    setAggregating(true)
+    fileProcessingService.aggregate(fileId, aggregateRequest).then(result => {
+      if (cancelled) return
+      setAggregatedChart(result)
+      setAggregating(false)
+    })
+    // A newer request supersedes this one
+    return () => { cancelled = true }
+  }, [fileId, aggregateRequest])
+
+  // Chart points from the precomputed or the on-demand aggregation
+  const chartData = useMemo(() => {
+    if (!chartConfig.xAxis || !chartConfig.yAxis) return []
+    const result = materializedChart?.data && 'series' in materializedChart.data ? materializedChart.data : aggregatedChart
+    if (!result || result.series.length === 0) return []
+
+    const { points } = result.series[0]
+    if (chartConfig.type === 'pie') {
+      return points.map((point, index) => ({
+        name: String(point.x),
+        value: point.y,
+        fill: CHART_COLORS[index % CHART_COLORS.length]
+      }))
+    }
+    return points.map(point => ({ [chartConfig.xAxis]: point.x, [chartConfig.yAxis]: point.y }))
+  }, [chartConfig.xAxis, chartConfig.yAxis, chartConfig.type, materializedChart, aggregatedChart])
+
   // Get data ranges and categories for filtering
   const dataRanges = useMemo(() => {
     if (!file?.data_preview?.preview_data || !chartConfig.xAxis || !chartConfig.yAxis) {
@@ -699,7 +689,12 @@ export default function DataViewer() {
                 
                 <div className="flex justify-between items-center">
                   <span className="text-sm font-medium text-gray-500">Null values</span>
-                  <span className="text-sm font-semibold text-gray-900">{col.null_count.toLocaleString()}</span>
+                  <span className="text-sm font-semibold text-gray-900">
+                    {col.null_count_interval
+                      // Estimated from a sample: the nulls of the whole file are somewhere in this range
+                      ? `~${col.null_count.toLocaleString()} (${col.null_count_interval[0].toLocaleString()}–${col.null_count_interval[1].toLocaleString()})`
+                      : col.null_count.toLocaleString()}
+                  </span>
                 </div>
 
                 <div className="w-full bg-gray-200 rounded-full h-2">
@@ -1823,6 +1818,11 @@ export default function DataViewer() {
             <h3 className="text-lg font-medium text-gray-900 mb-2">Configure Your Chart</h3>
             <p className="text-gray-500">Select X and Y axes to create your visualization</p>
           </div>
+        ) : chartData.length === 0 && aggregating ? (
+          <div className="text-center py-12 bg-white rounded-lg border border-gray-200">
+            <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-blue-600 mx-auto mb-4"></div>
+            <p className="text-gray-500">Aggregating the full dataset...</p>
+          </div>
         ) : chartData.length === 0 ? (
           <div className="text-center py-12 bg-white rounded-lg border border-gray-200">
             <div className="mx-auto h-16 w-16 bg-yellow-100 rounded-full flex items-center justify-center mb-4">
@@ -23,12 +23,157 @@ export interface ProcessingResult {
     suggested_charts: string[]
     data_quality_score: number
     key_insights: string[]
+    chart_specs?: ChartSpec[]
+    domain?: { name: string; confidence: number; matched_columns: string[] }
+    column_roles?: Record<string, 'identifier' | 'date' | 'measure' | 'dimension' | 'text' | 'other'>
+    local_summary?: string
+    // Local insights are published first; the LLM analysis is merged in later
+    source?: 'local' | 'local+llm'
+    enrichment?: 'pending' | 'completed' | 'failed'
   }
   processing_status: string
   processed_at?: string
   error_message?: string
 }
 
+export interface ChartSpec {
+  chart_type: string
+  title: string
+  x_column: string
+  y_column: string | null
+  agg: string
+  reason: string
+}
+
+export interface ChartPoint {
+  x: string | number | null
+  y: number | null
+}
+
+export interface AggregateResult {
+  chart_type: string
+  series: { name: string; points: ChartPoint[] }[]
+  total_rows: number
+  filtered_rows: number
+  downsampled: boolean
+}
+
+// Filters and grouping for POST /files/{file_id}/aggregate, applied to the full dataset
+export interface AggregateRequest {
+  x_column: string
+  y_column?: string | null
+  group_by?: string | null
+  agg?: 'sum' | 'mean' | 'count' | 'min' | 'max'
+  chart_type?: 'bar' | 'line' | 'scatter' | 'histogram'
+  numeric_ranges?: Record<string, { min?: number | null; max?: number | null }>
+  category_filters?: Record<string, (string | number)[]>
+  date_ranges?: Record<string, { start?: string | null; end?: string | null }>
+  bins?: number
+  max_points?: number
+}
+
+export interface CorrelationMatrix {
+  columns: string[]
+  matrix: (number | null)[][]
+}
+
+// A chart spec with its data: aggregate series, the correlation matrix for heatmaps,
+// or null when it has to be aggregated on demand
+export interface MaterializedChart extends ChartSpec {
+  data: AggregateResult | CorrelationMatrix | null
+}
+
+// Chart data precomputed at processing time, stored as metadata.charts
+export interface MaterializedCharts {
+  top_categories: Record<string, { value: string | number; count: number }[]>
+  histograms: Record<string, { bin_start: number; bin_end: number; count: number }[]>
+  time_series: Record<string, { frequency: string | null; points: Record<string, string | number | null>[] }>
+  correlation: CorrelationMatrix | null
+  scatter_sample: { columns: string[]; rows: (number | null)[][] } | null
+  specs: MaterializedChart[]
+  sampled: boolean
+}
+
+export interface ProcessingJob {
+  id: string
+  batch_id: string | null
+  file_id: string
+  status: 'queued' | 'running' | 'completed' | 'failed' | 'cancelled'
+  stage: string
+  progress: number
+  attempts: number
+  max_attempts: number
+  error: string | null
+  created_at: number
+  updated_at: number
+}
+
+export interface ColumnValuesPage {
+  column: string
+  values: string[]
+  total: number
+  offset: number
+  limit: number
+  has_more: boolean
+}
+
+export interface RowsQuery {
+  offset?: number
+  limit?: number
+  cursor?: string | null
+  sort?: { column: string; descending?: boolean }[]
+  columns?: string[]
+  numeric_ranges?: Record<string, { min?: number | null; max?: number | null }>
+  category_filters?: Record<string, (string | number)[]>
+  date_ranges?: Record<string, { start?: string | null; end?: string | null }>
+}
+
+export type ProgressEventName =
+  | 'queued'
+  | 'downloaded'
+  | 'parsed'
+  | 'profiled'
+  | 'insights'
+  | 'saved'
+  | 'enriched'
+  | 'error'
+
+// Pushed by the backend as processing advances; partial results arrive in `data`
+export interface ProgressEvent {
+  id: number
+  file_id: string
+  event: ProgressEventName
+  data: {
+    row_count?: number
+    column_count?: number
+    columns?: string[]
+    preview_data?: Record<string, any>[]
+    data_preview?: any
+    ai_insights?: ProcessingResult['ai_insights']
+    processing_status?: string
+    message?: string
+    [key: string]: any
+  }
+  final: boolean
+  time: number
+}
+
+const PROGRESS_EVENTS: ProgressEventName[] = [
+  'queued', 'downloaded', 'parsed', 'profiled', 'insights', 'saved', 'enriched', 'error'
+]
+
+export interface RowsPage {
+  columns: string[]
+  rows: Record<string, any>[]
+  row_numbers: number[]
+  total_rows: number
+  matched_rows: number
+  offset: number
+  limit: number
+  has_more: boolean
+  next_cursor: string | null
+}
+
 class FileProcessingService {
   private baseUrl: string
 
@@ -93,16 +238,130 @@ class FileProcessingService {
     }
   }
 
-  async checkProcessingStatus(fileId: string): Promise<ProcessingResult | null> {
+  async getColumnValues(
+    fileId: string,
+    column: string,
+    options: { prefix?: string; offset?: number; limit?: number } = {}
+  ): Promise<ColumnValuesPage | null> {
     try {
-      // This would typically be a separate endpoint to check status
-      // For now, we'll return null and let the frontend handle it
+      const params = new URLSearchParams()
+      if (options.prefix) params.set('prefix', options.prefix)
+      if (options.offset !== undefined) params.set('offset', String(options.offset))
+      if (options.limit !== undefined) params.set('limit', String(options.limit))
+
+      const response = await fetch(
+        `${this.baseUrl}/files/${fileId}/columns/${encodeURIComponent(column)}/values?${params.toString()}`
+      )
+
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`)
+      }
+
+      return await response.json()
+    } catch (error) {
+      console.error('Error fetching column values:', error)
       return null
+    }
+  }
+
+  async aggregate(fileId: string, request: AggregateRequest): Promise<AggregateResult | null> {
+    try {
+      const response = await fetch(`${this.baseUrl}/files/${fileId}/aggregate`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(request),
+      })
+
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`)
+      }
+
+      return await response.json()
+    } catch (error) {
+      console.error('Error aggregating file:', error)
+      return null
+    }
+  }
+
+  async getRows(fileId: string, query: RowsQuery = {}): Promise<RowsPage | null> {
+    try {
+      const response = await fetch(`${this.baseUrl}/files/${fileId}/rows`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(query),
+      })
+
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`)
+      }
+
+      return await response.json()
+    } catch (error) {
+      console.error('Error fetching rows:', error)
+      return null
+    }
+  }
+
+  // Progress of one file's processing run; the stream closes after its final event.
+  // Returns a function that unsubscribes.
+  subscribeToFileProgress(fileId: string, onEvent: (event: ProgressEvent) => void): () => void {
+    return this.subscribe(`${this.baseUrl}/files/${fileId}/events`, onEvent)
+  }
+
+  // Progress of all of a user's files over one connection, e.g. for the file list
+  subscribeToUserProgress(userId: string, onEvent: (event: ProgressEvent) => void): () => void {
+    return this.subscribe(`${this.baseUrl}/users/${userId}/events`, onEvent)
+  }
+
+  private subscribe(url: string, onEvent: (event: ProgressEvent) => void): () => void {
+    const source = new EventSource(url)
+    const handle = (message: MessageEvent) => {
+      try {
+        const event: ProgressEvent = JSON.parse(message.data)
+        onEvent(event)
+        // Otherwise the browser would reconnect to the finished stream
+        if (event.final) source.close()
+      } catch (error) {
+        console.error('Error handling progress event:', error)
+      }
+    }
+    PROGRESS_EVENTS.forEach(name => source.addEventListener(name, handle as EventListener))
+    return () => source.close()
+  }
+
+  async checkProcessingStatus(jobId: string): Promise<ProcessingJob | null> {
+    try {
+      const response = await fetch(`${this.baseUrl}/jobs/${jobId}`)
+
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`)
+      }
+
+      return await response.json()
     } catch (error) {
       console.error('Error checking processing status:', error)
       return null
     }
   }
+
+  async cancelProcessing(jobId: string): Promise<ProcessingJob | null> {
+    try {
+      const response = await fetch(`${this.baseUrl}/jobs/${jobId}`, { method: 'DELETE' })
+
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`)
+      }
+
+      return await response.json()
+    } catch (error) {
+      console.error('Error cancelling processing:', error)
+      return null
+    }
+  }
 }
 
 export const fileProcessingService = new FileProcessingService()